@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Parallel Runner for Endpoint Smoke Checks
+
+Runs checks on a thread pool as soon as the checks they depend on have
+passed. A check that runs on its own (such as a readiness poll everything
+else waits for) prints as it goes; checks running side by side have their
+output buffered and printed as one block when each completes.
+"""
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Check:
+    """One smoke check: a callable returning True on success"""
+
+    def __init__(self, name, func, depends_on=(), required=True):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        # Optional checks are reported but do not fail the suite
+        self.required = required
+
+
+class _ThreadOutput:
+    """sys.stdout replacement that buffers writes per worker thread"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.stream.flush()
+
+
+def _run_captured(output, check, capture=True):
+    if capture:
+        output.local.buffer = io.StringIO()
+    start = time.perf_counter()
+    try:
+        passed = bool(check.func())
+    except Exception as e:
+        print(f'❌ Unexpected error: {e}')
+        passed = False
+    duration = time.perf_counter() - start
+    text = output.local.buffer.getvalue() if capture else None
+    output.local.buffer = None
+    return passed, duration, text
+
+
+def run_checks(checks, max_workers=8):
+    """
+    Run checks concurrently, respecting dependencies.
+
+    A check starts once every check it depends on has passed; if one of them
+    failed it is skipped. Returns (results, elapsed) where results maps each
+    check name to a dict with passed, skipped, duration and required.
+    """
+    pending = {check.name: check for check in checks}
+    results = {}
+    futures = {}
+    output = _ThreadOutput(sys.stdout)
+    original_stdout = sys.stdout
+    start = time.perf_counter()
+
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or futures:
+                ready = []
+                for name, check in list(pending.items()):
+                    if any(dep in results and not results[dep]['passed'] for dep in check.depends_on):
+                        del pending[name]
+                        results[name] = {'passed': False, 'skipped': True, 'duration': 0.0,
+                                         'required': check.required}
+                        print(f'\n⏭️  {name} skipped (dependency failed)')
+                    elif all(dep in results for dep in check.depends_on):
+                        del pending[name]
+                        ready.append(check)
+                # Nothing else can start until a lone check finishes, so let it print live
+                alone = len(ready) == 1 and not futures
+                for check in ready:
+                    if alone:
+                        print(f'\n▶️  {check.name}')
+                        print('-' * 30)
+                    futures[executor.submit(_run_captured, output, check, capture=not alone)] = check
+
+                if not futures:
+                    # Whatever is still pending depends on checks that never ran
+                    for name, check in pending.items():
+                        results[name] = {'passed': False, 'skipped': True, 'duration': 0.0,
+                                         'required': check.required}
+                        print(f'\n⏭️  {name} skipped (unknown dependency)')
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    check = futures.pop(future)
+                    passed, duration, text = future.result()
+                    results[check.name] = {'passed': passed, 'skipped': False, 'duration': duration,
+                                           'required': check.required}
+                    status = '✅' if passed else ('❌' if check.required else '⚠️ ')
+                    if text is None:
+                        print(f'{status} {check.name} ({duration:.2f}s)')
+                        continue
+                    print(f'\n{status} {check.name} ({duration:.2f}s)')
+                    print('-' * 30)
+                    sys.stdout.write(text)
+    finally:
+        sys.stdout = original_stdout
+
+    return results, time.perf_counter() - start
+
+
+def suite_passed(results):
+    """True when every required check passed"""
+    return all(result['passed'] for result in results.values() if result['required'])
+
+
+def print_check_summary(results, elapsed):
+    """Print pass/fail per check plus wall time vs sequential time"""
+    print('\n📊 Check Summary:')
+    for name, result in results.items():
+        if result['skipped']:
+            status = '⏭️  SKIP'
+        elif result['passed']:
+            status = '✅ PASS'
+        else:
+            status = '❌ FAIL' if result['required'] else '⚠️  WARN'
+        print(f'   {status} {name} ({result["duration"]:.2f}s)')
+
+    sequential = sum(result['duration'] for result in results.values())
+    print(f'\n⏱️  Suite time: {elapsed:.2f}s (sequential would be ~{sequential:.2f}s)')
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Shared Pooled HTTP Client for Backend Endpoint Scripts
+
+Keeps connections to the backend alive between probes (HTTP/2 when the `h2`
+package is installed), applies a timeout budget per endpoint and retries
+connection errors with exponential backoff. A client with a `recorder`
+(see backend_results.ResultWriter) reports every request it sends, with a
+DNS/connect/TLS/TTFB/transfer breakdown from httpx trace events.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import struct
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+RENDER_BASE_URL = 'https://openfood-backend.onrender.com'
+# The host the Flutter app's services (lib/services/*.dart) actually call
+APP_BASE_URL = 'https://backend-openfood.onrender.com'
+LOCAL_BASE_URL = 'http://localhost:8000'
+
+# httpx timeout per endpoint path, in seconds: applied to each phase (connect,
+# write, every read and pool wait) separately, not to the request as a whole
+ENDPOINT_TIMEOUTS = {
+    '/': 10,
+    '/health': 10,
+    '/docs': 10,
+    '/openapi.json': 10,
+    '/youtube/search': 30,
+    '/youtube/details': 30,
+    '/youtube/trending': 20,
+    '/youtube/cache/stats': 10,
+    '/youtube/cache/clear': 10,
+    # The Flutter client gives meal-plan generation 30 seconds before showing an error
+    '/api/meal-plan/generate': 30,
+    '/generate-weekly-meal': 30,
+    '/api/replace-day': 30,
+    '/replace-day-personalized': 30,
+    # Budgets from the Flutter food search screen; entries ending in / cover path parameters
+    '/usda/translate': 10,
+    '/usda/search': 15,
+    '/usda/nutrition': 15,
+    '/usda/food/': 10,
+    '/usda/clear-cache': 10,
+    # AI price analysis calls an LLM; the grocery optimizer gets longer in the app
+    '/ai-price/health': 5,
+    '/ai-price/analyze-trends': 10,
+    '/ai-price/predict-price': 10,
+    '/ai-price/analyze-seasonal': 10,
+    '/ai-price/optimize-grocery': 15,
+    '/ai-price/market-insights': 10,
+}
+DEFAULT_TIMEOUT = 30
+CONNECT_TIMEOUT = 10
+
+# Failures that happen before the request reaches the backend, so retrying is safe
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+# Operation keys of an OpenAPI path item; the others (parameters, summary, servers...) apply to the whole path
+HTTP_METHODS = {'get', 'put', 'post', 'delete', 'patch', 'options', 'head', 'trace'}
+
+
+def http2_available():
+    """HTTP/2 needs the optional `h2` package"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def timeout_for(path):
+    """Timeout budget for an endpoint path (query string ignored)"""
+    path = urlsplit(path).path
+    budget = ENDPOINT_TIMEOUTS.get(path)
+    if budget is None:
+        budget = ENDPOINT_TIMEOUTS.get(path.rsplit('/', 1)[0] + '/', DEFAULT_TIMEOUT)
+    return httpx.Timeout(budget, connect=min(CONNECT_TIMEOUT, budget))
+
+
+def _client_options(base_url, http2, max_connections):
+    return {
+        'base_url': base_url,
+        'http2': http2_available() if http2 is None else http2,
+        'limits': httpx.Limits(max_connections=max_connections,
+                               max_keepalive_connections=max_connections),
+        'headers': {'Accept': 'application/json'},
+    }
+
+
+def is_ip_literal(host):
+    """Whether a connect_tcp host (str or bytes) is an IP address, which needs no lookup"""
+    if isinstance(host, bytes):
+        host = host.decode('ascii', errors='replace')
+    try:
+        ipaddress.ip_address(host or '')
+    except ValueError:
+        return False
+    return True
+
+
+def handshake_rtt(stream):
+    """Round trip the kernel measured on a new TCP connection (Linux TCP_INFO), in seconds, or None"""
+    sock = stream.get_extra_info('socket') if stream is not None else None
+    if sock is None or not hasattr(socket, 'TCP_INFO'):
+        return None
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 104)
+    except OSError:
+        return None
+    # tcpi_rtt (microseconds) follows eight one-byte fields and fifteen u32 fields
+    return struct.unpack_from('I', info, 68)[0] / 1e6 if len(info) >= 72 else None
+
+
+class RequestPhases:
+    """
+    Per-phase timing of one request, collected from httpx trace events.
+
+    httpcore resolves the host inside its connect_tcp step without tracing
+    it. Where the kernel reports the handshake round trip (Linux), that is
+    `connect` and the rest of the step, the lookup plus socket setup, is
+    `dns+socket`; elsewhere the lookup stays in `connect` and `dns+socket`
+    is 0. An IP literal has no lookup, so its socket setup is left to
+    `other` instead. `ttfb` runs from the request being sent to the
+    response headers arriving (server time plus one round trip). Phases a
+    pooled connection skips are 0.
+    """
+
+    def __init__(self):
+        self.marks = {}
+        self.handshake = None
+        self.ip_literal = False
+
+    def trace(self, name, info):
+        # connection.connect_tcp.started -> connect_tcp.started; http11.* and http2.* share names
+        self.marks[name.split('.', 1)[1]] = time.perf_counter()
+        if name == 'connection.connect_tcp.started':
+            self.ip_literal = is_ip_literal(info.get('host'))
+        elif name == 'connection.connect_tcp.complete':
+            self.handshake = handshake_rtt(info.get('return_value'))
+
+    async def atrace(self, name, info):
+        self.trace(name, info)
+
+    def span(self, first, last):
+        if first in self.marks and last in self.marks:
+            return self.marks[last] - self.marks[first]
+        return 0.0
+
+    def summary(self, total):
+        """Phase durations in seconds; `other` is pool waits and client overhead"""
+        connect = self.span('connect_tcp.started', 'connect_tcp.complete')
+        handshake = min(connect, self.handshake) if self.handshake is not None else connect
+        phases = {
+            'dns+socket': 0.0 if self.ip_literal else connect - handshake,
+            'connect': handshake,
+            'tls': self.span('start_tls.started', 'start_tls.complete'),
+            'send': self.span('send_request_headers.started', 'send_request_body.complete'),
+            'ttfb': self.span('send_request_body.complete', 'receive_response_headers.complete'),
+            'transfer': self.span('receive_response_body.started', 'receive_response_body.complete'),
+        }
+        phases['other'] = max(0.0, total - sum(phases.values()))
+        phases['new_connection'] = 'connect_tcp.complete' in self.marks
+        return phases
+
+
+def _traced(kwargs, callback):
+    return {**kwargs, 'extensions': {**kwargs.get('extensions', {}), 'trace': callback}}
+
+
+def _record_response(recorder, method, path, response, start, phases):
+    if recorder is not None:
+        latency = time.perf_counter() - start
+        recorder.record_response(method, path, response, latency, phases=phases.summary(latency))
+
+
+def _record_error(recorder, method, path, error, start):
+    if recorder is not None:
+        recorder.record_error(method, path, error, time.perf_counter() - start)
+
+
+class BackendClient:
+    """Pooled synchronous client bound to one backend base URL"""
+
+    def __init__(self, base_url=RENDER_BASE_URL, retries=2, backoff=0.5, http2=None,
+                 max_connections=10, recorder=None):
+        self.base_url = base_url
+        self.retries = retries
+        self.backoff = backoff
+        self.recorder = recorder
+        self.client = httpx.Client(**_client_options(base_url, http2, max_connections))
+
+    def request(self, method, path, retries=None, **kwargs):
+        """Send a request, retrying connection errors with exponential backoff"""
+        kwargs.setdefault('timeout', timeout_for(path))
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            # Timed per attempt so retry backoff is not counted as latency
+            phases = RequestPhases()
+            start = time.perf_counter()
+            try:
+                response = self.client.request(method, path, **_traced(kwargs, phases.trace))
+            except RETRYABLE_ERRORS as e:
+                if attempt == retries:
+                    _record_error(self.recorder, method, path, e, start)
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+            except httpx.HTTPError as e:
+                _record_error(self.recorder, method, path, e, start)
+                raise
+            else:
+                _record_response(self.recorder, method, path, response, start, phases)
+                return response
+
+    def stream(self, method, path, **kwargs):
+        """Context manager returning the response as soon as headers arrive"""
+        kwargs.setdefault('timeout', timeout_for(path))
+        return self.client.stream(method, path, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncBackendClient:
+    """Pooled asyncio client bound to one backend base URL"""
+
+    def __init__(self, base_url=RENDER_BASE_URL, retries=2, backoff=0.5, http2=None,
+                 max_connections=10, recorder=None):
+        self.base_url = base_url
+        self.retries = retries
+        self.backoff = backoff
+        self.recorder = recorder
+        self.client = httpx.AsyncClient(**_client_options(base_url, http2, max_connections))
+
+    async def request(self, method, path, retries=None, **kwargs):
+        """Send a request, retrying connection errors with exponential backoff"""
+        kwargs.setdefault('timeout', timeout_for(path))
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            # Timed per attempt so retry backoff is not counted as latency
+            phases = RequestPhases()
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, **_traced(kwargs, phases.atrace))
+            except RETRYABLE_ERRORS as e:
+                if attempt == retries:
+                    _record_error(self.recorder, method, path, e, start)
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+            except httpx.HTTPError as e:
+                _record_error(self.recorder, method, path, e, start)
+                raise
+            else:
+                _record_response(self.recorder, method, path, response, start, phases)
+                return response
+
+    def stream(self, method, path, **kwargs):
+        """Async context manager returning the response as soon as headers arrive"""
+        kwargs.setdefault('timeout', timeout_for(path))
+        return self.client.stream(method, path, **kwargs)
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request('DELETE', path, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+async def fetch_cache_stats(client):
+    """Snapshot /youtube/cache/stats, or None when unavailable"""
+    try:
+        response = await client.get('/youtube/cache/stats')
+        if response.status_code == 200:
+            return response.json()
+    except httpx.HTTPError:
+        pass
+    return None
+
+
+def json_body(response):
+    """The JSON object of a 200 response, or None for other statuses and for bodies that are not one"""
+    if response.status_code != 200:
+        return None
+    try:
+        body = response.json()
+    except ValueError:
+        # An HTML error page or a truncated body
+        return None
+    return body if isinstance(body, dict) else None
+
+
+async def timed_post(client, path, payload):
+    """POST a JSON payload and return (latency, status, body); body is None unless a JSON object came back"""
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json=payload)
+    except httpx.HTTPError:
+        return time.perf_counter() - start, None, None
+    return time.perf_counter() - start, response.status_code, json_body(response)
+
+
+_shared_clients = {}
+
+
+def get_client(base_url):
+    """Process-wide client per base URL so consecutive probes reuse connections"""
+    client = _shared_clients.get(base_url)
+    if client is None:
+        client = _shared_clients[base_url] = BackendClient(base_url)
+    return client
+
+
+def close_clients():
+    """Close every shared client"""
+    while _shared_clients:
+        _, client = _shared_clients.popitem()
+        client.close()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+OpenAPI Contract Snapshots, Diffs and GET Baselines
+
+`snapshot` saves the backend's /openapi.json together with a performance
+baseline for every GET endpoint: a minimal valid request is generated from
+each operation's parameters (required ones only, filled from examples,
+defaults, enums or a sample value for the parameter name) and sent a few
+times to record latency, status and response size. Nobody has to write a
+script before a new endpoint has numbers. Requests are paced (--pause) and
+an endpoint stops being sampled once it answers 429, since some GET routes
+are rate limited or spend YouTube quota on the live backend; --skip leaves
+routes out entirely.
+
+`diff` compares two snapshots: endpoints and methods added or removed,
+parameters added, removed or changed, request/response schema references,
+component models and their properties, and the baseline latency and size
+of every GET endpoint both snapshots measured. `baseline` measures the GET
+endpoints now without saving anything.
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from datetime import date
+
+import httpx
+
+from backend_client import HTTP_METHODS, RENDER_BASE_URL, BackendClient
+from backend_load import percentile
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import PRICE_CATEGORIES
+
+# Paths that document the API rather than serve it
+DOC_PATHS = {'/docs', '/redoc', '/openapi.json', '/docs/oauth2-redirect'}
+
+# Sample values for parameters the schema gives no example or default for
+SAMPLE_VALUES = {
+    'query': 'Phở Bò',
+    'vietnamese_query': 'Phở Bò',
+    'food_name': 'thịt bò',
+    'category': PRICE_CATEGORIES[0],
+    'region': 'Hà Nội',
+    'user_id': 'contract_check',
+}
+
+
+def resolve(spec, node):
+    """Follow a local $ref"""
+    while isinstance(node, dict) and '$ref' in node:
+        target = spec
+        for part in node['$ref'].lstrip('#/').split('/'):
+            target = target.get(part, {})
+        node = target
+    return node
+
+
+def schema_type(schema):
+    """The type of a parameter schema, looking through Optional[...] anyOf unions"""
+    if 'type' in schema:
+        return schema['type']
+    for option in schema.get('anyOf', []) + schema.get('oneOf', []):
+        if option.get('type') not in (None, 'null'):
+            return option['type']
+    return 'string'
+
+
+def sample_value(parameter, schema):
+    """A valid value for a parameter: example, default, enum, or a sample for its name and type"""
+    for source in (parameter, schema):
+        if 'example' in source:
+            return source['example']
+        if source.get('examples'):
+            examples = source['examples']
+            return next(iter(examples.values())).get('value') if isinstance(examples, dict) else examples[0]
+    if schema.get('default') is not None:
+        return schema['default']
+    if schema.get('enum'):
+        return schema['enum'][0]
+    kind = schema_type(schema)
+    if kind in ('integer', 'number'):
+        exclusive = schema.get('exclusiveMinimum')
+        if isinstance(exclusive, bool):
+            # OpenAPI 3.0: a flag making `minimum` itself invalid
+            value = schema.get('minimum', 0) + 1 if exclusive else schema.get('minimum', 1)
+        else:
+            value = max(schema.get('minimum', 1), exclusive + 1 if exclusive is not None else 1)
+        return int(value) if kind == 'integer' else float(value)
+    if kind == 'boolean':
+        return True
+    if schema.get('format') == 'date':
+        return date.today().isoformat()
+    return SAMPLE_VALUES.get(parameter['name'], 'test')
+
+
+def minimal_get_request(spec, path, operation):
+    """(concrete path, query params) using only the required parameters"""
+    params = {}
+    for parameter in operation.get('parameters', []):
+        parameter = resolve(spec, parameter)
+        if not parameter.get('required') and parameter.get('in') != 'path':
+            continue
+        value = sample_value(parameter, resolve(spec, parameter.get('schema', {})))
+        if isinstance(value, bool):
+            value = str(value).lower()
+        if parameter.get('in') == 'path':
+            path = path.replace('{' + parameter['name'] + '}', str(value))
+        elif parameter.get('in') == 'query':
+            params[parameter['name']] = value
+    return path, params
+
+
+def path_operations(spec):
+    """{(method, path template): operation} with the path item's shared parameters merged into each operation"""
+    operations = {}
+    for path, item in spec.get('paths', {}).items():
+        shared = item.get('parameters', [])
+        for method, operation in item.items():
+            if method not in HTTP_METHODS:
+                continue
+            # An operation's own parameter overrides a shared one with the same location and name
+            own = {(parameter.get('in'), parameter.get('name'))
+                   for parameter in (resolve(spec, parameter) for parameter in operation.get('parameters', []))}
+            inherited = [parameter for parameter in shared
+                         if (resolve(spec, parameter).get('in'), resolve(spec, parameter).get('name')) not in own]
+            operations[(method, path)] = ({**operation, 'parameters': inherited + operation.get('parameters', [])}
+                                          if inherited else operation)
+    return operations
+
+
+def get_operations(spec):
+    """(path template, operation) for every GET endpoint that serves the API"""
+    return sorted(((path, operation) for (method, path), operation in path_operations(spec).items()
+                   if method == 'get' and path not in DOC_PATHS), key=lambda pair: pair[0])
+
+
+def measure_baselines(client, spec, samples=5, pause=1.0, skip=()):
+    """
+    Send each generated GET request `samples` times; returns {path template: baseline}.
+
+    Waits `pause` seconds between requests, leaves out templates matching a
+    `skip` regex, and stops sampling an endpoint after a 429.
+    """
+    baselines = {}
+    sent = False
+    for template, operation in get_operations(spec):
+        if any(re.search(pattern, template) for pattern in skip):
+            continue
+        path, params = minimal_get_request(spec, template, operation)
+        latencies, sizes, statuses = [], [], {}
+        for _ in range(samples):
+            if sent and pause:
+                time.sleep(pause)
+            sent = True
+            start = time.perf_counter()
+            try:
+                response = client.get(path, params=params)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                continue
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if response.status_code == 429:
+                # The limiter's answer says nothing about the endpoint, and more requests only extend the block
+                break
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(response.content))
+        baselines[template] = {
+            'request': {'path': path, 'params': params},
+            'first': latencies[0] if latencies else None,
+            'p50': percentile(sorted(latencies[1:] or latencies), 50) if latencies else None,
+            'bytes': sorted(sizes)[len(sizes) // 2] if sizes else None,
+            'statuses': statuses,
+        }
+    return baselines
+
+
+def fetch_openapi(client):
+    response = client.get('/openapi.json')
+    response.raise_for_status()
+    return response.json()
+
+
+def take_snapshot(base_url, samples=5, baseline=True, pause=1.0, skip=()):
+    """OpenAPI document plus GET baselines, ready to be saved"""
+    with BackendClient(base_url, retries=1) as client:
+        spec = fetch_openapi(client)
+        return {
+            'taken_at': time.time(),
+            'base_url': base_url,
+            'version': spec.get('info', {}).get('version'),
+            'openapi': spec,
+            'baselines': measure_baselines(client, spec, samples, pause, skip) if baseline else {},
+        }
+
+
+def save_snapshot(snapshot, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(snapshot['taken_at']))
+    path = os.path.join(out_dir, f"openapi-{snapshot['version'] or 'unknown'}-{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def load_snapshot(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def operation_signature(spec, operation):
+    """Comparable view of an operation: parameters, request body and response schemas"""
+    parameters = {}
+    for parameter in operation.get('parameters', []):
+        parameter = resolve(spec, parameter)
+        schema = resolve(spec, parameter.get('schema', {}))
+        parameters[f"{parameter.get('in')}:{parameter['name']}"] = {
+            'required': bool(parameter.get('required')),
+            'type': schema_type(schema),
+            'default': schema.get('default'),
+        }
+    body = operation.get('requestBody', {}).get('content', {}).get('application/json', {}).get('schema', {})
+    responses = {status: response.get('content', {}).get('application/json', {}).get('schema', {})
+                 for status, response in operation.get('responses', {}).items()}
+    return {
+        'parameters': parameters,
+        'body': body.get('$ref') or body.get('type'),
+        'responses': {status: schema.get('$ref') or schema.get('type') for status, schema in responses.items()},
+    }
+
+
+def diff_operations(old_spec, new_spec):
+    """Endpoint-level changes between two OpenAPI documents"""
+    old_ops, new_ops = path_operations(old_spec), path_operations(new_spec)
+    changes = {'added': sorted(new_ops.keys() - old_ops.keys(), key=lambda k: (k[1], k[0])),
+               'removed': sorted(old_ops.keys() - new_ops.keys(), key=lambda k: (k[1], k[0])),
+               'changed': {}}
+    for key in sorted(old_ops.keys() & new_ops.keys(), key=lambda k: (k[1], k[0])):
+        old, new = operation_signature(old_spec, old_ops[key]), operation_signature(new_spec, new_ops[key])
+        notes = []
+        for name in sorted(old['parameters'].keys() | new['parameters'].keys()):
+            before, after = old['parameters'].get(name), new['parameters'].get(name)
+            if before is None:
+                notes.append(f"+ parameter {name}{' (required)' if after['required'] else ''}")
+            elif after is None:
+                notes.append(f'- parameter {name}')
+            elif before != after:
+                notes.append(f'~ parameter {name}: ' + ', '.join(
+                    f'{field} {before[field]!r} → {after[field]!r}' for field in before if before[field] != after[field]))
+        if old['body'] != new['body']:
+            notes.append(f"~ request body {old['body']} → {new['body']}")
+        for status in sorted(old['responses'].keys() | new['responses'].keys()):
+            if old['responses'].get(status) != new['responses'].get(status):
+                notes.append(f"~ response {status}: {old['responses'].get(status)} → {new['responses'].get(status)}")
+        if notes:
+            changes['changed'][key] = notes
+    return changes
+
+
+def diff_models(old_spec, new_spec):
+    """Component schema changes: models added/removed, properties added/removed/retyped, required flags"""
+    old_models = old_spec.get('components', {}).get('schemas', {})
+    new_models = new_spec.get('components', {}).get('schemas', {})
+    changes = {'added': sorted(new_models.keys() - old_models.keys()),
+               'removed': sorted(old_models.keys() - new_models.keys()), 'changed': {}}
+    for name in sorted(old_models.keys() & new_models.keys()):
+        old, new = old_models[name], new_models[name]
+        old_props, new_props = old.get('properties', {}), new.get('properties', {})
+        old_required, new_required = set(old.get('required', [])), set(new.get('required', []))
+        notes = [f'+ {prop}' + (' (required)' if prop in new_required else '')
+                 for prop in sorted(new_props.keys() - old_props.keys())]
+        notes += [f'- {prop}' for prop in sorted(old_props.keys() - new_props.keys())]
+        for prop in sorted(old_props.keys() & new_props.keys()):
+            before, after = schema_type(old_props[prop]), schema_type(new_props[prop])
+            if before != after or old_props[prop].get('$ref') != new_props[prop].get('$ref'):
+                notes.append(f"~ {prop}: {old_props[prop].get('$ref') or before} → "
+                             f"{new_props[prop].get('$ref') or after}")
+            if (prop in old_required) != (prop in new_required):
+                notes.append(f"~ {prop}: {'now required' if prop in new_required else 'now optional'}")
+        if notes:
+            changes['changed'][name] = notes
+    return changes
+
+
+def print_baselines(baselines, only=None):
+    print(f"   {'GET endpoint':<34} {'Status':<12} {'first':>8} {'p50':>8} {'Size':>10}")
+    for template, baseline in baselines.items():
+        if only is not None and template not in only:
+            continue
+        ok = set(baseline['statuses']) <= {'200'}
+        statuses = ','.join(f'{status}×{count}' for status, count in baseline['statuses'].items())
+        first = f"{baseline['first'] * 1000:.0f}ms" if baseline['first'] is not None else '-'
+        p50 = f"{baseline['p50'] * 1000:.0f}ms" if baseline['p50'] is not None else '-'
+        size = f"{baseline['bytes'] / 1024:.1f}KB" if baseline['bytes'] is not None else '-'
+        note = '  rate limited' if '429' in baseline['statuses'] else ''
+        print(f"{'✅' if ok else '⚠️ '} {template:<34} {statuses:<12} {first:>8} {p50:>8} {size:>10}{note}")
+    if any('429' in b['statuses'] for b in baselines.values()):
+        print('ℹ️  Rate limited endpoints stopped sampling at the first 429: raise --pause or --skip them')
+    if any(set(b['statuses']) - {'200', '429'} for b in baselines.values()):
+        print('ℹ️  Non-200 baselines need an example value in the schema (or SAMPLE_VALUES) to be meaningful')
+
+
+def print_diff(old, new, threshold=0.25):
+    """Contract changes plus baseline shifts beyond `threshold`"""
+    print(f"🔀 {old.get('version')} ({time.strftime('%Y-%m-%d %H:%M', time.localtime(old['taken_at']))}) → "
+          f"{new.get('version')} ({time.strftime('%Y-%m-%d %H:%M', time.localtime(new['taken_at']))})")
+    operations = diff_operations(old['openapi'], new['openapi'])
+    models = diff_models(old['openapi'], new['openapi'])
+
+    print('\n📋 Endpoints')
+    for method, path in operations['added']:
+        print(f'   + {method.upper():<6} {path}')
+    for method, path in operations['removed']:
+        print(f'   - {method.upper():<6} {path}')
+    for (method, path), notes in operations['changed'].items():
+        print(f'   ~ {method.upper():<6} {path}')
+        for note in notes:
+            print(f'       {note}')
+    if not any(operations.values()):
+        print('   No endpoint changes')
+
+    print('\n🧩 Models')
+    for name in models['added']:
+        print(f'   + {name}')
+    for name in models['removed']:
+        print(f'   - {name}')
+    for name, notes in models['changed'].items():
+        print(f'   ~ {name}: ' + '; '.join(notes))
+    if not any(models.values()):
+        print('   No model changes')
+
+    new_gets = {path for method, path in operations['added'] if method == 'get'}
+    changed_gets = {path for method, path in operations['changed'] if method == 'get'}
+    if new['baselines'] and (new_gets or changed_gets):
+        print('\n🆕 Baselines for new and changed GET endpoints')
+        print_baselines(new['baselines'], only=new_gets | changed_gets)
+
+    shared = [path for path in new['baselines'] if path in old['baselines']]
+    shifts = []
+    for path in shared:
+        before, after = old['baselines'][path], new['baselines'][path]
+        for field, label in (('p50', 'p50'), ('bytes', 'size')):
+            if before[field] and after[field] is not None and abs(after[field] / before[field] - 1) > threshold:
+                shifts.append((path, label, before[field], after[field]))
+    if shifts:
+        print(f'\n⏱️  Baseline shifts over {threshold:.0%}')
+        for path, label, before, after in shifts:
+            unit = (lambda v: f'{v * 1000:.0f}ms') if label == 'p50' else (lambda v: f'{v / 1024:.1f}KB')
+            print(f"{'⚠️ ' if after > before else '✅'} {path:<34} {label} {unit(before)} → {unit(after)} "
+                  f'({(after / before - 1) * 100:+.0f}%)')
+    elif shared:
+        print(f'\n✅ No baseline moved more than {threshold:.0%} across {len(shared)} shared GET endpoints')
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Snapshot, diff and baseline the backend OpenAPI contract')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    snapshot = commands.add_parser('snapshot', help='Save /openapi.json with GET endpoint baselines')
+    snapshot.add_argument('--out', default='contracts', help='Snapshot directory')
+    snapshot.add_argument('--no-baseline', action='store_true', help='Only save the schema')
+    snapshot.add_argument('--diff-with', metavar='SNAPSHOT', help='Diff against this snapshot after saving')
+
+    baseline = commands.add_parser('baseline', help='Measure every GET endpoint without saving')
+
+    for command in (snapshot, baseline):
+        command.add_argument('--base-url', default=RENDER_BASE_URL, help='Backend base URL')
+        command.add_argument('--samples', type=int, default=5, help='Requests per GET endpoint')
+        command.add_argument('--pause', type=float, default=1.0, help='Seconds between baseline requests')
+        command.add_argument('--skip', action='append', default=[], metavar='REGEX',
+                             help='Leave GET endpoints matching this path regex out of the baseline '
+                                  '(repeatable), e.g. ^/youtube/ to spend no YouTube quota')
+        add_standin_arguments(command)
+
+    diff = commands.add_parser('diff', help='Compare two snapshots')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=0.25, help='Report baseline shifts above this fraction')
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        print_diff(load_snapshot(args.old), load_snapshot(args.new), args.threshold)
+        return
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    try:
+        result = take_snapshot(base_url, args.samples, baseline=not getattr(args, 'no_baseline', False),
+                               pause=args.pause, skip=args.skip)
+    except httpx.HTTPError as e:
+        print(f'❌ Could not fetch {base_url}/openapi.json: {e}')
+        return
+    finally:
+        if standin:
+            standin.stop()
+
+    operations = sum(len(item) for item in result['openapi'].get('paths', {}).values())
+    print(f"📋 {base_url}: version {result['version']}, {operations} operations, "
+          f"{len(result['openapi'].get('components', {}).get('schemas', {}))} models")
+    if result['baselines']:
+        print_baselines(result['baselines'])
+    if args.command == 'snapshot':
+        path = save_snapshot(result, args.out)
+        print(f'💾 Saved {path}')
+        if args.diff_with:
+            print()
+            print_diff(load_snapshot(args.diff_with), result)
+
+
+if __name__ == '__main__':
+    main()
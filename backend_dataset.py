@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Synthetic Datasets for Scale Testing
+
+`generate` writes a seeded dataset of app users, their grocery lists and
+their meal-plan histories as JSON Lines (gzip-compressed with --compress),
+one user at a time, so any size fits in constant memory:
+
+- users.jsonl: nutrition targets and preferences, varied around the
+  representative USER_PROFILES
+- grocery_lists.jsonl: /ai-price/optimize-grocery payloads drawn from the
+  app's grocery price table
+- meal_plans.jsonl: past weekly plans built from the dishes (and their
+  nutrition) in lib/data/vietnamese_food_data.dart, each with the
+  /generate-weekly-meal request that would regenerate it
+
+`load` streams a dataset file into the endpoint it was generated for
+through backend_load.run_load, reading one line per request. The same
+seed always produces the same dataset, so 10x and 100x runs differ only
+in size.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import time
+
+from backend_client import LOCAL_BASE_URL
+from backend_load import print_load_report, run_load
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import open_trace
+from backend_workloads import DAYS_OF_WEEK, FOOD_PRICES, USER_PROFILES, ZipfSampler, grocery_item, profile_targets
+
+DISHES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib', 'data', 'vietnamese_food_data.dart')
+REGIONS = ['Hà Nội', 'TP.HCM', 'Đà Nẵng', 'Cần Thơ', 'Hải Phòng', 'Huế', 'Nha Trang']
+MEALS = ['breakfast', 'lunch', 'dinner']
+PRICES_BY_NAME = {entry[0]: entry for entry in FOOD_PRICES}
+
+# File name per record kind
+DATASET_FILES = {
+    'users': 'users.jsonl',
+    'grocery_lists': 'grocery_lists.jsonl',
+    'meal_plans': 'meal_plans.jsonl',
+}
+
+
+def parse_dart_dishes(path=DISHES_PATH):
+    """Name, serving and macros of every FoodItem in the app's Vietnamese food data"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    dishes = []
+    for block in source.split('FoodItem(')[1:]:
+        fields = dict(re.findall(r"\b(name|servingUnit): '([^']*)'", block))
+        numbers = dict(re.findall(r'\b(calories|protein|carbs|fat|fiber): ([\d.]+)', block))
+        if 'name' not in fields or 'calories' not in numbers:
+            continue
+        dishes.append({
+            'name': fields['name'],
+            'serving_unit': fields.get('servingUnit', 'phần'),
+            **{key: float(value) for key, value in numbers.items()},
+        })
+    return dishes
+
+
+def make_user(index, rng):
+    """A user varied around one of the representative profiles"""
+    profile = USER_PROFILES[index % len(USER_PROFILES)]
+    scale = rng.uniform(0.85, 1.15)
+    targets = profile_targets(profile)
+    for key in ('calories_target', 'protein_target', 'fat_target', 'carbs_target'):
+        targets[key] = round(targets[key] * scale)
+    return {
+        'user_id': f'user_{index:07d}',
+        'profile': profile['name'],
+        'region': rng.choice(REGIONS),
+        # Weekly grocery budget grows with the calories to feed
+        'budget_limit': round(targets['calories_target'] * rng.uniform(250, 450), -4),
+        **targets,
+    }
+
+
+def make_grocery_list(user, rng, sampler, median_size):
+    """An optimize-grocery payload with a long-tailed number of items"""
+    size = max(3, min(len(FOOD_PRICES), round(rng.lognormvariate(math.log(median_size), 0.6))))
+    names = []
+    while len(names) < size:
+        name = sampler.sample()
+        if name not in names:
+            names.append(name)
+    return {
+        'user_id': user['user_id'],
+        'grocery_items': [grocery_item(PRICES_BY_NAME[name], rng) for name in names],
+        'budget_limit': user['budget_limit'],
+        'analysis_type': 'comprehensive',
+        'include_ai_insights': True,
+    }
+
+
+def make_meal_plan(user, week, rng, dishes):
+    """A past week of meals scaled to the user's calorie target"""
+    days = {}
+    for day in DAYS_OF_WEEK:
+        meals = {}
+        for meal, share in zip(MEALS, (0.25, 0.40, 0.35)):
+            dish = rng.choice(dishes)
+            servings = round(user['calories_target'] * share / dish['calories'], 1)
+            meals[meal] = {
+                'name': dish['name'],
+                'servings': servings,
+                'serving_unit': dish['serving_unit'],
+                'nutrition': {key: round(dish[key] * servings, 1)
+                              for key in ('calories', 'protein', 'carbs', 'fat') if key in dish},
+            }
+        days[day] = {
+            'day_of_week': day,
+            **meals,
+            'nutrition_summary': {key: round(sum(meal['nutrition'].get(key, 0) for meal in meals.values()), 1)
+                                  for key in ('calories', 'protein', 'carbs', 'fat')},
+        }
+    request = {key: value for key, value in user.items() if key not in ('profile', 'region', 'budget_limit')}
+    return {'user_id': user['user_id'], 'week': week, 'request': request, 'weekly_plan': days}
+
+
+def generate_dataset(out_dir, users=1000, lists_per_user=2, weeks=4, median_list_size=25, seed=0,
+                     compress=False, dishes_path=DISHES_PATH):
+    """Write the dataset files one user at a time; returns {kind: (path, records)}"""
+    dishes = parse_dart_dishes(dishes_path)
+    rng = random.Random(seed)
+    # Popularity follows a seeded shuffle of the price table, so staples differ per seed
+    popular = [entry[0] for entry in FOOD_PRICES]
+    rng.shuffle(popular)
+    sampler = ZipfSampler(popular, s=0.9, seed=seed)
+
+    os.makedirs(out_dir, exist_ok=True)
+    suffix = '.gz' if compress else ''
+    paths = {kind: os.path.join(out_dir, name + suffix) for kind, name in DATASET_FILES.items()}
+    files = {kind: open_trace(path, 'w') for kind, path in paths.items()}
+    counts = dict.fromkeys(paths, 0)
+
+    def write(kind, record):
+        files[kind].write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        counts[kind] += 1
+
+    try:
+        for index in range(users):
+            user = make_user(index, rng)
+            write('users', user)
+            for _ in range(lists_per_user):
+                write('grocery_lists', make_grocery_list(user, rng, sampler, median_list_size))
+            for week in range(weeks):
+                write('meal_plans', make_meal_plan(user, week, rng, dishes))
+    finally:
+        for f in files.values():
+            f.close()
+    return {kind: (paths[kind], counts[kind]) for kind in paths}
+
+
+def read_dataset(path):
+    """Yield the records of a dataset file one at a time"""
+    with open_trace(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def dataset_scenarios(path, limit=None):
+    """Lazily turn a dataset file into run_load scenarios for the endpoint it feeds"""
+    for index, record in enumerate(read_dataset(path)):
+        if limit is not None and index >= limit:
+            return
+        if 'grocery_items' in record:
+            yield {'name': 'Optimize Grocery', 'method': 'POST', 'path': '/ai-price/optimize-grocery',
+                   'json': {key: value for key, value in record.items() if key != 'user_id'}}
+        elif 'weekly_plan' in record:
+            yield {'name': 'Generate Weekly', 'method': 'POST', 'path': '/generate-weekly-meal',
+                   'json': record['request']}
+        else:
+            targets = {key: value for key, value in record.items()
+                       if key not in ('user_id', 'profile', 'region', 'budget_limit')}
+            yield {'name': 'Generate Plan', 'method': 'POST', 'path': '/api/meal-plan/generate',
+                   'params': {'user_id': record['user_id'], 'use_ai': 'true'}, 'json': targets}
+
+
+def print_dataset_summary(written, elapsed):
+    print(f'✅ Generated in {elapsed:.1f}s')
+    for kind, (path, count) in written.items():
+        size = os.path.getsize(path)
+        print(f'   {kind:<14} {count:>10,} records {size / 2**20:>9.1f}MB  '
+              f'({size / count if count else 0:,.0f} bytes/record)  {path}')
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Generate and replay synthetic scale-test datasets')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Write a seeded dataset')
+    generate.add_argument('--out', default='dataset', help='Output directory')
+    generate.add_argument('--users', type=int, default=1000, help='Users at 1x scale')
+    generate.add_argument('--scale', type=float, default=1, help='Multiply --users, e.g. 10 or 100')
+    generate.add_argument('--lists-per-user', type=int, default=2, help='Grocery lists per user')
+    generate.add_argument('--weeks', type=int, default=4, help='Weeks of meal-plan history per user')
+    generate.add_argument('--median-list-size', type=int, default=25, help='Median grocery list length')
+    generate.add_argument('--compress', action='store_true', help='gzip the files (.jsonl.gz)')
+    generate.add_argument('--dishes', default=DISHES_PATH, help='Dart file with the FoodItem dishes')
+    generate.add_argument('--seed', type=int, default=0)
+
+    load = commands.add_parser('load', help='Stream a dataset file into its endpoint')
+    load.add_argument('dataset', help='users, grocery_lists or meal_plans file')
+    load.add_argument('--base-url', default=LOCAL_BASE_URL, help='Backend base URL')
+    load.add_argument('--concurrency', type=int, default=10, help='Concurrent workers')
+    load.add_argument('--rate', type=float, help='Target requests per second across all workers')
+    load.add_argument('--duration', type=float, help='Stop after this many seconds')
+    load.add_argument('--requests', type=int, help='Only send the first N records')
+    add_results_arguments(load)
+    add_standin_arguments(load)
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        users = round(args.users * args.scale)
+        print(f'🏭 Generating {users:,} users (seed {args.seed}) into {args.out}/')
+        start = time.perf_counter()
+        written = generate_dataset(args.out, users=users, lists_per_user=args.lists_per_user, weeks=args.weeks,
+                                   median_list_size=args.median_list_size, seed=args.seed,
+                                   compress=args.compress, dishes_path=args.dishes)
+        print_dataset_summary(written, time.perf_counter() - start)
+        return
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'backend_dataset', base_url, dataset=args.dataset)
+    print(f'🚚 Streaming {args.dataset} into {base_url} ({args.concurrency} workers)')
+    try:
+        report = asyncio.run(run_load(
+            base_url,
+            dataset_scenarios(args.dataset, limit=args.requests),
+            concurrency=args.concurrency,
+            rate=args.rate,
+            duration=args.duration,
+            recorder=recorder,
+        ))
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+    print_load_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Concurrent Load Generator for Backend Endpoints
+"""
+
+import asyncio
+import itertools
+import math
+import random
+import time
+
+import httpx
+
+from backend_client import AsyncBackendClient
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return sorted_values[lower]
+    weight = rank - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def fit_line(points):
+    """Least-squares (intercept, slope) for (x, y) points"""
+    n = len(points)
+    if n < 2:
+        return (points[0][1] if points else 0.0), 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return mean_y, 0.0
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    return mean_y - slope * mean_x, slope
+
+
+class EndpointStats:
+    """Latency samples and error counts for one scenario"""
+
+    def __init__(self, name):
+        self.name = name
+        self.requests = 0
+        self.errors = 0
+        self.latencies = []
+        self.status_counts = {}
+
+    def record(self, latency, status=None, error=False):
+        """Record one request; latency is None when no response arrived"""
+        self.requests += 1
+        if error:
+            self.errors += 1
+        if status is not None:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def summary(self, elapsed):
+        """Summarize latency percentiles, throughput and error rate"""
+        latencies = sorted(self.latencies)
+        return {
+            'name': self.name,
+            'requests': self.requests,
+            'errors': self.errors,
+            'error_rate': self.errors / self.requests if self.requests else 0.0,
+            'throughput': self.requests / elapsed if elapsed > 0 else 0.0,
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else 0.0,
+            'status_counts': dict(self.status_counts),
+        }
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram with bounded relative error.
+
+    Values land in log-spaced buckets `precision` apart, so memory stays
+    constant however many requests are recorded and any percentile is
+    accurate to within `precision` of the true value.
+    """
+
+    def __init__(self, lowest=0.0001, precision=0.01):
+        self.lowest = lowest
+        self.log_ratio = math.log1p(precision)
+        self.counts = {}
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, value):
+        index = 0 if value <= self.lowest else math.ceil(math.log(value / self.lowest) / self.log_ratio)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct):
+        """Upper edge of the bucket holding the pct-th percentile, capped at the max"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.lowest * math.exp(index * self.log_ratio), self.max)
+        return self.max
+
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def parse_duration(text):
+    """Seconds from '90', '90s', '30m' or '4h'"""
+    text = str(text).strip().lower()
+    if text and text[-1] in DURATION_UNITS:
+        return float(text[:-1]) * DURATION_UNITS[text[-1]]
+    return float(text)
+
+
+def arrival_times(schedule, rate, duration, seed=0, ramp_start=None, ramp_step=None, step_duration=10):
+    """
+    Send offsets in seconds for an open-loop arrival schedule.
+
+    `constant` spaces sends 1/rate apart, `poisson` draws exponential gaps
+    with mean 1/rate, and `ramp` steps from `ramp_start` up by `ramp_step`
+    every `step_duration` seconds until `rate` (then holds it to `duration`).
+    """
+    if schedule == 'constant':
+        return [i / rate for i in range(int(rate * duration))]
+    if schedule == 'poisson':
+        rng = random.Random(seed)
+        offsets, t = [], rng.expovariate(rate)
+        while t < duration:
+            offsets.append(t)
+            t += rng.expovariate(rate)
+        return offsets
+    if schedule == 'ramp':
+        current = ramp_start or ramp_step or rate
+        step = ramp_step or current
+        offsets, t = [], 0.0
+        while t < duration:
+            step_end = min(t + step_duration, duration)
+            offsets += [t + i / current for i in range(int((step_end - t) * current))]
+            t = step_end
+            current = min(rate, current + step)
+        return offsets
+    raise ValueError(f'unknown schedule {schedule!r}')
+
+
+async def run_open_loop(base_url, scenarios, offsets, max_in_flight=256, timeout=None,
+                        step_duration=None, recorder=None):
+    """
+    Send one request per offset on schedule, whatever the response times.
+
+    Latency is recorded twice per scenario: `service` from the actual send
+    and `corrected` from the scheduled send. The corrected histogram counts
+    the time a request waited behind slow ones (in our client when
+    `max_in_flight` is reached, or in the server's queue), which a
+    closed-loop generator leaves out (coordinated omission). Failed
+    requests count toward `corrected` too, up to when they failed, so a
+    timeout storm does not make the tail look better. With `step_duration`,
+    corrected latency is also bucketed per step of the schedule, e.g. per
+    rate of a ramp.
+    """
+    names = list(dict.fromkeys(scenario['name'] for scenario in scenarios))
+    results = {name: {'service': LatencyHistogram(), 'corrected': LatencyHistogram(),
+                      'requests': 0, 'errors': 0} for name in names}
+    picker = itertools.cycle(scenarios)
+    in_flight = asyncio.Semaphore(max_in_flight)
+    lags = LatencyHistogram()
+    steps = {}
+
+    async with AsyncBackendClient(base_url, retries=0, max_connections=max_in_flight,
+                                  recorder=recorder) as client:
+        start = time.perf_counter()
+
+        async def send(scenario, offset):
+            scheduled = start + offset
+            async with in_flight:
+                sent = time.perf_counter()
+                lags.record(sent - scheduled)
+                latency, _, error = await _send(client, scenario, timeout)
+            done = time.perf_counter()
+            result = results[scenario['name']]
+            result['requests'] += 1
+            if error:
+                result['errors'] += 1
+            if latency is not None:
+                result['service'].record(latency)
+            result['corrected'].record(done - scheduled)
+            if step_duration:
+                step = steps.setdefault(int(offset // step_duration),
+                                        {'requests': 0, 'errors': 0, 'corrected': LatencyHistogram()})
+                step['requests'] += 1
+                step['errors'] += bool(error)
+                step['corrected'].record(done - scheduled)
+
+        tasks = []
+        for offset in offsets:
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(next(picker), offset)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {'elapsed': elapsed, 'scheduled': len(offsets), 'send_lag': lags,
+            'endpoints': results, 'steps': dict(sorted(steps.items()))}
+
+
+class RatePacer:
+    """Hands out evenly spaced send slots shared by all workers"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = None
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.perf_counter()
+            if self.next_slot is None or self.next_slot < now:
+                self.next_slot = now
+            slot = self.next_slot
+            self.next_slot += self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _send(client, scenario, timeout=None):
+    """
+    Send one scenario request and return (latency, status, error).
+
+    The body is `json` or, for raw text such as a recorded non-JSON body,
+    `content`. Without `params` a query string in `path` goes out as is.
+    """
+    options = {'timeout': timeout} if timeout else {}
+    if scenario.get('params') is not None:
+        options['params'] = scenario['params']
+    if scenario.get('json') is not None:
+        options['json'] = scenario['json']
+    elif scenario.get('content') is not None:
+        options['content'] = scenario['content']
+    start = time.perf_counter()
+    try:
+        response = await client.request(scenario.get('method', 'GET'), scenario['path'], **options)
+        await response.aread()
+    except httpx.HTTPError:
+        return None, None, True
+    latency = time.perf_counter() - start
+    return latency, response.status_code, response.status_code >= 400
+
+
+async def run_load(base_url, scenarios, concurrency=10, rate=None,
+                   duration=None, total_requests=None, timeout=None, recorder=None):
+    """
+    Drive scenarios from concurrent workers sharing one pooled client.
+
+    Stops after `duration` seconds or `total_requests` requests, whichever
+    comes first (30 seconds if neither is given). With `rate` set, sends are
+    paced to that many requests per second across all workers. Timeouts
+    default to the per-endpoint budgets and connection errors are not
+    retried, so they show up in the error rate. A `recorder` receives
+    every request (see backend_results.ResultWriter).
+
+    A list of scenarios is cycled; any other iterable (e.g. a dataset file
+    read line by line) is consumed lazily and each scenario is sent once,
+    ending the run when it is exhausted.
+    """
+    if isinstance(scenarios, (list, tuple)):
+        if duration is None and total_requests is None:
+            duration = 30
+        # Scenarios sharing a name (e.g. one per user profile) are reported together
+        names = list(dict.fromkeys(scenario['name'] for scenario in scenarios))
+        picker = itertools.cycle(scenarios)
+    else:
+        names = []
+        picker = iter(scenarios)
+    stats = {name: EndpointStats(name) for name in names}
+    pacer = RatePacer(rate) if rate else None
+    sent = itertools.count()
+
+    async with AsyncBackendClient(base_url, retries=0, max_connections=concurrency,
+                                  recorder=recorder) as client:
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+
+        async def worker():
+            while True:
+                if total_requests is not None and next(sent) >= total_requests:
+                    return
+                if pacer:
+                    await pacer.wait()
+                if deadline and time.perf_counter() >= deadline:
+                    return
+                scenario = next(picker, None)
+                if scenario is None:
+                    return
+                if scenario['name'] not in stats:
+                    names.append(scenario['name'])
+                    stats[scenario['name']] = EndpointStats(scenario['name'])
+                latency, status, error = await _send(client, scenario, timeout)
+                stats[scenario['name']].record(latency, status, error)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        'elapsed': elapsed,
+        'concurrency': concurrency,
+        'rate': rate,
+        'endpoints': [stats[name].summary(elapsed) for name in names],
+    }
+
+
+def print_load_report(report):
+    """Print per-endpoint latency percentiles, throughput and error rate"""
+    print("\n" + "=" * 78)
+    print(f"📊 Load Report ({report['concurrency']} workers, "
+          f"{report['elapsed']:.1f}s"
+          + (f", target {report['rate']:.1f} req/s)" if report['rate'] else ")"))
+    print("-" * 78)
+    print(f"   {'Endpoint':<20} {'Reqs':>6} {'RPS':>7} {'Err%':>6} "
+          f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+
+    for summary in report['endpoints']:
+        print(f"   {summary['name']:<20} {summary['requests']:>6} "
+              f"{summary['throughput']:>7.1f} {summary['error_rate'] * 100:>5.1f}% "
+              f"{summary['p50'] * 1000:>6.0f}ms {summary['p90'] * 1000:>6.0f}ms "
+              f"{summary['p99'] * 1000:>6.0f}ms {summary['max'] * 1000:>6.0f}ms")
+
+    total = sum(summary['requests'] for summary in report['endpoints'])
+    errors = sum(summary['errors'] for summary in report['endpoints'])
+    print("-" * 78)
+    print(f"   {'Total':<20} {total:>6} {total / report['elapsed']:>7.1f} "
+          f"{(errors / total * 100) if total else 0:>5.1f}%")
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Continuous Latency Monitor for the Render Backend
+
+Probes the test_render_endpoints.py requests one at a time on a fixed
+interval, keeps rolling latency histograms and availability per endpoint
+in memory, appends a snapshot to a JSON Lines file every --flush-interval
+and serves Prometheus text metrics on --metrics-port.
+
+Two kinds of slow period are tracked as events:
+
+- cold starts: a health probe slower than --cold-start-threshold (Render
+  holds requests while a sleeping instance boots, so the health probe gets
+  --cold-start-timeout instead of the usual 10 seconds)
+- cache resets: /youtube/cache/stats total_entries dropping, or a probe of
+  a fixed query that had been cached coming back with cached: false
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from backend_client import RENDER_BASE_URL, BackendClient
+from backend_load import LatencyHistogram, parse_duration
+from backend_results import response_cached_flag
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import RENDER_SCENARIOS
+
+# Upper bounds of the Prometheus histogram buckets in seconds
+PROMETHEUS_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+QUANTILES = [50, 90, 99]
+
+
+class RollingWindow:
+    """Latency histogram and request counts over the last `span` seconds, in `slot`-second slots"""
+
+    def __init__(self, span=3600, slot=60):
+        self.span = span
+        self.slot = slot
+        self.slots = {}
+
+    def record(self, now, latency, ok):
+        key = int(now // self.slot)
+        histogram, requests, errors = self.slots.get(key) or (LatencyHistogram(), 0, 0)
+        if latency is not None:
+            histogram.record(latency)
+        self.slots[key] = (histogram, requests + 1, errors + (not ok))
+        oldest = int((now - self.span) // self.slot)
+        for stale in [k for k in self.slots if k <= oldest]:
+            del self.slots[stale]
+
+    def snapshot(self):
+        """(merged histogram, requests, errors) across the live slots"""
+        merged, requests, errors = LatencyHistogram(), 0, 0
+        for histogram, slot_requests, slot_errors in self.slots.values():
+            merged.merge(histogram)
+            requests += slot_requests
+            errors += slot_errors
+        return merged, requests, errors
+
+
+class EndpointMonitor:
+    """Rolling and lifetime state for one probed endpoint"""
+
+    def __init__(self, name, window, slot):
+        self.name = name
+        self.rolling = RollingWindow(window, slot)
+        self.requests = 0
+        self.errors = 0
+        self.observations = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * len(PROMETHEUS_BUCKETS)
+        self.last_success = None
+        self.last_cached = None
+
+    def record(self, now, latency, ok):
+        self.rolling.record(now, latency, ok)
+        self.requests += 1
+        self.errors += not ok
+        if latency is not None:
+            self.observations += 1
+            self.latency_sum += latency
+            for index, bound in enumerate(PROMETHEUS_BUCKETS):
+                if latency <= bound:
+                    self.buckets[index] += 1
+        if ok:
+            self.last_success = now
+
+    def summary(self):
+        """Rolling-window counts and latency; latency fields are None when no probe got a response"""
+        histogram, requests, errors = self.rolling.snapshot()
+        latency = histogram.count > 0
+        return {
+            'requests': requests,
+            'errors': errors,
+            'availability': (requests - errors) / requests if requests else None,
+            **{f'p{q}': histogram.percentile(q) if latency else None for q in QUANTILES},
+            'max': histogram.max if latency else None,
+        }
+
+
+class Monitor:
+    """Probe loop state shared with the metrics endpoint"""
+
+    def __init__(self, base_url, scenarios=RENDER_SCENARIOS, window=3600, slot=60,
+                 cold_start_threshold=5.0, cold_start_timeout=120.0):
+        self.base_url = base_url
+        self.scenarios = scenarios
+        self.cold_start_threshold = cold_start_threshold
+        self.cold_start_timeout = cold_start_timeout
+        self.endpoints = {s['name']: EndpointMonitor(s['name'], window, slot) for s in scenarios}
+        self.counters = {'probes': 0, 'cold_starts': 0, 'cache_resets': 0, 'cache_misses': 0}
+        self.events = []
+        self.last_entries = None
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def event(self, kind, endpoint, **details):
+        record = {'time': time.time(), 'event': kind, 'endpoint': endpoint, **details}
+        with self.lock:
+            self.events.append(record)
+        print(f"⚠️  {time.strftime('%Y-%m-%d %H:%M:%S')} {kind} on {endpoint}: "
+              + ', '.join(f'{key}={value}' for key, value in details.items()))
+
+    def probe(self, client, scenario):
+        """Send one scenario and record it; returns the response or None"""
+        is_health = scenario['path'] == '/'
+        options = {'timeout': httpx.Timeout(self.cold_start_timeout, connect=10)} if is_health else {}
+        start = time.perf_counter()
+        try:
+            response = client.request(scenario.get('method', 'GET'), scenario['path'],
+                                      params=scenario.get('params'), json=scenario.get('json'), **options)
+            latency, ok = time.perf_counter() - start, response.status_code < 400
+        except httpx.HTTPError:
+            response, latency, ok = None, None, False
+
+        endpoint = self.endpoints[scenario['name']]
+        with self.lock:
+            endpoint.record(time.time(), latency, ok)
+        if is_health and latency is not None and latency >= self.cold_start_threshold:
+            self.counters['cold_starts'] += 1
+            self.event('cold_start', scenario['name'], latency=round(latency, 2))
+        if response is not None and ok:
+            self.check_cache(scenario, endpoint, response)
+        return response
+
+    def check_cache(self, scenario, endpoint, response):
+        """Detect cache resets from the stats entry count and the cached flag"""
+        if scenario['path'] == '/youtube/cache/stats':
+            try:
+                entries = response.json().get('total_entries')
+            except ValueError:
+                return
+            if self.last_entries is not None and entries is not None and entries < self.last_entries:
+                self.counters['cache_resets'] += 1
+                self.event('cache_reset', scenario['name'], entries_before=self.last_entries, entries=entries)
+            self.last_entries = entries
+            return
+        cached = response_cached_flag(response)
+        if cached is False and endpoint.last_cached:
+            # The same query was cached on the previous probe, so something dropped it
+            self.counters['cache_misses'] += 1
+            self.event('cache_miss', scenario['name'], latency=round(response.elapsed.total_seconds(), 2))
+        endpoint.last_cached = cached
+
+    def probe_all(self, client):
+        for scenario in self.scenarios:
+            self.probe(client, scenario)
+        self.counters['probes'] += 1
+
+    def snapshot(self):
+        """Rolling summaries and events since the last snapshot, for the flush file"""
+        with self.lock:
+            events, self.events = self.events, []
+            endpoints = {name: endpoint.summary() for name, endpoint in self.endpoints.items()}
+        return {'time': time.time(), 'base_url': self.base_url, **self.counters,
+                'endpoints': endpoints, 'events': events}
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP openfood_probe_latency_seconds Probe latency since the monitor started',
+            '# TYPE openfood_probe_latency_seconds histogram',
+        ]
+        with self.lock:
+            endpoints = list(self.endpoints.values())
+            summaries = {endpoint.name: endpoint.summary() for endpoint in endpoints}
+            for endpoint in endpoints:
+                label = f'endpoint="{endpoint.name}"'
+                for bound, count in zip(PROMETHEUS_BUCKETS, endpoint.buckets):
+                    lines.append(f'openfood_probe_latency_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'openfood_probe_latency_seconds_bucket{{{label},le="+Inf"}} {endpoint.observations}')
+                lines.append(f'openfood_probe_latency_seconds_sum{{{label}}} {endpoint.latency_sum:.6f}')
+                lines.append(f'openfood_probe_latency_seconds_count{{{label}}} {endpoint.observations}')
+
+            lines += ['# HELP openfood_probe_requests_total Probes sent, by outcome',
+                      '# TYPE openfood_probe_requests_total counter']
+            for endpoint in endpoints:
+                label = f'endpoint="{endpoint.name}"'
+                lines.append(f'openfood_probe_requests_total{{{label},outcome="success"}} '
+                             f'{endpoint.requests - endpoint.errors}')
+                lines.append(f'openfood_probe_requests_total{{{label},outcome="error"}} {endpoint.errors}')
+
+            lines += ['# HELP openfood_probe_rolling_latency_seconds Latency quantiles over the rolling window',
+                      '# TYPE openfood_probe_rolling_latency_seconds gauge']
+            for name, summary in summaries.items():
+                # Omitted rather than 0 when every probe in the window failed
+                if summary['max'] is None:
+                    continue
+                for q in QUANTILES:
+                    lines.append(f'openfood_probe_rolling_latency_seconds{{endpoint="{name}",quantile="{q / 100}"}} '
+                                 f'{summary[f"p{q}"]:.6f}')
+
+            lines += ['# HELP openfood_probe_availability Successful probe share over the rolling window',
+                      '# TYPE openfood_probe_availability gauge']
+            for name, summary in summaries.items():
+                if summary['availability'] is not None:
+                    lines.append(f'openfood_probe_availability{{endpoint="{name}"}} {summary["availability"]:.4f}')
+
+            lines += ['# HELP openfood_probe_last_success_timestamp_seconds Time of the last successful probe',
+                      '# TYPE openfood_probe_last_success_timestamp_seconds gauge']
+            for endpoint in endpoints:
+                if endpoint.last_success:
+                    lines.append(f'openfood_probe_last_success_timestamp_seconds{{endpoint="{endpoint.name}"}} '
+                                 f'{endpoint.last_success:.0f}')
+
+        lines += ['# TYPE openfood_cold_starts_total counter',
+                  f'openfood_cold_starts_total {self.counters["cold_starts"]}',
+                  '# TYPE openfood_cache_resets_total counter',
+                  f'openfood_cache_resets_total {self.counters["cache_resets"]}',
+                  '# TYPE openfood_cache_misses_total counter',
+                  f'openfood_cache_misses_total {self.counters["cache_misses"]}',
+                  '# TYPE openfood_monitor_start_time_seconds gauge',
+                  f'openfood_monitor_start_time_seconds {self.started:.0f}']
+        return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(monitor, port, host='127.0.0.1'):
+    """Serve monitor.prometheus_text() at /metrics from a daemon thread"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = monitor.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def print_snapshot(snapshot):
+    print(f"\n📊 {time.strftime('%Y-%m-%d %H:%M:%S')} after {snapshot['probes']} probe rounds "
+          f"({snapshot['cold_starts']} cold starts, {snapshot['cache_resets']} cache resets, "
+          f"{snapshot['cache_misses']} cache misses)")
+    for name, summary in snapshot['endpoints'].items():
+        availability = summary['availability']
+        status = '✅' if availability == 1 else '⚠️ ' if availability else '❌'
+        if summary['max'] is None:
+            latency = 'no responses'
+        else:
+            latency = (f"p50 {summary['p50'] * 1000:>6.0f}ms  p99 {summary['p99'] * 1000:>6.0f}ms  "
+                       f"max {summary['max'] * 1000:>6.0f}ms")
+        print(f"{status} {name:<18} {summary['requests']:>5} probes "
+              f"{(availability or 0) * 100:>6.2f}% up  {latency}")
+
+
+def run_monitor(monitor, interval=60, flush_interval=300, out=None, duration=None):
+    """Probe every `interval` seconds until `duration` passes or Ctrl-C, flushing snapshots"""
+    deadline = time.monotonic() + duration if duration else None
+    next_probe = next_flush = time.monotonic()
+    next_flush += flush_interval
+    with BackendClient(monitor.base_url, retries=0) as client:
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                monitor.probe_all(client)
+                next_probe += interval
+                if time.monotonic() >= next_flush:
+                    flush(monitor, out)
+                    next_flush += flush_interval
+                time.sleep(max(0.0, next_probe - time.monotonic()))
+        except KeyboardInterrupt:
+            print('\n⏹️  Monitor stopped')
+        finally:
+            flush(monitor, out)
+
+
+def flush(monitor, out):
+    snapshot = monitor.snapshot()
+    print_snapshot(snapshot)
+    if out:
+        with open(out, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(snapshot, ensure_ascii=False) + '\n')
+
+
+def main():
+    """Run the monitor"""
+    parser = argparse.ArgumentParser(description='Continuously probe the backend and export latency metrics')
+    parser.add_argument('--base-url', default=RENDER_BASE_URL, help='Backend base URL')
+    parser.add_argument('--interval', type=parse_duration, default=60, help='Seconds between probe rounds')
+    parser.add_argument('--window', type=parse_duration, default=parse_duration('1h'),
+                        help='Rolling window for percentiles and availability, e.g. 15m or 1h')
+    parser.add_argument('--flush-interval', type=parse_duration, default=parse_duration('5m'),
+                        help='How often to append a snapshot to --out')
+    parser.add_argument('--out', default='monitor.jsonl', help='Snapshot file (JSON Lines); "" to disable')
+    parser.add_argument('--metrics-port', type=int, default=9108,
+                        help='Port for the Prometheus /metrics endpoint; 0 to disable')
+    parser.add_argument('--metrics-host', default='127.0.0.1')
+    parser.add_argument('--cold-start-threshold', type=float, default=5.0,
+                        help='Health probe seconds that count as a cold start')
+    parser.add_argument('--cold-start-timeout', type=float, default=120.0,
+                        help='Health probe budget, long enough to wait out a cold start')
+    parser.add_argument('--endpoint', action='append', choices=[s['name'] for s in RENDER_SCENARIOS],
+                        help='Only probe these endpoints (repeatable)')
+    parser.add_argument('--duration', type=parse_duration, help='Stop after this long (default: run until Ctrl-C)')
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    scenarios = [s for s in RENDER_SCENARIOS if not args.endpoint or s['name'] in args.endpoint]
+    monitor = Monitor(base_url, scenarios, window=args.window, slot=max(1, min(60, args.window / 60)),
+                      cold_start_threshold=args.cold_start_threshold, cold_start_timeout=args.cold_start_timeout)
+
+    print('🩺 Backend Latency Monitor')
+    print('=' * 78)
+    print(f'📡 Target: {base_url}')
+    print(f'⏱️  Probing {len(scenarios)} endpoints every {args.interval:g}s, '
+          f'{args.window / 60:g} min rolling window')
+    metrics = None
+    if args.metrics_port:
+        metrics = serve_metrics(monitor, args.metrics_port, args.metrics_host)
+        print(f'📈 Metrics at http://{args.metrics_host}:{metrics.server_address[1]}/metrics')
+    if args.out:
+        print(f'📝 Snapshots every {args.flush_interval:g}s to {args.out}')
+
+    try:
+        run_monitor(monitor, interval=args.interval, flush_interval=args.flush_interval,
+                    out=args.out or None, duration=args.duration)
+    finally:
+        if metrics:
+            metrics.shutdown()
+        if standin:
+            standin.stop()
+
+
+if __name__ == '__main__':
+    main()
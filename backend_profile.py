@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Sampling CPU Profiles of the Local Backend During Load
+
+With --cpu-profile the load modes sample the backend's Python stacks while
+the scenario runs, then write flamegraph-ready collapsed stacks and print
+CPU time per endpoint next to the latency report:
+
+- --cpu-profile-server CMD launches the local server (e.g. "uvicorn
+  main:app --port 8000") under py-spy, or, when py-spy is not installed,
+  under this module's `wrap` command, which samples sys._current_frames
+  from inside the server process
+- --cpu-profile-pid PID attaches py-spy to a server that is already running
+- with --standin the in-process stand-in is sampled directly
+
+Only on-CPU time is counted (py-spy skips idle threads; the sampler weights
+stacks by each thread's CPU time from /proc/self/task/*/schedstat), so a
+request's latency minus its CPU time is time spent waiting: upstream API
+calls, sleeps, the GIL or the accept queue. Stacks are attributed to the
+endpoint whose handler function is on them, using the function names in
+the server's /openapi.json operationIds; work done outside the handler
+(FastAPI's response serialization, the server loop) shows up as
+"(outside handlers)". CPU a thread used between two samples that both
+found it parked in I/O is charged to the frames live at both samples, or
+shows up as "(unattributed)" when there are none.
+
+The collapsed file has one "endpoint;frame;...;frame milliseconds" line per
+stack and feeds straight into flamegraph.pl, speedscope or inferno.
+"""
+
+import argparse
+import atexit
+import os
+import platform
+import re
+import runpy
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from backend_client import HTTP_METHODS, BackendClient
+
+# Frames whose CPU is JSON encoding or decoding
+JSON_FUNCTIONS = {
+    'dumps', 'loads', 'encode', 'iterencode', '_iterencode', 'raw_decode', 'decode',
+    'jsonable_encoder', 'serialize_response', 'model_dump', 'model_dump_json',
+}
+
+# Leaf frames of a thread parked in I/O or a lock
+WAIT_FUNCTIONS = {
+    'select', 'poll', 'wait', 'acquire', 'recv', 'recv_into', 'readinto', 'readline', 'read',
+    'accept', 'connect', 'getaddrinfo', 'do_handshake', '_wait_for_tstate_lock',
+}
+
+# futex syscall number per architecture: a thread blocked in it is waiting for the GIL (or a lock)
+FUTEX_SYSCALLS = {'x86_64': 202, 'aarch64': 98, 'i686': 240, 'armv7l': 240}
+FUTEX = FUTEX_SYSCALLS.get(platform.machine())
+
+OUTSIDE_HANDLERS = '(outside handlers)'
+UNATTRIBUTED = '(unattributed)'
+FRAME_PATTERN = re.compile(r'^(?P<name>.*?) \((?P<file>[^():]*)(?::\d+)?\)$')
+
+
+def frame_name(frame):
+    """Function name of a collapsed frame such as 'handle_search (backend_standin.py)'"""
+    match = FRAME_PATTERN.match(frame)
+    return (match.group('name') if match else frame).rsplit('.', 1)[-1]
+
+
+def frame_stack(frame):
+    """Collapsed frames of a live Python stack, outermost first, in py-spy's --nolineno format"""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f'{code.co_name} ({os.path.basename(code.co_filename)})')
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def frame_chain(frame):
+    """Frame objects of a live Python stack, outermost first; a frame keeps its identity until it returns"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    return frames[::-1]
+
+
+def thread_cpu(native_id):
+    """CPU seconds a thread of this process has run, or None where /proc has no schedstat"""
+    try:
+        with open(f'/proc/self/task/{native_id}/schedstat') as f:
+            return int(f.read().split()[0]) / 1e9
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def in_blocking_call(native_id):
+    """
+    True when a thread is blocked in a system call other than futex.
+
+    That is a C call that gave up the GIL to sleep or wait on I/O (time.sleep,
+    socket reads, select), which its Python frames do not show. Threads
+    waiting for the GIL block in futex and count as working; False where
+    /proc/self/task/*/syscall is unavailable.
+    """
+    if FUTEX is None:
+        return False
+    try:
+        with open(f'/proc/self/task/{native_id}/syscall') as f:
+            state = f.read().split()[0]
+    except (OSError, IndexError):
+        return False
+    return state.isdigit() and int(state) != FUTEX
+
+
+class StackSampler:
+    """
+    Samples every thread's stack with sys._current_frames, weighted by the CPU it used.
+
+    The sampler holds the GIL while it looks, so no other thread is running
+    Python at that instant; instead each thread's CPU time since the last
+    sample (from /proc/self/task/*/schedstat) is charged to its stack, or,
+    when the thread has just parked, to the stack it was last seen working
+    in. Once parked that stack is forgotten, since the thread's next work
+    may be another request. CPU a thread uses while two samples in a row
+    find it parked is charged to the frames live at both (the same frame
+    objects, so the work ran inside them, e.g. one handler call), or to
+    (unattributed,) when they share none. A thread is parked when its leaf frame
+    waits on I/O or a lock, or when it is blocked in a system call other
+    than the GIL's futex: a handler in time.sleep has the calling function
+    as its leaf frame.
+    """
+
+    def __init__(self, rate=100, exclude_main=True):
+        self.interval = 1.0 / rate
+        self.exclude_main = exclude_main
+        self.stacks = Counter()
+        self.exact = thread_cpu(threading.get_native_id()) is not None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='stack-sampler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling; returns {stack: CPU seconds}"""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+        return self.stacks
+
+    def run(self):
+        own, main = threading.get_ident(), threading.main_thread().ident
+        last_cpu, last_working, last_native, last_frames = {}, {}, {}, {}
+        last = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            native_ids = {thread.ident: thread.native_id for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.exclude_main and ident == main):
+                    continue
+                native_id = native_ids.get(ident)
+                if last_native.get(ident) != native_id:
+                    # A new thread reusing an exited thread's ident starts from scratch
+                    last_native[ident] = native_id
+                    last_cpu.pop(ident, None)
+                    last_working.pop(ident, None)
+                    last_frames.pop(ident, None)
+                stack = frame_stack(frame)
+                frames = frame_chain(frame)
+                previous_frames, last_frames[ident] = last_frames.get(ident, []), frames
+                parked = frame_name(stack[-1]) in WAIT_FUNCTIONS or (native_id is not None
+                                                                      and in_blocking_call(native_id))
+                if not self.exact:
+                    # Without per-thread CPU times, count every thread not parked in I/O or a lock
+                    if not parked:
+                        self.stacks[stack] += elapsed
+                    continue
+                cpu = thread_cpu(native_id)
+                previous = last_cpu.get(ident)
+                last_cpu[ident] = cpu
+                if not parked:
+                    last_working[ident] = charged = stack
+                elif ident in last_working:
+                    charged = last_working.pop(ident)
+                else:
+                    shared = next((index for index, (old, new) in enumerate(zip(previous_frames, frames))
+                                   if old is not new), min(len(previous_frames), len(frames)))
+                    charged = stack[:shared] or (UNATTRIBUTED,)
+                if cpu is not None and previous is not None and cpu > previous:
+                    self.stacks[charged] += min(cpu - previous, elapsed)
+
+
+def write_collapsed(stacks, path):
+    """Write {stack: seconds} as collapsed stacks weighted in milliseconds"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, seconds in stacks.most_common():
+            milliseconds = round(seconds * 1000)
+            if milliseconds:
+                f.write(f"{';'.join(stack)} {milliseconds}\n")
+
+
+def read_collapsed(path, unit=0.001):
+    """Read collapsed stacks; `unit` converts each count to seconds"""
+    stacks = Counter()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                stacks[tuple(stack.split(';'))] += int(count) * unit
+    return stacks
+
+
+def endpoint_handlers(spec):
+    """{(METHOD, path template): handler function name} from the operationIds FastAPI generates"""
+    handlers = {}
+    for path, item in spec.get('paths', {}).items():
+        for method, operation in item.items():
+            if method not in HTTP_METHODS:
+                continue
+            suffix = re.sub(r'\W', '_', path) + '_' + method
+            operation_id = operation.get('operationId') or ''
+            name = operation_id[:-len(suffix)] if operation_id.endswith(suffix) else operation_id
+            if name:
+                handlers[(method.upper(), path)] = name
+    return handlers
+
+
+def handler_for(method, path, handlers):
+    """Handler of a concrete request path, matching {param} templates"""
+    for (route_method, template), name in handlers.items():
+        pattern = '^' + re.sub(r'\\{[^/]+?\\}', '[^/]+', re.escape(template)) + '$'
+        if route_method == method and re.match(pattern, path.split('?')[0]):
+            return name
+    return None
+
+
+def attribute(stacks, handlers):
+    """Per-handler CPU seconds, JSON seconds and hottest leaf frames; returns (summary, endpoint-rooted stacks)"""
+    names = set(handlers.values())
+    summary = defaultdict(lambda: {'cpu': 0.0, 'json': 0.0, 'leaves': Counter()})
+    rooted = Counter()
+    for stack, seconds in stacks.items():
+        frame_names = [frame_name(frame) for frame in stack]
+        if stack == (UNATTRIBUTED,):
+            handler = UNATTRIBUTED
+        else:
+            handler = next((name for name in frame_names if name in names), OUTSIDE_HANDLERS)
+        entry = summary[handler]
+        entry['cpu'] += seconds
+        if any(name in JSON_FUNCTIONS for name in frame_names):
+            entry['json'] += seconds
+        entry['leaves'][stack[-1]] += seconds
+        rooted[(handler,) + stack] += seconds
+    return dict(summary), rooted
+
+
+class ServerProfiler:
+    """Samples the backend's CPU while a scenario runs"""
+
+    def __init__(self, out_dir='profiles', rate=100, command=None, pid=None, standin=None, startup_timeout=60):
+        self.out_dir = out_dir
+        self.rate = rate
+        self.command = command
+        self.pid = pid
+        self.standin = standin
+        self.startup_timeout = startup_timeout
+        self.stamp = time.strftime('%Y%m%d-%H%M%S')
+        self.raw_path = os.path.join(out_dir, f'profile-{self.stamp}.raw')
+        self.process = None
+        self.sampler = None
+        self.handlers = {}
+        self.tool = None
+
+    def start(self, base_url):
+        """Launch or attach the profiler and wait until the server answers"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        py_spy = shutil.which('py-spy')
+        record = [py_spy, 'record', '--format', 'raw', '--nolineno', '--rate', str(self.rate),
+                  '--output', self.raw_path]
+        if self.standin:
+            self.tool = 'stack sampler'
+            self.sampler = StackSampler(self.rate).start()
+        elif self.pid:
+            if not py_spy:
+                raise RuntimeError('attaching to a running server needs py-spy (pip install py-spy)')
+            self.tool = 'py-spy'
+            self.process = subprocess.Popen(record + ['--pid', str(self.pid)], start_new_session=True)
+        else:
+            if py_spy:
+                self.tool = 'py-spy'
+                command = record + ['--subprocesses', '--'] + self.command
+            else:
+                self.tool = 'stack sampler'
+                command = [sys.executable, os.path.abspath(__file__), 'wrap', '--out', self.raw_path,
+                           '--rate', str(self.rate), '--'] + self.command
+            self.process = subprocess.Popen(command, start_new_session=True)
+        try:
+            self.handlers = self.wait_for_server(base_url)
+        except RuntimeError:
+            if self.process and self.process.poll() is None:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            raise
+        print(f"🔥 Profiling {'the stand-in' if self.standin else self.pid or ' '.join(self.command)} "
+              f'with {self.tool} at {self.rate} Hz')
+
+    def wait_for_server(self, base_url):
+        """Poll /openapi.json until the server is up; returns its endpoint handlers"""
+        deadline = time.perf_counter() + self.startup_timeout
+        with BackendClient(base_url, retries=0) as client:
+            while True:
+                try:
+                    response = client.get('/openapi.json', timeout=5)
+                    if response.status_code == 200:
+                        return endpoint_handlers(response.json())
+                    return {}
+                except httpx.HTTPError:
+                    if self.process and self.process.poll() is not None:
+                        raise RuntimeError(f'profiled server exited with status {self.process.returncode}')
+                    if time.perf_counter() >= deadline:
+                        raise RuntimeError(f'{base_url} did not come up within {self.startup_timeout}s')
+                    time.sleep(0.5)
+
+    def stop(self):
+        """Stop the profiler (and a launched server); returns the profile and writes the collapsed stacks"""
+        if self.sampler:
+            stacks = self.sampler.stop()
+        else:
+            # SIGINT lets uvicorn shut down and py-spy or the wrapper write their output
+            try:
+                os.killpg(self.process.pid, signal.SIGINT)
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+            except ProcessLookupError:
+                pass
+            if not os.path.exists(self.raw_path):
+                print(f'⚠️  {self.tool} wrote no profile ({self.raw_path})')
+                return None
+            # py-spy counts samples, the wrapper writes milliseconds
+            stacks = read_collapsed(self.raw_path, 1.0 / self.rate if self.tool == 'py-spy' else 0.001)
+
+        summary, rooted = attribute(stacks, self.handlers)
+        path = os.path.join(self.out_dir, f'profile-{self.stamp}.collapsed')
+        write_collapsed(rooted, path)
+        return {'tool': self.tool, 'rate': self.rate, 'exact': self.sampler.exact if self.sampler else True,
+                'handlers': self.handlers, 'endpoints': summary, 'path': path}
+
+
+def print_profile_report(profile, report=None, scenarios=None):
+    """CPU per endpoint, aligned with the load report's request counts and p50 latency"""
+    if not profile:
+        return
+    total = sum(entry['cpu'] for entry in profile['endpoints'].values())
+    print('\n' + '=' * 78)
+    print(f"🔥 Server CPU Profile ({profile['tool']}, {profile['rate']} Hz, {total:.2f}s CPU sampled)")
+    print('-' * 78)
+
+    # Scenario names and request counts per handler, so rows line up with the load report
+    requests, latencies, labels = Counter(), {}, defaultdict(list)
+    for scenario in scenarios or []:
+        handler = handler_for(scenario.get('method', 'GET'), scenario['path'], profile['handlers'])
+        if handler and scenario['name'] not in labels[handler]:
+            labels[handler].append(scenario['name'])
+    for summary in (report or {}).get('endpoints', []):
+        for handler, names in labels.items():
+            if summary['name'] in names:
+                requests[handler] += summary['requests']
+                latencies[handler] = max(latencies.get(handler, 0), summary['p50'])
+
+    print(f"   {'Endpoint':<24} {'Reqs':>6} {'p50':>8} {'CPU/req':>8} {'On-CPU':>7} {'JSON':>6}  Hottest frames")
+    for handler, entry in sorted(profile['endpoints'].items(), key=lambda item: -item[1]['cpu']):
+        label = ', '.join(labels.get(handler, [])) or handler
+        count = requests.get(handler)
+        cpu_per_request = entry['cpu'] / count if count else None
+        p50 = latencies.get(handler)
+        hottest = ', '.join(f"{frame_name(frame)} {seconds / entry['cpu']:.0%}"
+                            for frame, seconds in entry['leaves'].most_common(2))
+        # Without request counts (no matching scenario) the total CPU is shown instead
+        cpu = f'{cpu_per_request * 1000:.1f}ms' if cpu_per_request is not None else f"{entry['cpu']:.2f}s"
+        on_cpu = f'{cpu_per_request / p50:.0%}' if cpu_per_request is not None and p50 else '-'
+        print(f"   {label[:24]:<24} {count or '-':>6} {f'{p50 * 1000:.0f}ms' if p50 else '-':>8} "
+              f"{cpu:>8} {on_cpu:>7} {entry['json'] / entry['cpu']:>6.0%}  {hottest}")
+
+    waiting = []
+    for handler, entry in profile['endpoints'].items():
+        count, p50 = requests.get(handler), latencies.get(handler)
+        name = ', '.join(labels.get(handler, [])) or handler
+        if count and p50 and entry['cpu'] / count < p50 * 0.2:
+            waiting.append(name)
+        # Endpoints with a negligible share of the CPU are not worth a JSON warning
+        if entry['cpu'] > total * 0.05 and entry['json'] / entry['cpu'] > 0.3:
+            print(f"⚠️  {name}: {entry['json'] / entry['cpu']:.0%} of its CPU is JSON encoding/decoding")
+    if waiting:
+        print(f"ℹ️  Under 20% of p50 on CPU, so mostly waiting (upstream calls, sleeps, GIL or queueing): "
+              f"{', '.join(waiting)}")
+    unattributed = profile['endpoints'].get(UNATTRIBUTED, {}).get('cpu', 0.0)
+    if total and unattributed > total * 0.2:
+        print(f'ℹ️  {unattributed / total:.0%} of the CPU ran between samples with no frame live at both: '
+              f'try a higher --cpu-profile-rate')
+    if not profile['handlers']:
+        print('⚠️  No operationIds in /openapi.json: all CPU is reported outside handlers')
+    if not profile['exact']:
+        print('⚠️  No per-thread CPU times here: samples of threads not parked in I/O count as CPU')
+    print(f"💾 Collapsed stacks (ms): {profile['path']}")
+
+
+def add_profile_arguments(parser):
+    """Add the --cpu-profile options to a load-mode script"""
+    group = parser.add_argument_group('server CPU profiling (load mode)')
+    group.add_argument('--cpu-profile', action='store_true',
+                       help='Sample the server during the load run (the --standin, or see below)')
+    group.add_argument('--cpu-profile-server', metavar='CMD',
+                       help='Launch the local server with this command under the profiler, '
+                            'e.g. "uvicorn main:app --port 8000"')
+    group.add_argument('--cpu-profile-pid', type=int, metavar='PID', help='Attach py-spy to a running server')
+    group.add_argument('--cpu-profile-rate', type=int, default=100, help='Samples per second')
+    group.add_argument('--cpu-profile-out', default='profiles', help='Directory for the stack files')
+
+
+def profiler_from_args(args, standin=None):
+    """A ServerProfiler when profiling was requested, otherwise None"""
+    if not (args.cpu_profile or args.cpu_profile_server or args.cpu_profile_pid):
+        return None
+    if not (standin or args.cpu_profile_server or args.cpu_profile_pid):
+        raise SystemExit('--cpu-profile needs --standin, --cpu-profile-server CMD or --cpu-profile-pid PID')
+    return ServerProfiler(args.cpu_profile_out, args.cpu_profile_rate,
+                          command=args.cpu_profile_server.split() if args.cpu_profile_server else None,
+                          pid=args.cpu_profile_pid, standin=standin)
+
+
+def run_wrapped(command, out, rate):
+    """Run a Python server command in this process with the stack sampler, writing the profile on exit"""
+    if os.path.basename(command[0]).startswith('python'):
+        command = command[1:]
+    sampler = StackSampler(rate, exclude_main=False)
+    atexit.register(lambda: write_collapsed(sampler.stop(), out))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    sampler.start()
+    if command[0] == '-m':
+        sys.argv = command[1:]
+        sys.path.insert(0, os.getcwd())
+        runpy.run_module(command[1], run_name='__main__', alter_sys=True)
+    else:
+        script = command[0] if os.path.exists(command[0]) else shutil.which(command[0])
+        sys.argv = [script] + command[1:]
+        sys.path.insert(0, os.path.dirname(os.path.abspath(script)) if command[0] == script else os.getcwd())
+        runpy.run_path(script, run_name='__main__')
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Sampling profiler helpers for the local backend')
+    commands = parser.add_subparsers(dest='command', required=True)
+    wrap = commands.add_parser('wrap', help='Run a Python server command under the stack sampler (py-spy fallback)')
+    wrap.add_argument('--out', required=True, help='Collapsed stack file written when the server exits')
+    wrap.add_argument('--rate', type=int, default=100, help='Samples per second')
+    wrap.add_argument('server', nargs=argparse.REMAINDER, help='-- python main.py | -m uvicorn main:app | uvicorn ...')
+    args = parser.parse_args()
+
+    server = args.server[1:] if args.server[:1] == ['--'] else args.server
+    if not server:
+        parser.error('no server command given')
+    run_wrapped(server, args.out, args.rate)
+
+
+if __name__ == '__main__':
+    main()
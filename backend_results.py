@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Structured Benchmark Results and Regression Comparison
+
+Runs write JSON Lines: one `run` record with the target and backend version,
+then one `request` record per request. Runs are appended, so a file can hold
+several; the tools read the latest one unless a run id is given. `compare`
+diffs two runs per endpoint and flags statistically significant regressions,
+exiting non-zero so a deploy can be gated on it. Given the same file twice
+it compares that file's last two runs. `phases` breaks request time down
+into DNS plus socket setup, connect, TLS, TTFB and transfer per endpoint.
+"""
+
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend_load import percentile
+
+
+def fetch_backend_version(base_url):
+    """Backend `version` reported by /, or None"""
+    try:
+        response = httpx.get(f'{base_url}/', timeout=10)
+        if response.status_code == 200:
+            return response.json().get('version')
+    except (httpx.HTTPError, ValueError):
+        pass
+    return None
+
+
+def response_cached_flag(response):
+    """The `cached` field of a JSON response body, if any"""
+    if b'"cached"' not in response.content:
+        return None
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    return body.get('cached') if isinstance(body, dict) else None
+
+
+class ResultWriter:
+    """
+    Thread-safe JSON Lines writer for one benchmark run.
+
+    The run record is written by start(), which looks up the backend version
+    unless one is given. Pass start=False to defer it, e.g. until a cold
+    deploy has come up, so the lookup does not wake the backend early.
+    """
+
+    def __init__(self, path, tool, base_url, start=True, **metadata):
+        self.path = path
+        self.tool = tool
+        self.base_url = base_url
+        self.metadata = metadata
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = False
+        self.file = open(path, 'a', encoding='utf-8')
+        self.lock = threading.Lock()
+        if start:
+            self.start()
+
+    def start(self, version=None, **metadata):
+        """Write the run record"""
+        self.started = True
+        self.write({
+            'type': 'run',
+            'run_id': self.run_id,
+            'tool': self.tool,
+            'base_url': self.base_url,
+            'version': version if version is not None else fetch_backend_version(self.base_url),
+            'started_at': time.time(),
+            **self.metadata,
+            **metadata,
+        })
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+
+    def record(self, method, path, status, latency, cached=None, size=None, error=None, **extra):
+        """Write one request record"""
+        if not self.started:
+            self.start()
+        self.write({
+            'type': 'request',
+            'run_id': self.run_id,
+            'ts': time.time(),
+            'endpoint': f'{method} {urlsplit(path).path}',
+            'status': status,
+            'latency': latency,
+            'cached': cached,
+            'bytes': size,
+            'error': error,
+            **extra,
+        })
+
+    def record_response(self, method, path, response, latency, **extra):
+        self.record(method, path, response.status_code, latency,
+                    cached=response_cached_flag(response), size=len(response.content), **extra)
+
+    def record_error(self, method, path, error, latency, **extra):
+        self.record(method, path, None, latency, error=type(error).__name__, **extra)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class RecorderGroup:
+    """Fans request reports out to several recorders, e.g. results and a trace"""
+
+    def __init__(self, recorders):
+        self.recorders = recorders
+
+    def start(self, **metadata):
+        for recorder in self.recorders:
+            if hasattr(recorder, 'start'):
+                recorder.start(**metadata)
+
+    def record_response(self, *args, **kwargs):
+        for recorder in self.recorders:
+            recorder.record_response(*args, **kwargs)
+
+    def record_error(self, *args, **kwargs):
+        for recorder in self.recorders:
+            recorder.record_error(*args, **kwargs)
+
+    def close(self):
+        for recorder in self.recorders:
+            recorder.close()
+
+
+def combine_recorders(*recorders):
+    """The recorders that are set, grouped when there is more than one"""
+    recorders = [recorder for recorder in recorders if recorder is not None]
+    if len(recorders) > 1:
+        return RecorderGroup(recorders)
+    return recorders[0] if recorders else None
+
+
+def add_results_arguments(parser):
+    """Add the --results option shared by the endpoint scripts"""
+    parser.add_argument('--results', metavar='PATH',
+                        help='Append per-request results to this JSON Lines file')
+
+
+def results_from_args(args, tool, base_url, start=True, **metadata):
+    """Open a ResultWriter when --results was given, otherwise return None"""
+    if not args.results:
+        return None
+    writer = ResultWriter(args.results, tool, base_url, start=start, **metadata)
+    print(f'📝 Writing results to {args.results} (run {writer.run_id})')
+    return writer
+
+
+PHASES = ['dns+socket', 'connect', 'tls', 'send', 'ttfb', 'transfer', 'other']
+
+
+class PhaseCollector:
+    """Recorder keeping each endpoint's phase timings in memory for print_phase_report"""
+
+    def __init__(self):
+        self.phases = {}
+
+    def record_response(self, method, path, response, latency, phases=None, **extra):
+        if phases:
+            self.phases.setdefault(f'{method} {urlsplit(path).path}', []).append(phases)
+
+    def record_error(self, method, path, error, latency, **extra):
+        pass
+
+    def close(self):
+        pass
+
+
+def add_phase_arguments(parser):
+    """Add the --phases option shared by the probe scripts"""
+    parser.add_argument('--phases', action='store_true',
+                        help='Print a DNS+socket/connect/TLS/TTFB/transfer breakdown per endpoint')
+
+
+def phases_from_args(args):
+    """A PhaseCollector when --phases was given, otherwise None"""
+    return PhaseCollector() if args.phases else None
+
+
+def summarize_phases(samples):
+    """Median of each phase, connections opened and estimated server time"""
+    summary = {phase: percentile(sorted(sample.get(phase, 0.0) for sample in samples), 50)
+               for phase in PHASES}
+    connects = sorted(sample['connect'] for sample in samples if sample.get('new_connection'))
+    # A TCP handshake takes one round trip; TTFB is server time plus one round trip
+    rtt = percentile(connects, 50) if connects else None
+    summary.update({
+        'count': len(samples),
+        'connections': len(connects),
+        'total': percentile(sorted(sum(sample.get(phase, 0.0) for phase in PHASES) for sample in samples), 50),
+        'rtt': rtt,
+        'server': max(0.0, summary['ttfb'] - rtt) if rtt is not None else None,
+    })
+    return summary
+
+
+def print_phase_report(phases_by_endpoint):
+    """Median phase breakdown per endpoint, in milliseconds"""
+    if not phases_by_endpoint:
+        return
+    print('\n⏱️  Request Phases (median ms)')
+    print('-' * 104)
+    print(f"   {'Endpoint':<28} {'n':>4} {'conn':>4} "
+          + ' '.join(f'{phase:>{max(8, len(phase))}}' for phase in PHASES) + f" {'server~':>8}")
+    for name, samples in sorted(phases_by_endpoint.items()):
+        summary = summarize_phases(samples)
+        server = f"{summary['server'] * 1000:8.1f}" if summary['server'] is not None else f"{'-':>8}"
+        print(f"   {name:<28} {summary['count']:>4} {summary['connections']:>4} "
+              + ' '.join(f'{summary[phase] * 1000:{max(8, len(phase))}.1f}' for phase in PHASES) + f' {server}')
+        network = (sum(summary[phase] for phase in ('dns+socket', 'connect', 'tls', 'send', 'transfer'))
+                   + (summary['rtt'] or 0))
+        # Sub-10ms differences are noise on a local or same-region target
+        if summary['server'] is not None and network > max(summary['server'], 0.010):
+            print(f'   ↳ network path ({network * 1000:.0f}ms incl. one RTT) outweighs backend time '
+                  f"({summary['server'] * 1000:.0f}ms)")
+    print('   conn = new connections; server~ = TTFB minus one round trip (median TCP connect)')
+
+
+def read_records(path):
+    """Return (runs, requests) records from a result file, every run included"""
+    runs, requests_ = [], []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            (runs if record.get('type') == 'run' else requests_).append(record)
+    return runs, requests_
+
+
+def load_results(path, run_id=None, previous=0):
+    """
+    Return (run, requests) for one run of a result file.
+
+    The latest run is used unless `run_id` (or a unique prefix of it) picks
+    another; `previous` counts back from the latest. Raises ValueError when
+    no such run exists.
+    """
+    runs, requests_ = read_records(path)
+    if run_id:
+        matches = [run for run in runs if run['run_id'].startswith(run_id)]
+        if len(matches) != 1:
+            raise ValueError(f"{path}: {'no' if not matches else 'more than one'} run matching {run_id!r}")
+        run = matches[0]
+    elif previous < len(runs):
+        run = runs[-1 - previous]
+    else:
+        raise ValueError(f'{path} has {len(runs)} run(s), need {previous + 1}')
+    return run, [record for record in requests_ if record.get('run_id') == run['run_id']]
+
+
+def summarize_endpoint(records):
+    """Latency percentiles, throughput and error rate for one endpoint"""
+    latencies = sorted(r['latency'] for r in records if r['latency'] is not None and not r['error'])
+    errors = sum(1 for r in records if r['error'] or (r['status'] or 0) >= 400)
+    timestamps = [r['ts'] for r in records]
+    span = max(timestamps) - min(timestamps) if len(timestamps) > 1 else 0.0
+    return {
+        'count': len(records),
+        'errors': errors,
+        'error_rate': errors / len(records) if records else 0.0,
+        'span': span,
+        'throughput': (len(records) - 1) / span if span > 0 else None,
+        'latencies': latencies,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'bytes': (sum(r['bytes'] for r in records if r.get('bytes') is not None)
+                  / max(1, sum(1 for r in records if r.get('bytes') is not None))),
+    }
+
+
+def normal_sf(z):
+    """Survival function of the standard normal distribution"""
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_whitney_greater(baseline, candidate):
+    """
+    One-sided Mann-Whitney U p-value that candidate latencies are larger.
+
+    Uses the normal approximation with tie correction, which is accurate for
+    the sample sizes benchmark runs produce (a few dozen samples or more).
+    """
+    n1, n2 = len(baseline), len(candidate)
+    if not n1 or not n2:
+        return 1.0
+
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return normal_sf(z)
+
+
+def rate_drop_p_value(base, cand):
+    """One-sided p-value that the candidate's request rate is lower (Poisson counts)"""
+    if not base['throughput'] or not cand['throughput']:
+        return 1.0
+    variance = base['count'] / base['span'] ** 2 + cand['count'] / cand['span'] ** 2
+    z = (base['throughput'] - cand['throughput']) / math.sqrt(variance)
+    return normal_sf(z)
+
+
+def error_rate_p_value(base, cand):
+    """One-sided two-proportion z-test p-value that the candidate errors more"""
+    n1, n2 = base['count'], cand['count']
+    pooled = (base['errors'] + cand['errors']) / (n1 + n2) if n1 + n2 else 0
+    if pooled in (0, 1):
+        return 1.0
+    z = (cand['error_rate'] - base['error_rate']) / math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    return normal_sf(z)
+
+
+def compare_results(baseline_path, candidate_path, alpha=0.05, threshold=0.10, endpoints=None,
+                    baseline_run=None, candidate_run=None):
+    """
+    Compare two runs per endpoint.
+
+    Each side is the latest run of its file unless a run id is given; when
+    both sides are the same file and no ids are given, the run before the
+    latest is the baseline.
+
+    A latency regression needs a significant Mann-Whitney shift and a p50 or
+    p95 increase above `threshold` (relative); a throughput regression needs a
+    significant rate drop above `threshold`; an error regression needs a
+    significant error-rate increase.
+    """
+    same_file = baseline_path == candidate_path and not (baseline_run or candidate_run)
+    base_run, base_requests = load_results(baseline_path, baseline_run, previous=1 if same_file else 0)
+    cand_run, cand_requests = load_results(candidate_path, candidate_run)
+
+    def group(records):
+        grouped = {}
+        for record in records:
+            grouped.setdefault(record['endpoint'], []).append(record)
+        return grouped
+
+    base_groups, cand_groups = group(base_requests), group(cand_requests)
+    names = sorted(set(base_groups) & set(cand_groups))
+    if endpoints:
+        names = [name for name in names if any(wanted in name for wanted in endpoints)]
+
+    rows = []
+    for name in names:
+        base = summarize_endpoint(base_groups[name])
+        cand = summarize_endpoint(cand_groups[name])
+        p50_change = (cand['p50'] - base['p50']) / base['p50'] if base['p50'] else 0.0
+        p95_change = (cand['p95'] - base['p95']) / base['p95'] if base['p95'] else 0.0
+        latency_p = mann_whitney_greater(base['latencies'], cand['latencies'])
+        flags = []
+        if latency_p < alpha and max(p50_change, p95_change) > threshold:
+            flags.append('latency')
+        if base['throughput'] and cand['throughput']:
+            throughput_change = (cand['throughput'] - base['throughput']) / base['throughput']
+            if rate_drop_p_value(base, cand) < alpha and -throughput_change > threshold:
+                flags.append('throughput')
+        if error_rate_p_value(base, cand) < alpha:
+            flags.append('errors')
+        rows.append({'endpoint': name, 'baseline': base, 'candidate': cand,
+                     'p50_change': p50_change, 'p95_change': p95_change,
+                     'latency_p': latency_p, 'regressions': flags})
+
+    return {
+        'baseline_run': base_run['run_id'],
+        'candidate_run': cand_run['run_id'],
+        'baseline_version': base_run.get('version'),
+        'candidate_version': cand_run.get('version'),
+        'only_baseline': sorted(set(base_groups) - set(cand_groups)),
+        'only_candidate': sorted(set(cand_groups) - set(base_groups)),
+        'rows': rows,
+    }
+
+
+def print_comparison(comparison):
+    """Print the per-endpoint comparison table"""
+    print('📊 Benchmark Comparison')
+    print('=' * 104)
+    print(f"   Baseline version:  {comparison['baseline_version'] or 'unknown'} (run {comparison['baseline_run']})")
+    print(f"   Candidate version: {comparison['candidate_version'] or 'unknown'} (run {comparison['candidate_run']})")
+    print('-' * 104)
+    print(f"   {'Endpoint':<28} {'n':>11} {'p50 ms':>15} {'Δp50':>7} {'p95 ms':>15} {'Δp95':>7} "
+          f"{'RPS':>11} {'Err%':>11}")
+
+    def pair(base, cand, fmt):
+        return f"{'-' if base is None else format(base, fmt)}→{'-' if cand is None else format(cand, fmt)}"
+
+    for row in comparison['rows']:
+        base, cand = row['baseline'], row['candidate']
+        status = '❌' if row['regressions'] else '✅'
+        print(f"{status} {row['endpoint']:<28} {pair(base['count'], cand['count'], 'd'):>11} "
+              f"{pair(base['p50'] * 1000, cand['p50'] * 1000, '.0f'):>15} "
+              f"{row['p50_change'] * 100:>+6.1f}% "
+              f"{pair(base['p95'] * 1000, cand['p95'] * 1000, '.0f'):>15} "
+              f"{row['p95_change'] * 100:>+6.1f}% "
+              f"{pair(base['throughput'], cand['throughput'], '.1f'):>11} "
+              f"{pair(base['error_rate'] * 100, cand['error_rate'] * 100, '.1f'):>11}")
+        if row['regressions']:
+            print(f"   ⚠️  Regression: {', '.join(row['regressions'])} "
+                  f"(latency shift p={row['latency_p']:.4f})")
+
+    for name in comparison['only_baseline']:
+        print(f'⚠️  {name} missing from candidate run')
+    for name in comparison['only_candidate']:
+        print(f'ℹ️  {name} only in candidate run')
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark result tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compare = commands.add_parser('compare', help='Flag regressions between two result files')
+    compare.add_argument('baseline', help='Result file of the current deploy')
+    compare.add_argument('candidate', help='Result file of the new deploy')
+    compare.add_argument('--alpha', type=float, default=0.05, help='Significance level')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help='Minimum relative change that counts as a regression')
+    compare.add_argument('--endpoint', action='append',
+                         help='Only compare endpoints containing this text (repeatable)')
+    compare.add_argument('--baseline-run', metavar='RUN_ID', help='Run of the baseline file (default: latest)')
+    compare.add_argument('--candidate-run', metavar='RUN_ID', help='Run of the candidate file (default: latest)')
+    phases = commands.add_parser('phases', help='Per-endpoint phase breakdown of a result file')
+    phases.add_argument('results', help='Result file written with --results')
+    phases.add_argument('--run', metavar='RUN_ID', help='Run to break down (default: latest)')
+
+    args = parser.parse_args()
+
+    if args.command == 'phases':
+        try:
+            _, records = load_results(args.results, args.run)
+        except ValueError as e:
+            print(f'❌ {e}')
+            sys.exit(1)
+        grouped = {}
+        for record in records:
+            if record.get('phases'):
+                grouped.setdefault(record['endpoint'], []).append(record['phases'])
+        if not grouped:
+            print(f'❌ {args.results} has no phase timings')
+            sys.exit(1)
+        print_phase_report(grouped)
+
+    if args.command == 'compare':
+        try:
+            comparison = compare_results(args.baseline, args.candidate, alpha=args.alpha,
+                                         threshold=args.threshold, endpoints=args.endpoint,
+                                         baseline_run=args.baseline_run, candidate_run=args.candidate_run)
+        except ValueError as e:
+            print(f'❌ {e}')
+            sys.exit(1)
+        print_comparison(comparison)
+        regressed = [row['endpoint'] for row in comparison['rows'] if row['regressions']]
+        print()
+        if regressed:
+            print(f'❌ {len(regressed)} endpoint(s) regressed: {", ".join(regressed)}')
+            sys.exit(1)
+        print('🎉 No significant regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,933 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in for the OpenFood Backend
+
+Serves the YouTube proxy, meal-plan, USDA and AI price endpoints with the
+same response shapes as the Render deployment so the endpoint scripts can
+run offline. Latency, jitter and failures are injected from a seeded RNG
+to keep runs repeatable, as are the chaos faults: slow or quota-limited
+YouTube and USDA upstream calls and dropped connections.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from backend_workloads import DAYS_OF_WEEK, FOOD_PRICES, POPULAR_DISHES
+
+VERSION = '2.0.0-standin'
+
+CHANNELS = [
+    'Feedy TV',
+    'Vành Khuyên Nấu Ăn',
+    'Điện Máy XANH',
+    'Bếp Nhà Ta',
+    'Món Ngon Mỗi Ngày',
+]
+
+# Word-level Vietnamese -> English glossary standing in for the translation service
+GLOSSARY = {
+    'bánh mì': 'bread', 'đậu phụ': 'tofu', 'khoai lang': 'sweet potato', 'rau củ': 'vegetables',
+    'phở': 'pho noodle soup', 'bún': 'rice vermicelli', 'cơm': 'rice', 'cháo': 'rice porridge',
+    'bò': 'beef', 'gà': 'chicken', 'cá': 'fish', 'tôm': 'shrimp', 'cua': 'crab', 'mực': 'squid',
+    'thịt': 'pork', 'sườn': 'pork ribs', 'trứng': 'egg', 'rau': 'vegetables', 'canh': 'soup',
+    'hồi': 'salmon', 'nướng': 'grilled', 'chiên': 'fried', 'luộc': 'boiled', 'xào': 'stir-fried',
+    'kho': 'braised', 'chay': 'vegetarian', 'sữa chua': 'yogurt', 'yến mạch': 'oats',
+}
+
+# Share of the daily targets each meal gets
+MEAL_SHARES = {'breakfast': 0.25, 'lunch': 0.40, 'dinner': 0.35}
+
+
+class StandinConfig:
+    """Artificial latency, failure injection and cache sizing for the stand-in"""
+
+    def __init__(self, latency=0.0, jitter=0.0, upstream_latency=0.2,
+                 upstream_latency_per_id=0.01, generation_latency_per_day=0.3,
+                 usda_latency=0.3, translate_latency=0.15, ai_latency=1.5, ai_latency_per_item=0.01,
+                 ai_cache=False, failure_rate=0.0, failure_status=500, drop_rate=0.0,
+                 upstream_slowdown=0.0, upstream_error_rate=0.0, upstream_timeout=None, serve_stale=False,
+                 cache_duration_hours=24, max_cache_size=1000, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.upstream_latency = upstream_latency
+        self.upstream_latency_per_id = upstream_latency_per_id
+        self.generation_latency_per_day = generation_latency_per_day
+        self.usda_latency = usda_latency
+        self.translate_latency = translate_latency
+        # The AI price endpoints call an LLM per request; ai_cache models a response cache in front
+        self.ai_latency = ai_latency
+        self.ai_latency_per_item = ai_latency_per_item
+        self.ai_cache = ai_cache
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        # Fraction of requests whose connection is closed without a response
+        self.drop_rate = drop_rate
+        # Chaos on the YouTube/USDA calls behind a cache miss: extra latency, 429 quota errors,
+        # the backend's own upstream timeout, and serving expired entries when the call fails
+        self.upstream_slowdown = upstream_slowdown
+        self.upstream_error_rate = upstream_error_rate
+        self.upstream_timeout = upstream_timeout
+        self.serve_stale = serve_stale
+        self.cache_duration_hours = cache_duration_hours
+        self.max_cache_size = max_cache_size
+        self.seed = seed
+
+
+class VideoCache:
+    """In-memory TTL cache mirroring the backend's VIDEO_CACHE"""
+
+    def __init__(self, duration_hours, max_size):
+        self.duration = duration_hours * 3600
+        self.max_size = max_size
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry[0] < self.duration:
+                return entry[1]
+        return None
+
+    def get_stale(self, key):
+        """The entry for `key` even if it has expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+        return entry[1] if entry else None
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            if len(self.entries) >= self.max_size:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self.entries[next(iter(self.entries))]
+            self.entries[key] = (time.time(), value)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def expire(self):
+        """Backdate every entry so it is expired but still there for stale serving; later entries keep the TTL"""
+        expired = time.time() - self.duration
+        with self.lock:
+            for key, (ts, value) in self.entries.items():
+                self.entries[key] = (min(ts, expired), value)
+
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            valid = sum(1 for ts, _ in self.entries.values() if now - ts < self.duration)
+            total = len(self.entries)
+        return {
+            'total_entries': total,
+            'valid_entries': valid,
+            'expired_entries': total - valid,
+            'cache_duration_hours': self.duration / 3600,
+            'max_cache_size': self.max_size,
+        }
+
+
+def make_video(seed_text, index, video_id=None):
+    """Build a deterministic fake video for a query or video ID"""
+    digest = hashlib.sha1(f'{seed_text}:{index}'.encode('utf-8')).hexdigest()
+    video_id = video_id or digest[:11]
+    minutes = 3 + int(digest[11:13], 16) % 25
+    views = 1000 + int(digest[13:19], 16) % 5_000_000
+    return {
+        'id': video_id,
+        'title': f'Cách nấu {seed_text} ngon tại nhà #{index + 1}',
+        'channel': CHANNELS[int(digest[19:21], 16) % len(CHANNELS)],
+        'duration': f'{minutes}:{int(digest[21:23], 16) % 60:02d}',
+        'views': f'{views:,}',
+        'description': f'Hướng dẫn chi tiết cách làm {seed_text} đơn giản, thơm ngon.',
+        'thumbnail': f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg',
+        'url': f'https://www.youtube.com/watch?v={video_id}',
+        'published_at': '2024-01-01T00:00:00Z',
+    }
+
+
+def make_day_plan(day, targets, seed_text):
+    """Build a deterministic fake day plan splitting the targets across meals"""
+    meals = {}
+    for meal_type, share in MEAL_SHARES.items():
+        digest = hashlib.sha1(f'{seed_text}:{day}:{meal_type}'.encode('utf-8')).hexdigest()
+        dish = POPULAR_DISHES[int(digest[:4], 16) % len(POPULAR_DISHES)]
+        nutrition = {key: round(targets[key] * share) for key in ('calories', 'protein', 'fat', 'carbs')}
+        meals[meal_type] = {
+            'name': dish,
+            'description': f'{dish} theo khẩu phần cá nhân hóa',
+            'ingredients': [],
+            'nutrition': nutrition,
+            'dishes': [{'name': dish, 'nutrition': nutrition, 'ingredients': [], 'preparation': []}],
+        }
+    return {
+        'day_of_week': day,
+        **meals,
+        'nutrition_summary': {key: sum(meal['nutrition'][key] for meal in meals.values())
+                              for key in ('calories', 'protein', 'fat', 'carbs')},
+    }
+
+
+def translate(text):
+    """Glossary translation, longest phrases first; unknown words pass through"""
+    text = text.lower()
+    for phrase in sorted(GLOSSARY, key=len, reverse=True):
+        text = text.replace(phrase, GLOSSARY[phrase])
+    return ' '.join(text.split())
+
+
+def make_food(query, index):
+    """Build a deterministic fake USDA food for an English query"""
+    digest = hashlib.sha1(f'{query}:{index}'.encode('utf-8')).hexdigest()
+    return {
+        'fdcId': 100000 + int(digest[:6], 16) % 900000,
+        'description': f'{query.title()}, prepared' if index else query.title(),
+        'dataType': 'Survey (FNDDS)',
+        'foodCategory': 'Mixed Dishes',
+        'nutrients': {
+            'calories': 80 + int(digest[6:8], 16) % 300,
+            'protein': round(int(digest[8:10], 16) % 30 + 0.5, 1),
+            'fat': round(int(digest[10:12], 16) % 20 + 0.5, 1),
+            'carbs': round(int(digest[12:14], 16) % 50 + 0.5, 1),
+            'fiber': round(int(digest[14:16], 16) % 8 + 0.1, 1),
+        },
+    }
+
+
+class InvalidRequest(Exception):
+    """The request failed validation; answered with 422 like FastAPI does"""
+
+
+def number(params, name, default, cast=int):
+    """A numeric query or body parameter; raises InvalidRequest when it is not a number"""
+    try:
+        return cast(params.get(name, default))
+    except (TypeError, ValueError):
+        raise InvalidRequest(f'{name} must be a number') from None
+
+
+def text(params, name, default=''):
+    """A string query or body parameter, stripped; raises InvalidRequest when it is not a string"""
+    value = params.get(name, default)
+    if not isinstance(value, str):
+        raise InvalidRequest(f'{name} must be a string')
+    return value.strip()
+
+
+class UpstreamError(Exception):
+    """An upstream API call failed; the backend answers with `status`"""
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stand-in's cache and RNG"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, config=None):
+        super().__init__(address, StandinHandler)
+        self.config = config or StandinConfig()
+        self.cache = VideoCache(self.config.cache_duration_hours, self.config.max_cache_size)
+        self.usda_cache = VideoCache(self.config.cache_duration_hours, self.config.max_cache_size)
+        self.ai_cache = VideoCache(self.config.cache_duration_hours, self.config.max_cache_size)
+        self.rng = random.Random(self.config.seed)
+        self.rng_lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def random(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+    def expire_caches(self):
+        """Expire the current YouTube, USDA and AI entries, keeping the configured TTL for new ones"""
+        for cache in (self.cache, self.usda_cache, self.ai_cache):
+            cache.expire()
+
+    def stop(self):
+        """Stop serving and release the socket"""
+        self.shutdown()
+        self.server_close()
+        if self.thread:
+            self.thread.join()
+
+
+ROUTES = {
+    ('GET', '/'): 'handle_root',
+    ('GET', '/health'): 'handle_health',
+    ('GET', '/docs'): 'handle_docs',
+    ('GET', '/openapi.json'): 'handle_openapi',
+    ('POST', '/youtube/search'): 'handle_search',
+    ('POST', '/youtube/details'): 'handle_details',
+    ('GET', '/youtube/trending'): 'handle_trending',
+    ('GET', '/youtube/cache/stats'): 'handle_cache_stats',
+    ('DELETE', '/youtube/cache/clear'): 'handle_cache_clear',
+    ('POST', '/api/meal-plan/generate'): 'handle_meal_plan_generate',
+    ('POST', '/generate-weekly-meal'): 'handle_generate_weekly',
+    ('POST', '/api/replace-day'): 'handle_replace_day',
+    ('POST', '/replace-day-personalized'): 'handle_replace_day',
+    ('GET', '/usda/translate'): 'handle_usda_translate',
+    ('GET', '/usda/search'): 'handle_usda_search',
+    ('GET', '/usda/nutrition'): 'handle_usda_nutrition',
+    ('GET', '/usda/food/{fdc_id}'): 'handle_usda_food',
+    ('POST', '/usda/clear-cache'): 'handle_usda_clear_cache',
+    ('GET', '/ai-price/health'): 'handle_ai_health',
+    ('POST', '/ai-price/analyze-trends'): 'handle_ai_trends',
+    ('GET', '/ai-price/analyze-trends'): 'handle_ai_trends',
+    ('POST', '/ai-price/predict-price'): 'handle_ai_predict',
+    ('GET', '/ai-price/predict-price'): 'handle_ai_predict',
+    ('POST', '/ai-price/analyze-seasonal'): 'handle_ai_seasonal',
+    ('GET', '/ai-price/analyze-seasonal'): 'handle_ai_seasonal',
+    ('POST', '/ai-price/optimize-grocery'): 'handle_ai_optimize',
+    ('POST', '/ai-price/market-insights'): 'handle_ai_market',
+    ('GET', '/ai-price/market-insights'): 'handle_ai_market',
+}
+
+# (name, in, type, required, default) of the GET route parameters, documented in /openapi.json
+ROUTE_PARAMETERS = {
+    '/youtube/trending': [('max_results', 'query', 'integer', False, 10)],
+    '/usda/translate': [('vietnamese_query', 'query', 'string', True, None)],
+    '/usda/search': [('query', 'query', 'string', True, None), ('vietnamese', 'query', 'boolean', False, False),
+                     ('max_results', 'query', 'integer', False, 20)],
+    '/usda/nutrition': [('query', 'query', 'string', True, None), ('vietnamese', 'query', 'boolean', False, False),
+                        ('amount', 'query', 'number', False, 100)],
+    '/usda/food/{fdc_id}': [('fdc_id', 'path', 'integer', True, None)],
+    '/ai-price/analyze-trends': [('category', 'query', 'string', False, None),
+                                 ('days_back', 'query', 'integer', False, 30)],
+    '/ai-price/predict-price': [('food_name', 'query', 'string', True, None),
+                                ('days_ahead', 'query', 'integer', False, 7)],
+    '/ai-price/analyze-seasonal': [('category', 'query', 'string', False, None)],
+    '/ai-price/market-insights': [('region', 'query', 'string', False, None)],
+}
+
+
+def openapi_parameters(path):
+    """FastAPI-style parameter objects for a GET route"""
+    parameters = []
+    for name, location, kind, required, default in ROUTE_PARAMETERS.get(path, []):
+        schema = {'type': kind, 'title': name.replace('_', ' ').title()}
+        if default is not None:
+            schema['default'] = default
+        parameters.append({'name': name, 'in': location, 'required': required, 'schema': schema})
+    return parameters
+
+
+def match_route(method, path):
+    """(handler name, path parameters) for a request, or (None, {})"""
+    handler = ROUTES.get((method, path))
+    if handler:
+        return handler, {}
+    segments = path.strip('/').split('/')
+    for (route_method, route), name in ROUTES.items():
+        parts = route.strip('/').split('/')
+        if route_method != method or '{' not in route or len(parts) != len(segments):
+            continue
+        params = {}
+        for part, segment in zip(parts, segments):
+            if part.startswith('{'):
+                params[part.strip('{}')] = segment
+            elif part != segment:
+                break
+        else:
+            return name, params
+    return None, {}
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Routes requests to the stand-in endpoint implementations"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server_version = 'OpenFoodStandin/' + VERSION
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        parsed = urlparse(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        self.stale = False
+        try:
+            self.body = self.read_json()
+        except InvalidRequest as e:
+            self.send_json(422, {'detail': str(e)})
+            return
+
+        handler, self.path_params = match_route(method, parsed.path)
+        if handler is None:
+            self.send_json(404, {'detail': 'Not Found'})
+            return
+        if method == 'POST' and not isinstance(self.body, dict):
+            self.send_json(422, {'detail': 'request body must be a JSON object'})
+            return
+
+        config = self.server.config
+        delay = config.latency + (self.server.random() * 2 - 1) * config.jitter
+        if delay > 0:
+            time.sleep(delay)
+        if config.failure_rate and self.server.random() < config.failure_rate:
+            self.send_json(config.failure_status, {'detail': 'Injected failure'})
+            return
+        if config.drop_rate and self.server.random() < config.drop_rate:
+            self.close_connection = True
+            return
+
+        try:
+            getattr(self, handler)()
+        except UpstreamError as e:
+            self.send_json(e.status, {'detail': e.detail})
+        except InvalidRequest as e:
+            self.send_json(422, {'detail': str(e)})
+
+    def read_json(self):
+        """The JSON body, {} when there is none; raises InvalidRequest when it cannot be read or decoded"""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            # The body cannot be skipped without its length, so the connection cannot be reused
+            self.close_connection = True
+            raise InvalidRequest('Content-Length must be an integer') from None
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            raise InvalidRequest('request body is not valid JSON') from None
+
+    def send_json(self, status, payload):
+        if self.stale and isinstance(payload, dict):
+            payload = {**payload, 'stale': True}
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def upstream_call(self, ids=0):
+        """Simulate the YouTube Data API round trip on a cache miss"""
+        config = self.server.config
+        self.upstream_wait('YouTube', config.upstream_latency + config.upstream_latency_per_id * ids)
+
+    def upstream_wait(self, api, latency):
+        """Wait out an upstream API call with the configured chaos; raises UpstreamError when it fails"""
+        config = self.server.config
+        latency += config.upstream_slowdown
+        if config.upstream_timeout is not None and latency > config.upstream_timeout:
+            time.sleep(config.upstream_timeout)
+            raise UpstreamError(504, f'{api} API timed out')
+        time.sleep(latency)
+        if config.upstream_error_rate and self.server.random() < config.upstream_error_rate:
+            raise UpstreamError(429, f'{api} API quota exceeded')
+
+    def cached_upstream(self, cache, key, fetch):
+        """
+        Serve `key` from `cache`, calling `fetch` on a miss; returns (value, cached).
+
+        When the upstream call fails and serve_stale is on, an expired entry
+        is served instead and the response is marked stale.
+        """
+        value = cache.get(key)
+        if value is not None:
+            return value, True
+        try:
+            value = fetch()
+        except UpstreamError:
+            value = cache.get_stale(key) if self.server.config.serve_stale else None
+            if value is None:
+                raise
+            self.stale = True
+            return value, True
+        cache.set(key, value)
+        return value, False
+
+    def nutrition_targets(self):
+        """Daily targets from the body, defaulting like the Flutter client"""
+        defaults = {'calories': 2000, 'protein': 120, 'fat': 65, 'carbs': 250}
+        try:
+            return {key: float(self.body.get(f'{key}_target') or default) for key, default in defaults.items()}
+        except (TypeError, ValueError):
+            return None
+
+    def generate_days(self, days):
+        """Simulate meal generation, which takes time per generated day"""
+        targets = self.nutrition_targets()
+        if targets is None:
+            self.send_json(422, {'detail': 'nutrition targets must be numbers'})
+            return None
+        time.sleep(self.server.config.generation_latency_per_day * len(days))
+        seed_text = json.dumps(self.body, sort_keys=True, ensure_ascii=False)
+        return targets, [make_day_plan(day, targets, seed_text) for day in days]
+
+    def weekly_plan(self):
+        generated = self.generate_days(DAYS_OF_WEEK)
+        if generated is None:
+            return None
+        targets, days = generated
+        return {
+            'id': hashlib.sha1(json.dumps(self.body, sort_keys=True).encode('utf-8')).hexdigest()[:12],
+            'user_id': self.query.get('user_id') or self.body.get('user_id') or 'default',
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'nutrition_targets': {f'{key}_target': value for key, value in targets.items()},
+            'weekly_plan': {day['day_of_week']: day for day in days},
+        }
+
+    def handle_meal_plan_generate(self):
+        plan = self.weekly_plan()
+        if plan is not None:
+            self.send_json(200, {'meal_plan': plan})
+
+    def handle_generate_weekly(self):
+        plan = self.weekly_plan()
+        if plan is not None:
+            self.send_json(200, plan)
+
+    def handle_replace_day(self):
+        day = self.body.get('day_of_week') or self.body.get('day')
+        if day not in DAYS_OF_WEEK:
+            self.send_json(422, {'detail': f'day_of_week must be one of {DAYS_OF_WEEK}'})
+            return
+        generated = self.generate_days([day])
+        if generated is not None:
+            self.send_json(200, {'day_plan': generated[1][0]})
+
+    def cached_usda(self, key, latency, build):
+        """Serve from the USDA cache, paying `latency` on a miss; returns (value, cached)"""
+        def fetch():
+            self.upstream_wait('USDA', latency)
+            return build()
+
+        return self.cached_upstream(self.server.usda_cache, key, fetch)
+
+    def english_query(self):
+        """The query in English, translated through the cache when `vietnamese` is set"""
+        query = str(self.query.get('query', '')).strip()
+        if self.query.get('vietnamese', 'false').lower() != 'true':
+            return query, True
+        return self.cached_usda(('translate', query.lower()), self.server.config.translate_latency,
+                                lambda: translate(query))
+
+    def usda_foods(self, english, max_results):
+        return self.cached_usda(('search', english, max_results), self.server.config.usda_latency,
+                                lambda: [make_food(english, i) for i in range(max_results)])
+
+    def handle_usda_translate(self):
+        query = str(self.query.get('vietnamese_query', '')).strip()
+        if not query:
+            self.send_json(422, {'detail': 'vietnamese_query is required'})
+            return
+        english, cached = self.cached_usda(('translate', query.lower()), self.server.config.translate_latency,
+                                           lambda: translate(query))
+        self.send_json(200, {'vietnamese_query': query, 'english_query': english, 'cached': cached})
+
+    def handle_usda_search(self):
+        if not self.query.get('query'):
+            self.send_json(422, {'detail': 'query is required'})
+            return
+        english, translated_cached = self.english_query()
+        foods, cached = self.usda_foods(english, number(self.query, 'max_results', 20))
+        self.send_json(200, {
+            'query': self.query['query'],
+            'english_query': english,
+            'results': foods,
+            'total': len(foods),
+            'cached': cached and translated_cached,
+        })
+
+    def handle_usda_nutrition(self):
+        if not self.query.get('query'):
+            self.send_json(422, {'detail': 'query is required'})
+            return
+        english, translated_cached = self.english_query()
+        foods, cached = self.usda_foods(english, 5)
+        amount = number(self.query, 'amount', 100, float)
+        nutrients = {key: round(value * amount / 100, 1) for key, value in foods[0]['nutrients'].items()}
+        self.send_json(200, {
+            'query': self.query['query'],
+            'english_query': english,
+            'food': foods[0]['description'],
+            'amount': amount,
+            **nutrients,
+            'cached': cached and translated_cached,
+        })
+
+    def handle_usda_food(self):
+        fdc_id = self.path_params['fdc_id']
+        if not fdc_id.isdigit():
+            self.send_json(422, {'detail': 'fdc_id must be a number'})
+            return
+        food, cached = self.cached_usda(('food', fdc_id), self.server.config.usda_latency,
+                                        lambda: {**make_food(f'food {fdc_id}', 0), 'fdcId': int(fdc_id)})
+        self.send_json(200, {**food, 'cached': cached})
+
+    def handle_usda_clear_cache(self):
+        self.server.usda_cache.clear()
+        self.send_json(200, {'message': 'USDA cache cleared'})
+
+    def ai_answer(self, build, items=0):
+        """Send an LLM-style answer: slow, and worded differently every call unless ai_cache is on"""
+        config = self.server.config
+        params = {**self.query, **(self.body if isinstance(self.body, dict) else {})}
+        key = (self.path.split('?')[0], json.dumps(params, sort_keys=True, ensure_ascii=False))
+        answer = self.server.ai_cache.get(key) if config.ai_cache else None
+        if answer is None:
+            time.sleep(config.ai_latency + config.ai_latency_per_item * items)
+            answer = {**build(params), 'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+            if config.ai_cache:
+                self.server.ai_cache.set(key, answer)
+        self.send_json(200, answer)
+
+    def confidence(self):
+        return round(0.6 + self.server.random() * 0.35, 2)
+
+    def handle_ai_health(self):
+        self.send_json(200, {'status': 'healthy', 'ai_service_available': True,
+                             'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())})
+
+    def handle_ai_trends(self):
+        self.ai_answer(lambda params: {
+            'analysis_date': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'category': params.get('category') or 'Tất cả',
+            'period_days': number(params, 'days_back', 30),
+            'trend': ['stable', 'increasing', 'decreasing'][int(self.server.random() * 3)],
+            'insights': [{
+                'title': 'Xu hướng giá',
+                'description': f"Giá {params.get('category') or 'thực phẩm'} trong "
+                               f"{params.get('days_back', 30)} ngày qua.",
+                'confidence': self.confidence(),
+                'category': 'trend',
+            }],
+            'recommendations': ['Mua rau củ trong tuần này'],
+            'price_alerts': [],
+        })
+
+    def handle_ai_predict(self):
+        food_name = text({**self.query, **(self.body if isinstance(self.body, dict) else {})}, 'food_name')
+
+        def build(params):
+            price = next((p for name, _, p, _ in FOOD_PRICES if name == food_name), 50000)
+            change = 1 + (self.server.random() - 0.4) * 0.1
+            return {
+                'food_name': food_name,
+                'current_price': price,
+                'predicted_price': round(price * change, -2),
+                'prediction_days': number(params, 'days_ahead', 7),
+                'confidence': round(self.confidence() * 100),
+                'trend': 'increasing' if change > 1 else 'decreasing',
+                'factors': ['Nhu cầu cao', 'Cung cấp hạn chế'],
+                'recommendation': 'Nên mua ngay trước khi giá tăng' if change > 1 else 'Có thể chờ giá giảm',
+                'price_range': {'min': round(price * 0.95, -2), 'max': round(price * 1.1, -2)},
+            }
+        self.ai_answer(build)
+
+    def handle_ai_seasonal(self):
+        self.ai_answer(lambda params: {
+            'category': params.get('category') or 'Tất cả',
+            'current_season': 'Mùa khô',
+            'seasonal_foods': [name for name, _, _, category in FOOD_PRICES
+                               if category == params.get('category')][:8] or ['rau muống', 'xoài'],
+            'price_predictions': {'next_month': 'stable'},
+            'confidence': self.confidence(),
+        })
+
+    def handle_ai_optimize(self):
+        items = self.body.get('grocery_items')
+        if not (isinstance(items, list)
+                and all(isinstance(item, dict) and isinstance(item.get('name'), str) and item['name']
+                        for item in items)):
+            self.send_json(422, {'detail': 'grocery_items must be a list of objects with a name'})
+            return
+        # Cheapest item of each category, suggested as the substitute
+        cheapest = {}
+        for name, _, price, category in FOOD_PRICES:
+            if category not in cheapest or price < cheapest[category][0]:
+                cheapest[category] = (price, name)
+
+        def build(params):
+            substitutions = {}
+            for item in items:
+                price, name = cheapest.get(item.get('category'), (None, None))
+                if name and name != item.get('name') and price < number(item, 'price_per_unit', 0, float):
+                    substitutions[item['name']] = name
+            total = sum(number(item, 'estimated_cost', 0, float) for item in items)
+            return {
+                'total_items': len(items),
+                'optimization_suggestions': [f'Thay {name} bằng {other} để tiết kiệm'
+                                             for name, other in substitutions.items()],
+                'substitution_recommendations': substitutions,
+                'timing_advice': 'Mua sáng sớm để có giá tốt',
+                'budget_optimization': f'Có thể tiết kiệm {round(self.server.random() * 30)}% '
+                                       f'trên tổng {total:,} VND',
+                'health_insights': 'Cân bằng protein và vitamin',
+                'sustainability_tips': 'Ưu tiên thực phẩm địa phương',
+            }
+        self.ai_answer(build, items=len(items))
+
+    def handle_ai_market(self):
+        self.ai_answer(lambda params: {
+            'region': params.get('region') or 'Việt Nam',
+            'market_overview': 'Thị trường thực phẩm ổn định',
+            'key_trends': ['Giá thịt tăng nhẹ', 'Rau củ giảm giá theo mùa'],
+            'confidence': self.confidence(),
+        })
+
+    def handle_root(self):
+        self.send_json(200, {
+            'message': 'OpenFood Backend API',
+            'version': VERSION,
+            'features': ['Meal Planning', 'USDA Food Data', 'AI Price Analysis', 'YouTube Proxy'],
+        })
+
+    def handle_health(self):
+        self.send_json(200, {'status': 'healthy', 'version': VERSION})
+
+    def handle_docs(self):
+        body = b'<!DOCTYPE html><html><head><title>OpenFood API - Swagger UI</title></head></html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_openapi(self):
+        paths = {}
+        for method, path in ROUTES:
+            if path not in ('/docs', '/openapi.json'):
+                # FastAPI derives operationId from the endpoint function name, path and method
+                operation_id = ROUTES[(method, path)] + re.sub(r'\W', '_', path) + '_' + method.lower()
+                operation = {'summary': ROUTES[(method, path)], 'operationId': operation_id}
+                if method == 'GET' and path in ROUTE_PARAMETERS:
+                    operation['parameters'] = openapi_parameters(path)
+                paths.setdefault(path, {})[method.lower()] = operation
+        self.send_json(200, {
+            'openapi': '3.1.0',
+            'info': {'title': 'OpenFood Backend API', 'version': VERSION},
+            'paths': paths,
+        })
+
+    def handle_search(self):
+        query = text(self.body, 'query')
+        if not query:
+            self.send_json(422, {'detail': 'query is required'})
+            return
+        max_results = number(self.body, 'max_results', 5)
+        key = ('search', query, max_results, self.body.get('duration'), self.body.get('order'))
+
+        def fetch():
+            self.upstream_call()
+            return [make_video(query, i) for i in range(max_results)]
+
+        videos, cached = self.cached_upstream(self.server.cache, key, fetch)
+        self.send_json(200, {'videos': videos, 'cached': cached, 'query': query, 'total': len(videos)})
+
+    def handle_details(self):
+        video_ids = self.body.get('video_ids') or []
+        if not (isinstance(video_ids, list) and video_ids
+                and all(isinstance(video_id, str) and video_id for video_id in video_ids)):
+            self.send_json(422, {'detail': 'video_ids must be a non-empty list of non-empty strings'})
+            return
+
+        cache = self.server.cache
+        found = {video_id: cache.get(('details', video_id)) for video_id in video_ids}
+        missing = [video_id for video_id, video in found.items() if video is None]
+        if missing:
+            try:
+                self.upstream_call(len(missing))
+            except UpstreamError:
+                stale = {video_id: cache.get_stale(('details', video_id)) for video_id in missing}
+                if not self.server.config.serve_stale or None in stale.values():
+                    raise
+                found.update(stale)
+                self.stale = True
+                missing = []
+            for video_id in missing:
+                found[video_id] = make_video(video_id, 0, video_id)
+                cache.set(('details', video_id), found[video_id])
+
+        self.send_json(200, {
+            'videos': [found[video_id] for video_id in video_ids],
+            'cached': not missing,
+        })
+
+    def handle_trending(self):
+        max_results = number(self.query, 'max_results', 10)
+        key = ('trending', max_results)
+
+        def fetch():
+            self.upstream_call()
+            return [make_video('món ăn Việt Nam', i) for i in range(max_results)]
+
+        videos, cached = self.cached_upstream(self.server.cache, key, fetch)
+        self.send_json(200, {'videos': videos, 'cached': cached, 'total': len(videos)})
+
+    def handle_cache_stats(self):
+        self.send_json(200, self.server.cache.stats())
+
+    def handle_cache_clear(self):
+        self.server.cache.clear()
+        self.send_json(200, {'message': 'Cache cleared'})
+
+
+def start_standin(config=None, host='127.0.0.1', port=0):
+    """Start the stand-in on a background thread; port 0 picks a free port"""
+    server = StandinServer((host, port), config)
+    server.thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server.thread.start()
+    return server
+
+
+def add_standin_arguments(parser):
+    """Add the --standin options shared by the endpoint scripts"""
+    group = parser.add_argument_group('local stand-in backend')
+    group.add_argument('--standin', action='store_true',
+                       help='Run against an in-process stand-in instead of a live backend')
+    group.add_argument('--standin-latency', type=float, default=0.0,
+                       help='Artificial latency per request in seconds')
+    group.add_argument('--standin-jitter', type=float, default=0.0,
+                       help='Uniform +/- jitter added to the latency in seconds')
+    group.add_argument('--standin-generation-latency', type=float, default=0.3,
+                       help='Meal-plan generation time per generated day in seconds')
+    group.add_argument('--standin-usda-latency', type=float, default=0.3,
+                       help='Extra latency on USDA cache misses, simulating the USDA API')
+    group.add_argument('--standin-translate-latency', type=float, default=0.15,
+                       help='Extra latency on translation cache misses')
+    group.add_argument('--standin-ai-latency', type=float, default=1.5,
+                       help='LLM time per AI price request in seconds')
+    group.add_argument('--standin-ai-cache', action='store_true',
+                       help='Serve identical AI price requests from a response cache')
+    group.add_argument('--standin-failure-rate', type=float, default=0.0,
+                       help='Fraction of requests answered with HTTP 500')
+    group.add_argument('--standin-drop-rate', type=float, default=0.0,
+                       help='Fraction of requests whose connection is closed without a response')
+    group.add_argument('--standin-upstream-slowdown', type=float, default=0.0,
+                       help='Extra seconds on every YouTube/USDA upstream call')
+    group.add_argument('--standin-upstream-error-rate', type=float, default=0.0,
+                       help='Fraction of upstream calls failing with 429 quota exceeded')
+    group.add_argument('--standin-upstream-timeout', type=float,
+                       help="Backend's own upstream timeout in seconds (504 when exceeded)")
+    group.add_argument('--standin-serve-stale', action='store_true',
+                       help='Serve expired cache entries when an upstream call fails')
+    group.add_argument('--standin-seed', type=int, default=0, help='Seed for latency and failure injection')
+    group.add_argument('--standin-cache-hours', type=float, default=24, help='Stand-in cache TTL in hours')
+    group.add_argument('--standin-max-cache-size', type=int, default=1000, help='Stand-in cache capacity')
+
+
+def standin_from_args(args):
+    """Start a stand-in when --standin was given, otherwise return None"""
+    if not args.standin:
+        return None
+    server = start_standin(StandinConfig(
+        latency=args.standin_latency,
+        jitter=args.standin_jitter,
+        generation_latency_per_day=args.standin_generation_latency,
+        usda_latency=args.standin_usda_latency,
+        translate_latency=args.standin_translate_latency,
+        ai_latency=args.standin_ai_latency,
+        ai_cache=args.standin_ai_cache,
+        failure_rate=args.standin_failure_rate,
+        drop_rate=args.standin_drop_rate,
+        upstream_slowdown=args.standin_upstream_slowdown,
+        upstream_error_rate=args.standin_upstream_error_rate,
+        upstream_timeout=args.standin_upstream_timeout,
+        serve_stale=args.standin_serve_stale,
+        seed=args.standin_seed,
+        cache_duration_hours=args.standin_cache_hours,
+        max_cache_size=args.standin_max_cache_size,
+    ))
+    print(f'🧪 Local stand-in backend running at {server.base_url}')
+    return server
+
+
+def main():
+    """Run the stand-in as a standalone server"""
+    parser = argparse.ArgumentParser(description='Local stand-in for the OpenFood backend')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='Artificial latency per request in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- jitter in seconds')
+    parser.add_argument('--upstream-latency', type=float, default=0.2,
+                        help='Extra latency on cache misses, simulating the YouTube API')
+    parser.add_argument('--generation-latency', type=float, default=0.3,
+                        help='Meal-plan generation time per generated day in seconds')
+    parser.add_argument('--usda-latency', type=float, default=0.3,
+                        help='Extra latency on USDA cache misses, simulating the USDA API')
+    parser.add_argument('--translate-latency', type=float, default=0.15,
+                        help='Extra latency on translation cache misses')
+    parser.add_argument('--ai-latency', type=float, default=1.5, help='LLM time per AI price request in seconds')
+    parser.add_argument('--ai-cache', action='store_true',
+                        help='Serve identical AI price requests from a response cache')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--failure-status', type=int, default=500, help='Status code for injected failures')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Fraction of requests whose connection is closed without a response')
+    parser.add_argument('--upstream-slowdown', type=float, default=0.0,
+                        help='Extra seconds on every YouTube/USDA upstream call')
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0,
+                        help='Fraction of upstream calls failing with 429 quota exceeded')
+    parser.add_argument('--upstream-timeout', type=float,
+                        help="Backend's own upstream timeout in seconds (504 when exceeded)")
+    parser.add_argument('--serve-stale', action='store_true',
+                        help='Serve expired cache entries when an upstream call fails')
+    parser.add_argument('--cache-hours', type=float, default=24, help='Cache TTL in hours')
+    parser.add_argument('--max-cache-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        upstream_latency=args.upstream_latency,
+        generation_latency_per_day=args.generation_latency,
+        usda_latency=args.usda_latency,
+        translate_latency=args.translate_latency,
+        ai_latency=args.ai_latency,
+        ai_cache=args.ai_cache,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        drop_rate=args.drop_rate,
+        upstream_slowdown=args.upstream_slowdown,
+        upstream_error_rate=args.upstream_error_rate,
+        upstream_timeout=args.upstream_timeout,
+        serve_stale=args.serve_stale,
+        cache_duration_hours=args.cache_hours,
+        max_cache_size=args.max_cache_size,
+        seed=args.seed,
+    )
+    server = StandinServer((args.host, args.port), config)
+    print(f'🧪 Stand-in backend listening on {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\n👋 Stopping stand-in backend')
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
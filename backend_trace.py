@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Record and Replay Backend Traffic
+
+A TraceWriter plugs into the pooled client as a recorder and stores every
+request/response pair (method, path, JSON body, status, latency, response
+body) with its offset from the start of the recording. Traces are JSON
+Lines, gzip-compressed when the path ends in .gz.
+
+`replay` re-sends a trace against any base URL, keeping the original
+inter-arrival times at 1x, scaled by --speed, or as fast as the workers
+allow with --speed max, and compares replayed latency and status codes
+with the recorded ones.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import threading
+import time
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, AsyncBackendClient
+from backend_load import percentile
+from backend_results import add_results_arguments, results_from_args
+
+
+def open_trace(path, mode):
+    """Open a trace file as text, through gzip for .gz paths"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _decode_body(content):
+    """Parsed JSON when possible, else text, else None for an empty body"""
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        return content.decode('utf-8', errors='replace')
+
+
+def _request_body(content):
+    """Trace fields for a request body: `body` holds decoded JSON, `body_text` anything else"""
+    if not content:
+        return {'body': None}
+    try:
+        return {'body': json.loads(content)}
+    except ValueError:
+        return {'body': None, 'body_text': content.decode('utf-8', errors='replace')}
+
+
+class TraceWriter:
+    """Thread-safe recorder writing request/response pairs to a trace file"""
+
+    def __init__(self, path, base_url, bodies=True):
+        self.path = path
+        self.bodies = bodies
+        self.start_time = time.monotonic()
+        self.file = open_trace(path, 'a')
+        self.lock = threading.Lock()
+        self.write({'type': 'trace', 'base_url': base_url, 'started_at': time.time()})
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            self.file.write(line + '\n')
+
+    def record_request(self, request, latency, status=None, response=None, error=None):
+        if request is None:
+            return
+        url = request.url
+        record = {
+            # Offset of the send, so replays keep the original inter-arrival times
+            't': round(time.monotonic() - self.start_time - (latency or 0), 6),
+            'method': request.method,
+            'path': url.raw_path.decode('ascii'),
+            **_request_body(request.content),
+            'status': status,
+            'latency': round(latency, 6) if latency is not None else None,
+        }
+        if error:
+            record['error'] = error
+        if self.bodies and response is not None:
+            record['response'] = _decode_body(response.content)
+        self.write(record)
+
+    def record_response(self, method, path, response, latency, **extra):
+        self.record_request(response.request, latency, response.status_code, response)
+
+    def record_error(self, method, path, error, latency, **extra):
+        request = error.request if isinstance(error, httpx.RequestError) else None
+        self.record_request(request, latency, error=type(error).__name__)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def add_trace_arguments(parser):
+    """Add the --record-trace options shared by the endpoint scripts"""
+    parser.add_argument('--record-trace', metavar='PATH',
+                        help='Record request/response pairs to this trace file (.gz to compress)')
+    parser.add_argument('--trace-no-bodies', action='store_true',
+                        help='Leave response bodies out of the trace')
+
+
+def trace_from_args(args, base_url):
+    """Open a TraceWriter when --record-trace was given, otherwise return None"""
+    if not args.record_trace:
+        return None
+    writer = TraceWriter(args.record_trace, base_url, bodies=not args.trace_no_bodies)
+    print(f'🎙️  Recording trace to {args.record_trace}')
+    return writer
+
+
+def load_trace(path):
+    """Return (header, entries sorted by send offset) from a trace file"""
+    header, entries = {}, []
+    offset = latest = 0.0
+    with open_trace(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('type') == 'trace':
+                # Appended recordings keep their own clock; shift them after the previous one's
+                # latest send, which need not be its last line (entries are written on completion)
+                header = header or record
+                offset = latest
+                continue
+            record['t'] += offset
+            latest = max(latest, record['t'])
+            entries.append(record)
+    entries.sort(key=lambda entry: entry['t'])
+    return header, entries
+
+
+async def replay_trace(base_url, entries, speed=1.0, concurrency=50, recorder=None):
+    """
+    Re-send trace entries against base_url.
+
+    Each request is sent at its recorded offset divided by `speed`; with
+    speed=None they are sent back to back. `concurrency` caps requests in
+    flight, so a slow target makes sends late rather than piling up
+    unbounded; the lag is reported.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async with AsyncBackendClient(base_url, retries=0, max_connections=concurrency,
+                                  recorder=recorder) as client:
+        start = time.perf_counter()
+
+        async def send(entry):
+            async with semaphore:
+                lag = time.perf_counter() - start - (entry['t'] / speed if speed else 0)
+                # Any decoded JSON value, scalars included, goes back out as JSON
+                if entry.get('body') is not None:
+                    options = {'json': entry['body']}
+                elif entry.get('body_text'):
+                    options = {'content': entry['body_text']}
+                else:
+                    options = {}
+                sent = time.perf_counter()
+                try:
+                    response = await client.request(entry['method'], entry['path'], **options)
+                    status, error = response.status_code, None
+                except httpx.HTTPError as e:
+                    status, error = None, type(e).__name__
+                results.append({'entry': entry, 'status': status, 'error': error,
+                                'latency': time.perf_counter() - sent, 'lag': max(0.0, lag)})
+
+        tasks = []
+        for entry in entries:
+            if speed:
+                delay = start + entry['t'] / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(entry)))
+            if not speed:
+                # Yield so the workers start before the whole trace is queued
+                await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {'elapsed': elapsed, 'results': results}
+
+
+def endpoint_of(entry):
+    return f"{entry['method']} {entry['path'].split('?')[0]}"
+
+
+def print_trace_info(header, entries):
+    """Summarize a trace: span, rate and endpoint mix"""
+    span = entries[-1]['t'] - entries[0]['t'] if len(entries) > 1 else 0.0
+    print(f"🎙️  Recorded from {header.get('base_url', 'unknown')}")
+    print(f"   {len(entries)} requests over {span:.1f}s"
+          + (f" ({len(entries) / span:.1f} req/s)" if span else ''))
+    mix = {}
+    for entry in entries:
+        mix[endpoint_of(entry)] = mix.get(endpoint_of(entry), 0) + 1
+    for name, count in sorted(mix.items(), key=lambda item: -item[1]):
+        print(f"   {count:>7} {count / len(entries) * 100:5.1f}%  {name}")
+
+
+def print_replay_report(replay, speed):
+    """Compare replayed latency and status codes with the recorded ones"""
+    results = replay['results']
+    print("\n" + "=" * 78)
+    print(f"📊 Replay Report ({'max speed' if not speed else f'{speed:g}x'}, "
+          f"{len(results)} requests in {replay['elapsed']:.1f}s, "
+          f"{len(results) / replay['elapsed']:.1f} req/s)")
+    print("-" * 78)
+    print(f"   {'Endpoint':<32} {'Reqs':>6} {'rec p50':>8} {'p50':>8} {'rec p95':>8} {'p95':>8} {'Δstatus':>8}")
+
+    grouped = {}
+    for result in results:
+        grouped.setdefault(endpoint_of(result['entry']), []).append(result)
+    for name, group in sorted(grouped.items()):
+        recorded = sorted(r['entry']['latency'] for r in group if r['entry'].get('latency') is not None)
+        replayed = sorted(r['latency'] for r in group if not r['error'])
+        mismatched = sum(1 for r in group if r['status'] != r['entry'].get('status'))
+        print(f"   {name:<32} {len(group):>6} "
+              f"{percentile(recorded, 50) * 1000:>6.0f}ms {percentile(replayed, 50) * 1000:>6.0f}ms "
+              f"{percentile(recorded, 95) * 1000:>6.0f}ms {percentile(replayed, 95) * 1000:>6.0f}ms "
+              f"{mismatched:>8}")
+
+    lags = sorted(r['lag'] for r in results)
+    if speed and lags:
+        print("-" * 78)
+        print(f"   Send lag behind schedule: p50 {percentile(lags, 50) * 1000:.0f}ms, "
+              f"p99 {percentile(lags, 99) * 1000:.0f}ms, max {lags[-1] * 1000:.0f}ms")
+        if percentile(lags, 99) > 0.1:
+            print("⚠️  Replay fell behind the recorded timing: raise --concurrency or the target is saturated")
+
+
+def parse_speed(text):
+    """'max' for back-to-back sends, otherwise a positive multiplier"""
+    if text.lower() == 'max':
+        return None
+    speed = float(text.lower().rstrip('x'))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError('speed must be positive or "max"')
+    return speed
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Inspect and replay recorded backend traffic')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    info = commands.add_parser('info', help='Summarize a trace file')
+    info.add_argument('trace')
+
+    replay = commands.add_parser('replay', help='Re-send a trace against a backend')
+    replay.add_argument('trace')
+    replay.add_argument('--base-url', default=LOCAL_BASE_URL, help='Backend base URL to replay against')
+    replay.add_argument('--speed', type=parse_speed, default=1.0,
+                        help='Timing multiplier, e.g. 1, 2x, 10x, or "max" (default 1x)')
+    replay.add_argument('--concurrency', type=int, default=50, help='Maximum requests in flight')
+    replay.add_argument('--endpoint', action='append',
+                        help='Only replay endpoints containing this text (repeatable)')
+    add_results_arguments(replay)
+    args = parser.parse_args()
+
+    header, entries = load_trace(args.trace)
+    if not entries:
+        print(f'❌ {args.trace} has no requests')
+        return
+
+    if args.command == 'info':
+        print_trace_info(header, entries)
+        return
+
+    if args.endpoint:
+        entries = [entry for entry in entries if any(text in endpoint_of(entry) for text in args.endpoint)]
+        if not entries:
+            print(f"❌ No matching requests for {', '.join(args.endpoint)} in {args.trace}")
+            return
+    # Start the clock at the first request, not at when recording began
+    first = entries[0]['t']
+    entries = [{**entry, 't': entry['t'] - first} for entry in entries]
+
+    recorder = results_from_args(args, 'backend_trace', args.base_url, trace=args.trace, speed=args.speed)
+    print_trace_info(header, entries)
+    print(f"🔁 Replaying against {args.base_url}")
+    try:
+        result = asyncio.run(replay_trace(args.base_url, entries, speed=args.speed,
+                                          concurrency=args.concurrency, recorder=recorder))
+    finally:
+        if recorder:
+            recorder.close()
+    print_replay_report(result, args.speed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Realistic Request Workloads for Backend Benchmarks
+"""
+
+import itertools
+import math
+import random
+
+# Ordered roughly by how often they show up in generated meal plans
+POPULAR_DISHES = [
+    'Phở Bò',
+    'Bún Chả',
+    'Cơm Tấm',
+    'Bánh Mì',
+    'Bún Bò Huế',
+    'Gỏi Cuốn',
+    'Canh Chua',
+    'Phở Gà',
+    'Bánh Xèo',
+    'Cá hồi nướng với khoai lang và rau củ',
+    'Bún riêu cua',
+    'Cháo gà',
+    'Cơm chiên dương châu',
+    'Thịt kho trứng',
+    'Cá kho tộ',
+    'Gà luộc lá chanh',
+    'Rau muống xào tỏi',
+    'Đậu phụ sốt cà chua',
+    'Canh bí đỏ thịt bằm',
+    'Bánh mì trứng ốp la',
+    'Mì Quảng',
+    'Hủ tiếu Nam Vang',
+    'Bò lúc lắc',
+    'Chả Cá',
+    'Nem Nướng',
+    'Bánh cuốn',
+    'Xôi gà',
+    'Bánh Mì Chả Cá Nha Trang',
+    'Phở Gà Nấu Dừa Miền Tây',
+    'Cao lầu',
+    'Bún thịt nướng',
+    'Lẩu thái hải sản',
+    'Gà kho gừng',
+    'Sườn xào chua ngọt',
+    'Canh cải thịt bằm',
+    'Tôm rang me',
+    'Mực xào thập cẩm',
+    'Ức gà áp chảo salad',
+    'Yến mạch sữa chua trái cây',
+    'Salad cá ngừ',
+]
+
+DISH_VARIANTS = ['', ' chay', ' Hà Nội', ' miền Tây', ' kiểu Huế', ' ít dầu mỡ', ' cho người ăn kiêng']
+
+
+def dish_catalog(variants=True):
+    """Popular dishes followed by a long tail of regional and diet variants"""
+    if not variants:
+        return list(POPULAR_DISHES)
+    return [f'{dish}{variant}' for variant in DISH_VARIANTS for dish in POPULAR_DISHES]
+
+
+# What RealVideoService sends for a meal-plan dish, so warmed entries match app requests
+APP_SEARCH = {'max_results': 5, 'duration': 'medium', 'order': 'relevance'}
+
+
+# test_render_endpoints.py's smoke checks as load scenarios, replayed by the open-loop
+# generator and the monitor
+RENDER_SCENARIOS = [
+    {'name': 'Backend Health', 'method': 'GET', 'path': '/'},
+    {
+        'name': 'YouTube Search',
+        'method': 'POST',
+        'path': '/youtube/search',
+        'json': {'query': 'Phở Bò', 'max_results': 2, 'duration': 'medium', 'order': 'relevance'},
+    },
+    {
+        'name': 'YouTube Details',
+        'method': 'POST',
+        'path': '/youtube/details',
+        'json': {'video_ids': ['dQw4w9WgXcQ', 'jNQXAC9IVRw']},
+    },
+    {'name': 'Cache Stats', 'method': 'GET', 'path': '/youtube/cache/stats'},
+    {'name': 'YouTube Trending', 'method': 'GET', 'path': '/youtube/trending', 'params': {'max_results': 2}},
+]
+
+
+# test_youtube_backend.py's functional tests as load scenarios, replayed by its load mode
+# and bench_compare.py
+YOUTUBE_SCENARIOS = [
+    {'name': 'Backend Health', 'method': 'GET', 'path': '/'},
+    {
+        'name': 'YouTube Search',
+        'method': 'POST',
+        'path': '/youtube/search',
+        'json': {
+            'query': 'Cá hồi nướng với khoai lang và rau củ',
+            'max_results': 3,
+            'duration': 'medium',
+            'order': 'relevance'
+        },
+    },
+    {'name': 'YouTube Trending', 'method': 'GET', 'path': '/youtube/trending', 'params': {'max_results': 5}},
+    {'name': 'Cache Stats', 'method': 'GET', 'path': '/youtube/cache/stats'},
+]
+
+
+# Day names as the app and backend spell them in day_of_week
+DAYS_OF_WEEK = ['Thứ 2', 'Thứ 3', 'Thứ 4', 'Thứ 5', 'Thứ 6', 'Thứ 7', 'Chủ Nhật']
+
+# Representative app users: daily targets as the onboarding TDEE calculator
+# produces them, with the preference fields the meal-plan endpoints accept
+USER_PROFILES = [
+    {
+        'name': 'weight loss',
+        'calories_target': 1500, 'protein_target': 110, 'fat_target': 45, 'carbs_target': 160,
+        'preferences': ['healthy', 'low-carb'],
+        'allergies': [],
+        'cuisine_style': 'Vietnamese',
+        'diet_restrictions': [],
+        'health_conditions': [],
+        'diet_preference': 'balanced',
+    },
+    {
+        'name': 'maintenance',
+        'calories_target': 2000, 'protein_target': 120, 'fat_target': 65, 'carbs_target': 250,
+        'preferences': [],
+        'allergies': [],
+        'cuisine_style': 'Vietnamese',
+        'diet_restrictions': [],
+        'health_conditions': [],
+        'diet_preference': 'balanced',
+    },
+    {
+        'name': 'muscle gain',
+        'calories_target': 2800, 'protein_target': 180, 'fat_target': 85, 'carbs_target': 330,
+        'preferences': ['high-protein'],
+        'allergies': ['peanuts'],
+        'cuisine_style': 'Vietnamese',
+        'diet_restrictions': [],
+        'health_conditions': [],
+        'diet_preference': 'high-protein',
+    },
+    {
+        'name': 'vegetarian diabetic',
+        'calories_target': 1800, 'protein_target': 80, 'fat_target': 60, 'carbs_target': 200,
+        'preferences': ['vegetarian'],
+        'allergies': ['shellfish'],
+        'cuisine_style': 'Vietnamese',
+        'diet_restrictions': ['vegetarian'],
+        'health_conditions': ['diabetes'],
+        'diet_preference': 'low-sugar',
+    },
+]
+
+
+def profile_targets(profile):
+    """Request body fields of a user profile (everything but its name)"""
+    return {key: value for key, value in profile.items() if key != 'name'}
+
+
+# Query parameters the Flutter client sends with the personalized endpoints
+APP_QUERY = {'user_id': 'flutter_app', 'use_ai': 'true'}
+
+
+def meal_plan_scenarios(profiles=USER_PROFILES):
+    """One scenario per endpoint and user profile; replace-day cycles through the week"""
+    scenarios = []
+    for index, profile in enumerate(profiles):
+        body = profile_targets(profile)
+        day = DAYS_OF_WEEK[index % len(DAYS_OF_WEEK)]
+        scenarios += [
+            {'name': 'Generate Plan', 'method': 'POST', 'path': '/api/meal-plan/generate',
+             'params': APP_QUERY, 'json': body},
+            {'name': 'Generate Weekly', 'method': 'POST', 'path': '/generate-weekly-meal',
+             'json': {'user_id': f'bench_{index}', **body}},
+            {'name': 'Replace Day', 'method': 'POST', 'path': '/api/replace-day',
+             'json': {'day_of_week': day, 'use_ai': True, **body}},
+            {'name': 'Replace Day (pers.)', 'method': 'POST', 'path': '/replace-day-personalized',
+             'params': APP_QUERY, 'json': {'day_of_week': day, **body}},
+        ]
+    return scenarios
+
+
+# The app's grocery price table (lib/models/grocery_cost_analysis.dart):
+# (name, unit, price per unit in VND, category)
+FOOD_PRICES = [
+    ('thịt bò', 'kg', 220000, '🥩 Thịt tươi sống'),
+    ('thịt heo', 'kg', 110000, '🥩 Thịt tươi sống'),
+    ('thịt gà', 'kg', 120000, '🥩 Thịt tươi sống'),
+    ('thịt vịt', 'kg', 130000, '🥩 Thịt tươi sống'),
+    ('thịt cừu', 'kg', 400000, '🥩 Thịt tươi sống'),
+    ('thịt dê', 'kg', 380000, '🥩 Thịt tươi sống'),
+    ('sườn heo', 'kg', 180000, '🥩 Thịt tươi sống'),
+    ('ba chỉ', 'kg', 170000, '🥩 Thịt tươi sống'),
+    ('đùi gà', 'kg', 100000, '🥩 Thịt tươi sống'),
+    ('cánh gà', 'kg', 90000, '🥩 Thịt tươi sống'),
+    ('ức gà', 'kg', 110000, '🥩 Thịt tươi sống'),
+    ('cá thu', 'kg', 200000, '🐟 Hải sản'),
+    ('cá hồi', 'kg', 350000, '🐟 Hải sản'),
+    ('cá ngừ', 'kg', 250000, '🐟 Hải sản'),
+    ('cá lóc', 'kg', 180000, '🐟 Hải sản'),
+    ('cá diêu hồng', 'kg', 120000, '🐟 Hải sản'),
+    ('cá chép', 'kg', 100000, '🐟 Hải sản'),
+    ('tôm sú', 'kg', 400000, '🐟 Hải sản'),
+    ('tôm thẻ', 'kg', 250000, '🐟 Hải sản'),
+    ('mực', 'kg', 300000, '🐟 Hải sản'),
+    ('bạch tuộc', 'kg', 350000, '🐟 Hải sản'),
+    ('nghêu', 'kg', 80000, '🐟 Hải sản'),
+    ('sò', 'kg', 120000, '🐟 Hải sản'),
+    ('hàu', 'kg', 200000, '🐟 Hải sản'),
+    ('cà chua', 'kg', 25000, '🥬 Rau củ quả'),
+    ('cà rốt', 'kg', 30000, '🥬 Rau củ quả'),
+    ('bắp cải', 'kg', 20000, '🥬 Rau củ quả'),
+    ('súp lơ', 'kg', 35000, '🥬 Rau củ quả'),
+    ('bông cải xanh', 'kg', 40000, '🥬 Rau củ quả'),
+    ('rau muống', 'kg', 15000, '🥬 Rau củ quả'),
+    ('rau dền', 'kg', 18000, '🥬 Rau củ quả'),
+    ('rau ngót', 'kg', 20000, '🥬 Rau củ quả'),
+    ('xà lách', 'kg', 30000, '🥬 Rau củ quả'),
+    ('hành tây', 'kg', 25000, '🥬 Rau củ quả'),
+    ('hành lá', 'kg', 40000, '🥬 Rau củ quả'),
+    ('tỏi', 'kg', 100000, '🥬 Rau củ quả'),
+    ('gừng', 'kg', 80000, '🥬 Rau củ quả'),
+    ('ớt', 'kg', 50000, '🥬 Rau củ quả'),
+    ('khoai tây', 'kg', 25000, '🥬 Rau củ quả'),
+    ('khoai lang', 'kg', 30000, '🥬 Rau củ quả'),
+    ('bí đỏ', 'kg', 20000, '🥬 Rau củ quả'),
+    ('bí xanh', 'kg', 18000, '🥬 Rau củ quả'),
+    ('mướp', 'kg', 22000, '🥬 Rau củ quả'),
+    ('đậu bắp', 'kg', 35000, '🥬 Rau củ quả'),
+    ('đậu cove', 'kg', 40000, '🥬 Rau củ quả'),
+    ('nấm', 'kg', 120000, '🥬 Rau củ quả'),
+    ('chuối', 'kg', 30000, '🍎 Trái cây'),
+    ('táo', 'kg', 60000, '🍎 Trái cây'),
+    ('cam', 'kg', 50000, '🍎 Trái cây'),
+    ('quýt', 'kg', 60000, '🍎 Trái cây'),
+    ('bưởi', 'kg', 40000, '🍎 Trái cây'),
+    ('dưa hấu', 'kg', 20000, '🍎 Trái cây'),
+    ('dưa lưới', 'kg', 70000, '🍎 Trái cây'),
+    ('xoài', 'kg', 45000, '🍎 Trái cây'),
+    ('đu đủ', 'kg', 25000, '🍎 Trái cây'),
+    ('thanh long', 'kg', 35000, '🍎 Trái cây'),
+    ('nhãn', 'kg', 60000, '🍎 Trái cây'),
+    ('vải', 'kg', 70000, '🍎 Trái cây'),
+    ('chôm chôm', 'kg', 55000, '🍎 Trái cây'),
+    ('sầu riêng', 'kg', 120000, '🍎 Trái cây'),
+    ('măng cụt', 'kg', 90000, '🍎 Trái cây'),
+    ('mít', 'kg', 40000, '🍎 Trái cây'),
+    ('gạo tẻ', 'kg', 18000, '🌾 Ngũ cốc & Gạo'),
+    ('gạo nếp', 'kg', 25000, '🌾 Ngũ cốc & Gạo'),
+    ('gạo lứt', 'kg', 30000, '🌾 Ngũ cốc & Gạo'),
+    ('bột mì', 'kg', 20000, '🌾 Ngũ cốc & Gạo'),
+    ('bột gạo', 'kg', 25000, '🌾 Ngũ cốc & Gạo'),
+    ('ngô', 'kg', 30000, '🌾 Ngũ cốc & Gạo'),
+    ('yến mạch', 'kg', 60000, '🌾 Ngũ cốc & Gạo'),
+    ('đậu phộng', 'kg', 70000, '🥜 Đậu & Hạt'),
+    ('đậu xanh', 'kg', 60000, '🥜 Đậu & Hạt'),
+    ('đậu đen', 'kg', 55000, '🥜 Đậu & Hạt'),
+    ('đậu nành', 'kg', 50000, '🥜 Đậu & Hạt'),
+    ('hạt điều', 'kg', 250000, '🥜 Đậu & Hạt'),
+    ('hạt hướng dương', 'kg', 120000, '🥜 Đậu & Hạt'),
+    ('hạt óc chó', 'kg', 350000, '🥜 Đậu & Hạt'),
+    ('hạt chia', 'kg', 200000, '🥜 Đậu & Hạt'),
+    ('trứng gà', 'quả', 4000, '🥛 Sữa & Trứng'),
+    ('trứng vịt', 'quả', 5000, '🥛 Sữa & Trứng'),
+    ('trứng cút', 'quả', 1500, '🥛 Sữa & Trứng'),
+    ('sữa tươi', 'lít', 30000, '🥛 Sữa & Trứng'),
+    ('sữa chua', 'kg', 40000, '🥛 Sữa & Trứng'),
+    ('phô mai', 'kg', 200000, '🥛 Sữa & Trứng'),
+    ('muối', 'kg', 15000, '🧂 Gia vị'),
+    ('đường', 'kg', 25000, '🧂 Gia vị'),
+    ('tiêu', 'kg', 200000, '🧂 Gia vị'),
+    ('bột ngọt', 'kg', 80000, '🧂 Gia vị'),
+    ('nước mắm', 'lít', 60000, '🧂 Gia vị'),
+    ('nước tương', 'lít', 50000, '🧂 Gia vị'),
+    ('dầu ăn', 'lít', 45000, '🧂 Gia vị'),
+    ('dầu hào', 'lít', 70000, '🧂 Gia vị'),
+    ('sa tế', 'kg', 120000, '🧂 Gia vị'),
+    ('tương ớt', 'kg', 80000, '🧂 Gia vị'),
+    ('bột nghệ', 'kg', 150000, '🧂 Gia vị'),
+    ('bột quế', 'kg', 200000, '🧂 Gia vị'),
+    ('hạt nêm', 'kg', 100000, '🧂 Gia vị'),
+    ('mật ong', 'kg', 250000, '🧂 Gia vị'),
+    ('nước lọc', 'lít', 10000, '🥤 Đồ uống'),
+    ('nước ngọt', 'lít', 20000, '🥤 Đồ uống'),
+    ('nước trái cây', 'lít', 30000, '🥤 Đồ uống'),
+    ('trà', 'kg', 150000, '🥤 Đồ uống'),
+    ('cà phê', 'kg', 200000, '🥤 Đồ uống'),
+    ('bia', 'lít', 40000, '🥤 Đồ uống'),
+    ('rượu', 'lít', 150000, '🥤 Đồ uống'),
+    ('bánh mì', 'ổ', 5000, '🍪 Bánh kẹo'),
+    ('bánh quy', 'kg', 100000, '🍪 Bánh kẹo'),
+    ('kẹo', 'kg', 120000, '🍪 Bánh kẹo'),
+    ('socola', 'kg', 250000, '🍪 Bánh kẹo'),
+    ('xúc xích', 'kg', 120000, '🍖 Thực phẩm chế biến'),
+    ('chả cá', 'kg', 150000, '🍖 Thực phẩm chế biến'),
+    ('nem chua', 'kg', 80000, '🍖 Thực phẩm chế biến'),
+    ('giò lụa', 'kg', 200000, '🍖 Thực phẩm chế biến'),
+    ('chả lụa', 'kg', 180000, '🍖 Thực phẩm chế biến'),
+    ('pate', 'kg', 100000, '🍖 Thực phẩm chế biến'),
+    ('ruốc', 'kg', 300000, '🍖 Thực phẩm chế biến'),
+    ('mắm tôm', 'kg', 80000, '🍖 Thực phẩm chế biến'),
+    ('tôm khô', 'kg', 500000, '🍖 Thực phẩm chế biến'),
+    ('mực khô', 'kg', 600000, '🍖 Thực phẩm chế biến'),
+]
+
+PRICE_CATEGORIES = list(dict.fromkeys(category for _, _, _, category in FOOD_PRICES))
+
+
+def grocery_item(entry, rng):
+    """A grocery list item for a FOOD_PRICES entry with a random amount"""
+    name, unit, price, category = entry
+    amount = rng.choice([0.2, 0.3, 0.5, 1, 2]) if unit in ('kg', 'lít') else rng.randint(1, 10)
+    return {
+        'name': name,
+        'amount': str(amount),
+        'unit': unit,
+        'category': category,
+        'estimated_cost': round(amount * price),
+        'price_per_unit': price,
+    }
+
+
+def grocery_list(size, seed=0):
+    """`size` grocery items shaped like the app's /ai-price/optimize-grocery payload"""
+    rng = random.Random(seed)
+    # Beyond the price table, repeat names with other amounts as a long list would
+    return [grocery_item(FOOD_PRICES[(index + seed) % len(FOOD_PRICES)], rng) for index in range(size)]
+
+
+class ZipfSampler:
+    """Seeded sampler where item k is drawn with weight 1 / k**s"""
+
+    def __init__(self, items, s=1.1, seed=0):
+        self.items = list(items)
+        self.rng = random.Random(seed)
+        weights = [1.0 / (rank ** s) for rank in range(1, len(self.items) + 1)]
+        self.cum_weights = list(itertools.accumulate(weights))
+
+    def sample(self):
+        return self.rng.choices(self.items, cum_weights=self.cum_weights)[0]
+
+    def stream(self, count):
+        """Yield `count` samples"""
+        for _ in range(count):
+            yield self.sample()
+
+
+# YouTube Data API v3 costs: search.list 100 units, videos.list 1 unit per call
+DAILY_QUOTA = 10_000
+SEARCH_UNITS = 100
+DETAILS_UNITS = 1
+
+
+class QuotaModel:
+    """Upstream units charged for cache misses"""
+
+    def __init__(self, search_units=SEARCH_UNITS, details_units=DETAILS_UNITS, details_batch=50):
+        self.search_units = search_units
+        self.details_units = details_units
+        # IDs per upstream videos.list call; 1 models a backend that calls YouTube per ID
+        self.details_batch = details_batch
+
+    def details_cost(self, missed_ids):
+        return math.ceil(missed_ids / self.details_batch) * self.details_units if missed_ids else 0
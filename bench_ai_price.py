@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Benchmark the AI Price Analysis Endpoints
+
+Every /ai-price/* request calls an LLM on the backend. This sends each
+endpoint the same payload repeatedly and a spread of varied payloads
+(categories, days_back, food names, days_ahead, regions), then grocery
+lists of growing length to /ai-price/optimize-grocery, and reports:
+
+- latency distributions per endpoint, against /ai-price/health as the
+  floor a cached answer could reach
+- whether identical requests are reused server-side (faster repeats or
+  byte-identical answers)
+- how latency and response size scale with grocery list length
+
+The AI endpoints are rate limited (10/minute in the integration notes):
+use --pause against a live backend, and expect 429s otherwise.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, AsyncBackendClient, json_body
+from backend_load import EndpointStats, fit_line, percentile
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import FOOD_PRICES, PRICE_CATEGORIES, grocery_list
+
+BASE_URL = LOCAL_BASE_URL
+REGIONS = ['Hà Nội', 'TP.HCM', 'Đà Nẵng', 'Cần Thơ', 'Hải Phòng']
+# Fields that change on every answer even when the analysis itself is reused
+VOLATILE_FIELDS = {'generated_at', 'analysis_date', 'timestamp'}
+
+
+def trends_payload(index):
+    return {'category': PRICE_CATEGORIES[index % len(PRICE_CATEGORIES)],
+            'days_back': [7, 30, 90, 365][index // len(PRICE_CATEGORIES) % 4]}
+
+
+def predict_payload(index):
+    return {'food_name': FOOD_PRICES[index % len(FOOD_PRICES)][0], 'days_ahead': [1, 7, 14, 30][index % 4]}
+
+
+def seasonal_payload(index):
+    return {'category': PRICE_CATEGORIES[index % len(PRICE_CATEGORIES)], 'current_month': index % 12 + 1}
+
+
+def optimize_payload(index, size=20):
+    # Same extra fields as the app's PriceAIAnalysisService
+    return {'grocery_items': grocery_list(size, seed=index), 'budget_limit': 500000,
+            'analysis_type': 'comprehensive', 'include_ai_insights': True}
+
+
+def market_payload(index):
+    return {'region': REGIONS[index % len(REGIONS)], 'include_trends': True}
+
+
+# (name, path, payload for the i-th distinct request)
+AI_ENDPOINTS = [
+    ('Analyze Trends', '/ai-price/analyze-trends', trends_payload),
+    ('Predict Price', '/ai-price/predict-price', predict_payload),
+    ('Seasonal', '/ai-price/analyze-seasonal', seasonal_payload),
+    ('Optimize Grocery', '/ai-price/optimize-grocery', optimize_payload),
+    ('Market Insights', '/ai-price/market-insights', market_payload),
+]
+
+
+def normalized(body):
+    """Response body without the volatile timestamp fields, for comparing answers"""
+    if isinstance(body, dict):
+        return {key: normalized(value) for key, value in body.items() if key not in VOLATILE_FIELDS}
+    if isinstance(body, list):
+        return [normalized(value) for value in body]
+    return body
+
+
+async def timed_request(client, stats, method, path, payload=None):
+    """
+    Send one request into `stats`; returns (latency, response, error).
+
+    On a transport failure response is None and error is the exception,
+    e.g. an httpx.TimeoutException when the endpoint's budget ran out. A 200
+    whose body is not a JSON object counts as an error, with a ValueError.
+    """
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, json=payload)
+    except httpx.HTTPError as e:
+        stats.record(None, error=True)
+        return time.perf_counter() - start, None, e
+    latency = time.perf_counter() - start
+    error = None
+    if response.status_code == 200 and json_body(response) is None:
+        error = ValueError('response body is not a JSON object')
+    stats.record(latency, response.status_code, error=response.status_code != 200 or error is not None)
+    return latency, response, error
+
+
+async def measure_floor(client, count):
+    """Latency of /ai-price/health: what a cached answer could cost"""
+    stats = EndpointStats('Health')
+    for _ in range(count):
+        await timed_request(client, stats, 'GET', '/ai-price/health')
+    return stats
+
+
+async def measure_repeats(client, path, payload, repeats, concurrency, pause):
+    """
+    Send one payload `repeats` times; returns (stats, distinct answers, first latency, repeat latencies).
+
+    The first request goes alone so a server-side cache can fill; the rest
+    run with up to `concurrency` in flight, the same load as the varied
+    pass they are compared with. Repeat latencies are the successful
+    requests after the first.
+    """
+    stats = EndpointStats(path)
+    semaphore = asyncio.Semaphore(concurrency)
+    answers, reused = set(), []
+
+    async def send(index):
+        async with semaphore:
+            latency, response, error = await timed_request(client, stats, 'POST', path, payload)
+            if error is None and response.status_code == 200:
+                answers.add(json.dumps(normalized(json_body(response)), sort_keys=True, ensure_ascii=False))
+                if index:
+                    reused.append(latency)
+            if pause:
+                await asyncio.sleep(pause)
+            return latency
+
+    first = await send(0)
+    await asyncio.gather(*(send(index) for index in range(1, repeats)))
+    return stats, len(answers), first, reused
+
+
+async def measure_varied(client, path, make_payload, count, concurrency, pause):
+    """Send `count` distinct payloads with up to `concurrency` in flight"""
+    stats = EndpointStats(path)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(index):
+        async with semaphore:
+            await timed_request(client, stats, 'POST', path, make_payload(index))
+            if pause:
+                await asyncio.sleep(pause)
+
+    await asyncio.gather(*(send(index) for index in range(count)))
+    return stats
+
+
+async def measure_grocery_scaling(client, sizes, lists_per_size, pause):
+    """Latency and request/response size of optimize-grocery per list length"""
+    rows = []
+    for size in sizes:
+        stats = EndpointStats(f'{size} items')
+        request_bytes, response_bytes = [], []
+        timeouts = 0
+        for index in range(lists_per_size):
+            payload = optimize_payload(index, size)
+            _, response, error = await timed_request(client, stats, 'POST', '/ai-price/optimize-grocery', payload)
+            request_bytes.append(len(json.dumps(payload, ensure_ascii=False).encode('utf-8')))
+            timeouts += isinstance(error, httpx.TimeoutException)
+            if error is None and response.status_code == 200:
+                response_bytes.append(len(response.content))
+            if pause:
+                await asyncio.sleep(pause)
+        rows.append({
+            'size': size,
+            'stats': stats,
+            'timeouts': timeouts,
+            'request_bytes': sum(request_bytes) / len(request_bytes),
+            'response_bytes': sum(response_bytes) / len(response_bytes) if response_bytes else None,
+        })
+    return rows
+
+
+async def run_ai_price_benchmark(base_url, repeats=10, varied=20, concurrency=5, grocery_sizes=(10, 50, 100, 200),
+                                 lists_per_size=3, pause=0.0, recorder=None):
+    """Run the floor, repeated, varied and grocery scaling passes"""
+    async with AsyncBackendClient(base_url, max_connections=concurrency, recorder=recorder) as client:
+        floor = await measure_floor(client, repeats)
+        endpoints = []
+        for name, path, make_payload in AI_ENDPOINTS:
+            print(f'   {name}: {repeats} identical, {varied} varied')
+            repeat_stats, distinct, first, reused = await measure_repeats(client, path, make_payload(0), repeats,
+                                                                          concurrency, pause)
+            varied_stats = await measure_varied(client, path, make_payload, varied, concurrency, pause)
+            endpoints.append({
+                'name': name,
+                'repeat': repeat_stats,
+                'distinct_answers': distinct,
+                'first': first,
+                'reused': reused,
+                'varied': varied_stats,
+            })
+        print(f'   Optimize Grocery: lists of {", ".join(str(size) for size in grocery_sizes)} items')
+        scaling = await measure_grocery_scaling(client, grocery_sizes, lists_per_size, pause)
+    return {'floor': floor, 'endpoints': endpoints, 'scaling': scaling}
+
+
+def reuse_verdict(endpoint):
+    """Classify how an endpoint treats identical requests"""
+    repeat = sorted(endpoint['reused'])
+    varied = sorted(endpoint['varied'].latencies)
+    if not repeat or not varied:
+        return '❓', 'not enough successful requests'
+    ratio = percentile(repeat, 50) / percentile(varied, 50)
+    if ratio < 0.5:
+        return '✅', f'repeats {1 / ratio:.0f}x faster: reused server-side'
+    if endpoint['distinct_answers'] == 1:
+        return '⚠️ ', 'identical answers at full latency: deterministic, so a response cache is safe'
+    return '❌', f"no reuse: {endpoint['distinct_answers']} different answers, every repeat pays the LLM call"
+
+
+def print_ai_price_report(result):
+    """Latency distributions, reuse verdicts and grocery list scaling"""
+    floor = sorted(result['floor'].latencies)
+    floor_p50 = percentile(floor, 50)
+    print("\n" + "=" * 92)
+    print(f"📊 AI Price Latency (floor: /ai-price/health p50 {floor_p50 * 1000:.0f}ms)")
+    print("-" * 92)
+    print(f"   {'Endpoint':<18} {'Pass':<7} {'Reqs':>5} {'Err%':>6} {'429s':>5} "
+          f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    limited = 0
+    for endpoint in result['endpoints']:
+        for label in ('repeat', 'varied'):
+            stats = endpoint[label]
+            summary = stats.summary(1)
+            rejected = summary['status_counts'].get(429, 0)
+            limited += rejected
+            print(f"   {endpoint['name'] if label == 'repeat' else '':<18} {label:<7} {summary['requests']:>5} "
+                  f"{summary['error_rate'] * 100:>5.1f}% {rejected:>5} "
+                  f"{summary['p50'] * 1000:>6.0f}ms {summary['p90'] * 1000:>6.0f}ms "
+                  f"{summary['p99'] * 1000:>6.0f}ms {summary['max'] * 1000:>6.0f}ms")
+
+    print("\n🔁 Server-side reuse of identical requests")
+    print("-" * 92)
+    savings = []
+    for endpoint in result['endpoints']:
+        status, verdict = reuse_verdict(endpoint)
+        print(f"{status} {endpoint['name']:<18} first {endpoint['first'] * 1000:.0f}ms: {verdict}")
+        if status != '✅' and endpoint['varied'].latencies:
+            savings.append((endpoint['name'], percentile(sorted(endpoint['varied'].latencies), 50) - floor_p50))
+    if savings:
+        name, saved = max(savings, key=lambda item: item[1])
+        print(f"💡 A response cache keyed on the payload would save up to ~{saved * 1000:.0f}ms per repeat "
+              f"({name}); the hit ratio depends on how often users send the same category/food/region")
+
+    rows = result['scaling']
+    print("\n🛒 Optimize Grocery vs list length")
+    print("-" * 92)
+    print(f"   {'Items':>6} {'Req size':>10} {'Resp size':>10} {'p50':>8} {'max':>8} {'Err':>5}")
+    for row in rows:
+        latencies = sorted(row['stats'].latencies)
+        response = f"{row['response_bytes'] / 1024:.1f}KB" if row['response_bytes'] else '-'
+        print(f"   {row['size']:>6} {row['request_bytes'] / 1024:>8.1f}KB {response:>10} "
+              f"{percentile(latencies, 50) * 1000:>6.0f}ms {(latencies[-1] if latencies else 0) * 1000:>6.0f}ms "
+              f"{row['stats'].errors:>5}")
+    points = [(row['size'], percentile(sorted(row['stats'].latencies), 50)) for row in rows if row['stats'].latencies]
+    if len(points) >= 2:
+        base, per_item = fit_line(points)
+        print(f"   Latency: ~{base * 1000:.0f}ms + {per_item * 1000:.1f}ms per item")
+        sized = [(row['size'], row['response_bytes']) for row in rows if row['response_bytes']]
+        if len(sized) >= 2:
+            _, bytes_per_item = fit_line(sized)
+            print(f"   Response: ~{bytes_per_item:.0f} bytes per item")
+        slowest = max(points)
+        if slowest[1] >= 15 * 0.8:
+            print(f"⚠️  {slowest[0]} items takes {slowest[1]:.1f}s, near the app's 15s timeout")
+    timed_out = [f"{row['size']} items ({row['timeouts']})" for row in rows if row['timeouts']]
+    if timed_out:
+        print(f"❌ Timed out after the app's 15s budget: {', '.join(timed_out)}")
+
+    if limited:
+        print(f"\n⚠️  {limited} requests were rate limited (429): raise --pause for numbers "
+              "that reflect the LLM rather than the limiter")
+
+
+def main():
+    """Run the AI price benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark the AI price analysis endpoints')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--repeats', type=int, default=10, help='Identical requests per endpoint')
+    parser.add_argument('--varied', type=int, default=20, help='Distinct payloads per endpoint')
+    parser.add_argument('--concurrency', type=int, default=5,
+                        help='Requests in flight for the repeated and varied passes')
+    parser.add_argument('--grocery-sizes', type=int, nargs='+', default=[10, 25, 50, 100, 200],
+                        help='Grocery list lengths for the scaling pass')
+    parser.add_argument('--lists-per-size', type=int, default=3, help='Different lists per length')
+    parser.add_argument('--pause', type=float, default=0.0,
+                        help='Seconds to wait after each request (6 keeps under 10/minute)')
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'bench_ai_price', base_url, repeats=args.repeats, varied=args.varied)
+
+    print('🧪 AI Price Analysis Benchmark')
+    print('=' * 92)
+    print(f'📡 Target: {base_url}\n')
+
+    try:
+        result = asyncio.run(run_ai_price_benchmark(
+            base_url,
+            repeats=args.repeats,
+            varied=args.varied,
+            concurrency=args.concurrency,
+            grocery_sizes=args.grocery_sizes,
+            lists_per_size=args.lists_per_size,
+            pause=args.pause,
+            recorder=recorder,
+        ))
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+    print_ai_price_report(result)
+
+
+if __name__ == '__main__':
+    main()
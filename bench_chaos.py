@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Benchmark How the Backend Degrades Under Upstream Chaos
+
+Runs the app's YouTube and USDA requests through a series of fault phases
+and reports, per endpoint, how latency, error rate and cache serving change
+compared with a healthy baseline:
+
+- slow upstream: every YouTube/USDA call takes --slowdown seconds longer
+- quota 429: a fraction of upstream calls fail with 429 quota exceeded
+- dropped connections: requests are closed without a response
+
+Against --standin the faults are injected behind the backend's caches, and
+before each phase the cache is warmed and the warmed entries are expired
+(the stand-in backdates them; its TTL stays as configured), so the report
+shows whether expired entries are served while upstream fails (run with
+--standin-serve-stale to compare) and how fast failures surface
+(--standin-upstream-timeout). Against a real local backend, --proxy puts a
+chaos proxy in front of it; the faults then hit the backend as a whole.
+
+Every request uses the mobile client's 30 second timeout (--client-timeout),
+so a request that reaches it is a stuck screen in the app, not just an
+error. Failures are classified (timeout, dropped, 429, 5xx) instead of being
+counted as one.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, AsyncBackendClient, fetch_cache_stats
+from backend_load import percentile
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import APP_SEARCH, POPULAR_DISHES
+
+# Fault settings changed between phases; everything else keeps its configured value
+FAULT_KEYS = ('upstream_slowdown', 'upstream_error_rate', 'drop_rate')
+PHASES = ['baseline', 'slow upstream', 'quota 429', 'dropped connections']
+# Failures that a stale cache entry could have answered
+UPSTREAM_KINDS = {'429', '502', '503', '504', '5xx'}
+HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'host', 'content-encoding'}
+
+
+def chaos_scenarios(dishes):
+    """YouTube and USDA requests for a few dishes, so every key is warmed and repeated"""
+    scenarios = [{'name': 'YouTube Trending', 'method': 'GET', 'path': '/youtube/trending',
+                  'params': {'max_results': 10}}]
+    for dish in dishes:
+        scenarios.append({'name': 'YouTube Search', 'method': 'POST', 'path': '/youtube/search',
+                          'json': {'query': dish, **APP_SEARCH}})
+        scenarios.append({'name': 'USDA Search', 'method': 'GET', 'path': '/usda/search',
+                          'params': {'query': dish, 'vietnamese': 'true', 'max_results': 20}})
+    return scenarios
+
+
+def phase_faults(phase, args):
+    return {
+        'baseline': {},
+        'slow upstream': {'upstream_slowdown': args.slowdown},
+        'quota 429': {'upstream_error_rate': args.error_rate},
+        'dropped connections': {'drop_rate': args.drop_rate},
+    }[phase]
+
+
+class ChaosProxyHandler(BaseHTTPRequestHandler):
+    """Forwards to the backend, delaying, rejecting with 429 or dropping as configured"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.forward('GET')
+
+    def do_POST(self):
+        self.forward('POST')
+
+    def do_DELETE(self):
+        self.forward('DELETE')
+
+    def forward(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        config = self.server.config
+        if config.drop_rate and self.server.random() < config.drop_rate:
+            self.close_connection = True
+            return
+        if config.upstream_slowdown:
+            time.sleep(config.upstream_slowdown)
+        if config.upstream_error_rate and self.server.random() < config.upstream_error_rate:
+            self.reply(429, b'{"detail": "Injected quota exceeded"}', {'Content-Type': 'application/json'})
+            return
+        headers = {key: value for key, value in self.headers.items() if key.lower() not in HOP_HEADERS}
+        try:
+            response = self.server.client.request(method, self.path, content=body, headers=headers)
+        except httpx.HTTPError as e:
+            self.reply(502, f'{{"detail": "Proxy error: {type(e).__name__}"}}'.encode(),
+                       {'Content-Type': 'application/json'})
+            return
+        self.reply(response.status_code, response.content,
+                   {key: value for key, value in response.headers.items() if key.lower() not in HOP_HEADERS})
+
+    def reply(self, status, body, headers):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ChaosProxy(ThreadingHTTPServer):
+    """Fault-injecting reverse proxy in front of a backend that cannot be configured from here"""
+
+    daemon_threads = True
+
+    def __init__(self, target, host='127.0.0.1', port=0, seed=0):
+        super().__init__((host, port), ChaosProxyHandler)
+        self.client = httpx.Client(base_url=target, timeout=None)
+        self.config = SimpleNamespace(**dict.fromkeys(FAULT_KEYS, 0.0))
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def random(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.client.close()
+
+
+def classify(status=None, error=None):
+    """Failure kind of one request, or None when it succeeded"""
+    if isinstance(error, httpx.TimeoutException):
+        return 'timeout'
+    if isinstance(error, (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError, httpx.ConnectError)):
+        return 'dropped'
+    if error is not None:
+        return type(error).__name__
+    if status == 429:
+        return '429'
+    if status >= 500:
+        return str(status) if status in (502, 503, 504) else '5xx'
+    if status >= 400:
+        return '4xx'
+    return None
+
+
+class ChaosStats:
+    """Outcomes of one endpoint during one phase"""
+
+    def __init__(self):
+        self.latencies = []
+        self.fail_latencies = []
+        self.kinds = Counter()
+        self.cached = 0
+        self.stale = 0
+
+    @property
+    def requests(self):
+        return len(self.latencies) + len(self.fail_latencies)
+
+    def record(self, latency, kind, body=None):
+        if kind:
+            self.fail_latencies.append(latency)
+            self.kinds[kind] += 1
+            return
+        self.latencies.append(latency)
+        if isinstance(body, dict):
+            self.cached += bool(body.get('cached'))
+            self.stale += bool(body.get('stale'))
+
+    def summary(self):
+        latencies, fails = sorted(self.latencies), sorted(self.fail_latencies)
+        return {
+            'requests': self.requests,
+            'ok_rate': len(latencies) / self.requests if self.requests else 0.0,
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+            'fail_p50': percentile(fails, 50) if fails else None,
+            'stale': self.stale,
+            'cached': self.cached,
+            'kinds': dict(self.kinds),
+        }
+
+
+async def send(client, scenario, timeout):
+    """Send one scenario; returns (latency, failure kind, body)"""
+    start = time.perf_counter()
+    try:
+        response = await client.request(scenario['method'], scenario['path'], params=scenario.get('params'),
+                                        json=scenario.get('json'), timeout=timeout)
+    except httpx.HTTPError as e:
+        return time.perf_counter() - start, classify(error=e), None
+    latency = time.perf_counter() - start
+    kind = classify(response.status_code)
+    try:
+        body = response.json() if kind is None else None
+    except ValueError:
+        body = None
+    return latency, kind, body
+
+
+async def run_phase(base_url, scenarios, duration, concurrency, client_timeout, recorder=None):
+    """Closed-loop workers cycling the scenarios for `duration` seconds"""
+    stats = {scenario['name']: ChaosStats() for scenario in scenarios}
+    picker = itertools.cycle(scenarios)
+    timeout = httpx.Timeout(client_timeout)
+    async with AsyncBackendClient(base_url, retries=0, max_connections=concurrency, recorder=recorder) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                scenario = next(picker)
+                stats[scenario['name']].record(*await send(client, scenario, timeout))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {name: stat.summary() for name, stat in stats.items()}
+
+
+async def warm(base_url, scenarios, client_timeout):
+    """Send every scenario once so its cache entry exists"""
+    async with AsyncBackendClient(base_url, retries=0) as client:
+        for scenario in scenarios:
+            await send(client, scenario, httpx.Timeout(client_timeout))
+
+
+async def cache_snapshot(base_url):
+    async with AsyncBackendClient(base_url, retries=0) as client:
+        return await fetch_cache_stats(client)
+
+
+def set_faults(target, defaults, faults):
+    for key in FAULT_KEYS:
+        setattr(target.config, key, faults.get(key, defaults[key]))
+
+
+def run_chaos(base_url, target, scenarios, phases, args, recorder=None):
+    """Warm, expire the warmed entries, inject the phase's faults and measure; returns {phase: (cache, results)}"""
+    defaults = {key: getattr(target.config, key) for key in FAULT_KEYS}
+    results = {}
+    try:
+        for phase in phases:
+            faults = phase_faults(phase, args)
+            print(f"\n💥 Phase: {phase}" + ''.join(f', {key}={value:g}' for key, value in faults.items()))
+            set_faults(target, defaults, {})
+            asyncio.run(warm(base_url, scenarios, args.client_timeout))
+            # Expire the warmed entries, so stale serving is possible but fresh hits are not
+            if args.standin:
+                target.expire_caches()
+            elif args.ttl:
+                time.sleep(args.ttl)
+            cache = asyncio.run(cache_snapshot(base_url))
+            set_faults(target, defaults, faults)
+            results[phase] = (cache, asyncio.run(run_phase(base_url, scenarios, args.duration, args.concurrency,
+                                                           args.client_timeout, recorder)))
+    finally:
+        set_faults(target, defaults, {})
+    return results
+
+
+def print_chaos_report(results, client_timeout):
+    """Per-phase endpoint table, then degradation against the baseline"""
+    print('\n📊 Chaos Report')
+    print('-' * 96)
+    print(f"   {'Phase':<20} {'Endpoint':<17} {'Reqs':>5} {'OK%':>6} {'p50':>8} {'p99':>8} "
+          f"{'fail p50':>9} {'Stale':>6}  Failures")
+    for phase, (_, endpoints) in results.items():
+        for name, summary in endpoints.items():
+            fail = f"{summary['fail_p50']:.2f}s" if summary['fail_p50'] is not None else '-'
+            kinds = ' '.join(f'{kind}×{count}' for kind, count in sorted(summary['kinds'].items()))
+            print(f"   {phase:<20} {name:<17} {summary['requests']:>5} {summary['ok_rate'] * 100:>5.1f}% "
+                  f"{summary['p50'] * 1000:>6.0f}ms {summary['p99'] * 1000:>6.0f}ms {fail:>9} "
+                  f"{summary['stale']:>6}  {kinds}")
+
+    baseline = results.get('baseline', (None, {}))[1]
+    print('-' * 96)
+    for phase, (cache, endpoints) in results.items():
+        stuck = sum(summary['kinds'].get('timeout', 0) for summary in endpoints.values())
+        upstream_failed = sum(count for summary in endpoints.values()
+                              for kind, count in summary['kinds'].items() if kind in UPSTREAM_KINDS)
+        stale = sum(summary['stale'] for summary in endpoints.values())
+        fail_times = [summary['fail_p50'] for summary in endpoints.values() if summary['fail_p50'] is not None]
+        notes = []
+        if stuck:
+            notes.append(f'⚠️  {stuck} requests hit the {client_timeout:.0f}s client timeout (stuck UI)')
+        if fail_times and max(fail_times) > 5:
+            notes.append(f'⚠️  failures take up to {max(fail_times):.1f}s (p50) to surface')
+        elif fail_times:
+            notes.append(f'✅ failures surface fast ({max(fail_times) * 1000:.0f}ms p50)')
+        if stale:
+            notes.append(f'✅ {stale} stale entries served instead of errors')
+        elif upstream_failed and cache and cache.get('expired_entries'):
+            notes.append(f"❌ no stale entries served although {cache['expired_entries']} expired entries were cached")
+        for name, summary in endpoints.items():
+            base = baseline.get(name)
+            if phase != 'baseline' and base and base['p50'] and summary['p50']:
+                slower = summary['p50'] / base['p50']
+                if slower > 2:
+                    notes.append(f'⏱️  {name} p50 {slower:.0f}x baseline')
+        print(f'   {phase}: ' + ('; '.join(notes) if notes else '✅ no degradation'))
+
+
+def main():
+    """Run the chaos benchmark"""
+    parser = argparse.ArgumentParser(description='Measure backend degradation under upstream faults')
+    parser.add_argument('--base-url', default=LOCAL_BASE_URL, help='Backend base URL')
+    parser.add_argument('--proxy', action='store_true',
+                        help='Inject the faults with a chaos proxy in front of --base-url')
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=PHASES, help='Phases to run, in order')
+    parser.add_argument('--duration', type=float, default=15, help='Seconds per phase')
+    parser.add_argument('--concurrency', type=int, default=5, help='Concurrent app users')
+    parser.add_argument('--dishes', type=int, default=5, help='Distinct dishes searched')
+    parser.add_argument('--client-timeout', type=float, default=30, help="The app's request timeout in seconds")
+    parser.add_argument('--slowdown', type=float, default=10, help='Extra upstream seconds in the slow phase')
+    parser.add_argument('--error-rate', type=float, default=1.0, help='Upstream 429 fraction in the quota phase')
+    parser.add_argument('--drop-rate', type=float, default=0.2, help='Dropped fraction in the dropped phase')
+    parser.add_argument('--ttl', type=float, default=0,
+                        help="Seconds to wait after warming so a real backend's entries expire "
+                             '(the stand-in expires its warmed entries directly)')
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    if args.standin and args.proxy:
+        parser.error('--proxy is for a real backend; the stand-in injects the faults itself')
+    if not (args.standin or args.proxy):
+        parser.error('choose --standin (faults behind the cache) or --proxy (faults in front of --base-url)')
+
+    standin = standin_from_args(args)
+    proxy = ChaosProxy(args.base_url, seed=args.standin_seed) if args.proxy else None
+    target = standin or proxy
+    base_url = target.base_url
+    recorder = results_from_args(args, 'bench_chaos', base_url, phases=args.phases)
+    scenarios = chaos_scenarios(POPULAR_DISHES[:args.dishes])
+
+    print('💥 Backend Chaos Benchmark')
+    print('=' * 96)
+    print(f"📡 Target: {base_url}" + (f' (proxy to {args.base_url})' if proxy else ''))
+    print(f'👥 {args.concurrency} users, {args.duration:g}s per phase, {args.client_timeout:g}s client timeout')
+
+    try:
+        results = run_chaos(base_url, target, scenarios, args.phases, args, recorder)
+    finally:
+        if recorder:
+            recorder.close()
+        target.stop()
+    print_chaos_report(results, args.client_timeout)
+
+
+if __name__ == '__main__':
+    main()
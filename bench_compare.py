@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Compare Backend Deployments Side by Side
+
+Runs the same scenario against several base URLs at the same time and
+prints latency, throughput and error rate per endpoint and target, with
+the difference from the first target. Use it to check a new deployment,
+region or instance size against the current one under identical traffic
+before the app is switched over: the scripts default to
+openfood-backend.onrender.com while the app's services call
+backend-openfood.onrender.com, and both can be compared directly.
+
+Targets are `name=url`, a bare URL, or one of the aliases render, app and
+local. Every target gets its own copy of the scenario source: a built-in
+set (youtube, meal-plan), a dataset file (backend_dataset.py) or a recorded
+trace, the latter two sent once each in file order. With --rate every
+target is offered the same requests per second; without it each runs
+closed-loop and throughput shows how much the target can take.
+
+Each target is woken with a health probe first, so a sleeping Render
+instance's cold start is reported separately instead of skewing the run.
+--sequential runs targets one after another when the client machine or its
+network link would otherwise be the bottleneck.
+"""
+
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend_client import APP_BASE_URL, LOCAL_BASE_URL, RENDER_BASE_URL, AsyncBackendClient
+from backend_dataset import dataset_scenarios
+from backend_load import run_load
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import endpoint_of, load_trace
+from backend_workloads import YOUTUBE_SCENARIOS, meal_plan_scenarios
+
+TARGET_ALIASES = {'render': RENDER_BASE_URL, 'app': APP_BASE_URL, 'local': LOCAL_BASE_URL}
+SCENARIO_SETS = {
+    'youtube': lambda: YOUTUBE_SCENARIOS,
+    'meal-plan': meal_plan_scenarios,
+}
+
+
+def parse_target(text):
+    """(name, base URL) from 'name=url', an alias or a bare URL"""
+    name, _, url = text.partition('=') if '=' in text else ('', '', text)
+    if url in TARGET_ALIASES:
+        return name or url, TARGET_ALIASES[url]
+    return name or urlsplit(url).netloc or url, url.rstrip('/')
+
+
+def trace_scenarios(path):
+    """Recorded requests as run_load scenarios named by endpoint, sent with their recorded query string and body"""
+    _, entries = load_trace(path)
+    return [{'name': endpoint_of(entry), 'method': entry['method'], 'path': entry['path'],
+             'json': entry.get('body'), 'content': entry.get('body_text')}
+            for entry in entries]
+
+
+def scenario_factory(args):
+    """A function returning a fresh scenario source per target, so every target gets identical traffic"""
+    if args.dataset:
+        return lambda: dataset_scenarios(args.dataset, limit=args.requests)
+    if args.trace:
+        scenarios = trace_scenarios(args.trace)[:args.requests]
+        return lambda: iter(scenarios)
+    return SCENARIO_SETS[args.scenarios]
+
+
+async def wake(targets, timeout=120):
+    """Health-probe every target; returns {name: (seconds, error)}"""
+
+    async def probe(url):
+        async with AsyncBackendClient(url, retries=0) as client:
+            start = time.perf_counter()
+            try:
+                response = await client.get('/', timeout=httpx.Timeout(timeout, connect=10))
+            except httpx.HTTPError as e:
+                return time.perf_counter() - start, type(e).__name__
+            return time.perf_counter() - start, None if response.status_code < 500 else f'HTTP {response.status_code}'
+
+    results = await asyncio.gather(*(probe(url) for _, url in targets))
+    return {name: result for (name, _), result in zip(targets, results)}
+
+
+async def run_comparison(targets, make_scenarios, args):
+    """Drive every target with the same scenario; returns {name: load report}"""
+
+    def load(url):
+        return run_load(url, make_scenarios(), concurrency=args.concurrency, rate=args.rate,
+                        duration=args.duration, total_requests=None if args.dataset or args.trace else args.requests)
+
+    if args.sequential:
+        return {name: await load(url) for name, url in targets}
+    reports = await asyncio.gather(*(load(url) for _, url in targets))
+    return {name: report for (name, _), report in zip(targets, reports)}
+
+
+def change(value, base):
+    return f'{(value / base - 1) * 100:+.0f}%' if base else '-'
+
+
+def succeeded(summary):
+    """Whether an endpoint had any successful response; without one its percentiles are 0.0, not latencies"""
+    return summary is not None and summary['requests'] > summary['errors']
+
+
+def print_comparison(reports, threshold=0.2):
+    """Endpoint rows per target, then totals and a verdict against the first target"""
+    names = list(reports)
+    baseline = names[0]
+    endpoints = list(dict.fromkeys(summary['name'] for report in reports.values() for summary in report['endpoints']))
+    by_target = {name: {summary['name']: summary for summary in report['endpoints']}
+                 for name, report in reports.items()}
+    width = max(12, *(len(name) for name in names))
+    column = max(20, *(len(endpoint) for endpoint in endpoints))
+
+    print('\n' + '=' * 104)
+    print(f'📊 Side-by-side Comparison (baseline: {baseline})')
+    print('-' * 104)
+    print(f"   {'Endpoint':<{column}} {'Target':<{width}} {'Reqs':>6} {'RPS':>7} {'Err%':>6} "
+          f"{'p50':>8} {'p90':>8} {'p99':>8} {'Δp50':>7} {'Δp99':>7}")
+    for endpoint in endpoints:
+        base = by_target[baseline].get(endpoint)
+        for index, name in enumerate(names):
+            summary = by_target[name].get(endpoint)
+            label = endpoint if index == 0 else ''
+            if summary is None:
+                print(f'   {label:<{column}} {name:<{width}} {"-":>6}')
+                continue
+            if not succeeded(summary):
+                latencies, deltas = f"{'-':>8} {'-':>8} {'-':>8}", ''
+            else:
+                latencies = ' '.join(f"{summary[key] * 1000:>6.0f}ms" for key in ('p50', 'p90', 'p99'))
+                deltas = (f"{change(summary['p50'], base['p50']):>7} {change(summary['p99'], base['p99']):>7}"
+                          if succeeded(base) and name != baseline else '')
+            print(f"   {label:<{column}} {name:<{width}} {summary['requests']:>6} {summary['throughput']:>7.1f} "
+                  f"{summary['error_rate'] * 100:>5.1f}% {latencies} {deltas}")
+
+    print('-' * 104)
+    for name, report in reports.items():
+        total = sum(summary['requests'] for summary in report['endpoints'])
+        errors = sum(summary['errors'] for summary in report['endpoints'])
+        print(f"   {'Total':<{column}} {name:<{width}} {total:>6} {total / report['elapsed']:>7.1f} "
+              f"{errors / total * 100 if total else 0:>5.1f}%")
+
+    print()
+    for name in names[1:]:
+        slower, better, erroring = [], [], []
+        for endpoint in endpoints:
+            base, summary = by_target[baseline].get(endpoint), by_target[name].get(endpoint)
+            if not (base and summary):
+                continue
+            errors = f"{summary['error_rate'] * 100:.1f}% vs {base['error_rate'] * 100:.1f}% errors"
+            if summary['error_rate'] > base['error_rate'] + 0.01:
+                erroring.append(f'{endpoint} {errors}')
+            elif summary['error_rate'] < base['error_rate'] - 0.01:
+                better.append(f'{endpoint} {errors}')
+            if not (succeeded(base) and succeeded(summary) and base['p50']):
+                continue
+            ratio = summary['p50'] / base['p50']
+            if ratio > 1 + threshold:
+                slower.append(f'{endpoint} {change(summary["p50"], base["p50"])}')
+            elif ratio < 1 - threshold:
+                better.append(f'{endpoint} {change(summary["p50"], base["p50"])}')
+        if erroring:
+            print(f"❌ {name}: more errors on {', '.join(erroring)}")
+        if slower:
+            print(f"⚠️  {name}: p50 slower on {', '.join(slower)}")
+        if better:
+            print(f"✅ {name}: better on {', '.join(better)}")
+        if not (slower or better or erroring):
+            print(f'✅ {name}: within {threshold:.0%} of {baseline} on every endpoint')
+
+
+def main():
+    """Run the comparison"""
+    parser = argparse.ArgumentParser(description='Run one scenario against several backends at once')
+    parser.add_argument('targets', nargs='*', metavar='TARGET',
+                        help=f"name=url, a URL or an alias ({', '.join(TARGET_ALIASES)}); the first is the baseline")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--scenarios', choices=SCENARIO_SETS, default='youtube', help='Built-in scenario set')
+    source.add_argument('--dataset', metavar='PATH', help='Send the records of a backend_dataset.py file')
+    source.add_argument('--trace', metavar='PATH', help='Send the requests of a recorded trace')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent workers per target')
+    parser.add_argument('--rate', type=float, help='Requests per second offered to each target')
+    parser.add_argument('--duration', type=float, help='Seconds per target (default 30 for built-in sets)')
+    parser.add_argument('--requests', type=int, help='Requests per target')
+    parser.add_argument('--sequential', action='store_true', help='Run targets one after another')
+    parser.add_argument('--no-wake', action='store_true', help='Skip the wake-up health probe')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p50 difference worth reporting')
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    targets = [parse_target(text) for text in args.targets]
+    standin = standin_from_args(args)
+    if standin:
+        targets.append(('standin', standin.base_url))
+    if len(targets) < 2:
+        parser.error('give at least two targets (--standin counts as one)')
+    if len({name for name, _ in targets}) < len(targets):
+        parser.error('target names must be unique; use name=url')
+
+    print('⚖️  Backend Comparison')
+    print('=' * 104)
+    for name, url in targets:
+        print(f'📡 {name}: {url}')
+    source = args.dataset or args.trace or f'{args.scenarios} scenarios'
+    print(f"👥 {args.concurrency} workers per target, {source}"
+          + (f', {args.rate:g} req/s each' if args.rate else '') + (', sequential' if args.sequential else ''))
+
+    try:
+        if not args.no_wake:
+            for name, (seconds, error) in asyncio.run(wake(targets)).items():
+                print(f"{'❌' if error else '⏰' if seconds > 5 else '✅'} {name} awake in {seconds:.1f}s"
+                      + (f' ({error})' if error else ' (cold start)' if seconds > 5 else ''))
+        reports = asyncio.run(run_comparison(targets, scenario_factory(args), args))
+    finally:
+        if standin:
+            standin.stop()
+    print_comparison(reports, args.threshold)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Open-Loop Load Generator for the Render Endpoints
+
+Sends the test_render_endpoints.py requests on a fixed arrival schedule
+(constant, Poisson or a step ramp) regardless of how fast responses come
+back, so queueing on the single Render worker shows up in the latencies.
+Latency is measured from each request's scheduled send time into HDR-style
+histograms, which corrects for coordinated omission.
+
+With --find-saturation it searches for the highest rate at which p99 stays
+under --slo-p99 (and errors under --max-error-rate).
+"""
+
+import argparse
+import asyncio
+
+from backend_client import LOCAL_BASE_URL
+from backend_load import LatencyHistogram, arrival_times, run_open_loop
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import RENDER_SCENARIOS
+
+BASE_URL = LOCAL_BASE_URL
+
+
+def overall(report):
+    """Corrected histogram, request and error counts across all endpoints"""
+    histogram = LatencyHistogram()
+    requests = errors = 0
+    for result in report['endpoints'].values():
+        histogram.merge(result['corrected'])
+        requests += result['requests']
+        errors += result['errors']
+    return histogram, requests, errors
+
+
+def print_open_loop_report(report, slo):
+    """Per-endpoint service vs corrected percentiles"""
+    print("\n" + "=" * 86)
+    print(f"📊 Open-Loop Report ({report['scheduled']} scheduled in {report['elapsed']:.1f}s, "
+          f"{report['scheduled'] / report['elapsed']:.1f} req/s)")
+    print("-" * 86)
+    print(f"   {'Endpoint':<18} {'Reqs':>6} {'Err%':>6} {'svc p50':>8} {'svc p99':>8} "
+          f"{'p50':>8} {'p90':>8} {'p99':>8} {'p99.9':>8}")
+    for name, result in report['endpoints'].items():
+        service, corrected = result['service'], result['corrected']
+        error_rate = result['errors'] / result['requests'] * 100 if result['requests'] else 0
+        print(f"   {name:<18} {result['requests']:>6} {error_rate:>5.1f}% "
+              f"{service.percentile(50) * 1000:>6.0f}ms {service.percentile(99) * 1000:>6.0f}ms "
+              f"{corrected.percentile(50) * 1000:>6.0f}ms {corrected.percentile(90) * 1000:>6.0f}ms "
+              f"{corrected.percentile(99) * 1000:>6.0f}ms {corrected.percentile(99.9) * 1000:>6.0f}ms")
+
+    histogram, requests, errors = overall(report)
+    print("-" * 86)
+    print("   svc = measured from the actual send; the rest from the scheduled send time")
+    lag = report['send_lag']
+    print(f"   Send lag behind schedule: p99 {lag.percentile(99) * 1000:.0f}ms, max {lag.max * 1000:.0f}ms")
+    status = '✅' if histogram.percentile(99) <= slo else '❌'
+    print(f"{status} Overall p99 {histogram.percentile(99) * 1000:.0f}ms (SLO {slo * 1000:.0f}ms), "
+          f"errors {errors}/{requests}")
+
+
+def print_ramp_report(report, offsets, step_duration, slo):
+    """Corrected percentiles per ramp step, marking where p99 breaks the SLO"""
+    print(f"\n📈 Ramp Steps ({step_duration:g}s each)")
+    print("-" * 86)
+    print(f"   {'Rate':>8} {'Reqs':>6} {'Err%':>6} {'p50':>8} {'p99':>8}")
+    for index, step in report['steps'].items():
+        rate = sum(1 for offset in offsets if index * step_duration <= offset < (index + 1) * step_duration)
+        rate /= step_duration
+        p99 = step['corrected'].percentile(99)
+        error_rate = step['errors'] / step['requests'] * 100 if step['requests'] else 0
+        print(f"{'✅' if p99 <= slo else '❌'} {rate:>8.1f} {step['requests']:>6} {error_rate:>5.1f}% "
+              f"{step['corrected'].percentile(50) * 1000:>6.0f}ms {p99 * 1000:>6.0f}ms")
+
+
+async def probe_rate(base_url, rate, args, recorder=None):
+    """Run one constant/Poisson probe; returns (passed, p99, error rate)"""
+    offsets = arrival_times('poisson' if args.schedule == 'poisson' else 'constant', rate,
+                            args.duration, seed=args.seed)
+    report = await run_open_loop(base_url, RENDER_SCENARIOS, offsets, max_in_flight=args.max_in_flight,
+                                 recorder=recorder)
+    histogram, requests, errors = overall(report)
+    p99 = histogram.percentile(99)
+    error_rate = errors / requests if requests else 1.0
+    passed = p99 <= args.slo_p99 and error_rate <= args.max_error_rate
+    print(f"   {'✅' if passed else '❌'} {rate:>8.1f} req/s: p99 {p99 * 1000:>7.0f}ms, "
+          f"errors {error_rate * 100:5.1f}%")
+    return passed, p99, error_rate
+
+
+async def find_saturation(base_url, args, recorder=None):
+    """Double the rate until the SLO breaks, then bisect between the last pass and first fail"""
+    # Send every request once first so cold cache misses do not fail the first probe
+    await run_open_loop(base_url, RENDER_SCENARIOS, [0.0] * len(RENDER_SCENARIOS))
+    passing, failing = None, None
+    rate = args.min_rate
+    while rate <= args.max_rate:
+        passed, _, _ = await probe_rate(base_url, rate, args, recorder)
+        if not passed:
+            failing = rate
+            break
+        passing = rate
+        rate *= 2
+    if passing is None or failing is None:
+        return passing, failing
+
+    for _ in range(args.search_steps):
+        rate = (passing + failing) / 2
+        passed, _, _ = await probe_rate(base_url, rate, args, recorder)
+        if passed:
+            passing = rate
+        else:
+            failing = rate
+    return passing, failing
+
+
+def main():
+    """Run the open-loop generator"""
+    parser = argparse.ArgumentParser(description='Open-loop load generator with coordinated-omission correction')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--schedule', choices=['constant', 'poisson', 'ramp'], default='constant',
+                        help='Arrival schedule')
+    parser.add_argument('--rate', type=float, default=10, help='Requests per second (ramp: final rate)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per run or saturation probe')
+    parser.add_argument('--ramp-start', type=float, help='First ramp rate (default: --ramp-step)')
+    parser.add_argument('--ramp-step', type=float, help='Rate increase per ramp step (default: rate / 5)')
+    parser.add_argument('--step-duration', type=float, default=10, help='Seconds per ramp step')
+    parser.add_argument('--max-in-flight', type=int, default=256,
+                        help='Concurrent requests before sends queue in the client')
+    parser.add_argument('--slo-p99', type=float, default=2000, help='p99 latency SLO in milliseconds')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='Error rate above which a saturation probe fails')
+    parser.add_argument('--find-saturation', action='store_true',
+                        help='Search for the highest rate that meets the SLO')
+    parser.add_argument('--min-rate', type=float, default=1, help='Saturation search starting rate')
+    parser.add_argument('--max-rate', type=float, default=512, help='Saturation search ceiling')
+    parser.add_argument('--search-steps', type=int, default=4, help='Bisection steps after the first failure')
+    parser.add_argument('--seed', type=int, default=0)
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+    args.slo_p99 /= 1000
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'bench_open_loop', base_url, schedule=args.schedule,
+                                 saturation=args.find_saturation)
+
+    print('🧪 Open-Loop Load Generator')
+    print('=' * 86)
+    print(f'📡 Target: {base_url}')
+
+    try:
+        if args.find_saturation:
+            print(f'🔎 Searching for the highest rate with p99 ≤ {args.slo_p99 * 1000:.0f}ms '
+                  f'({args.duration:g}s {args.schedule} probes)\n')
+            passing, failing = asyncio.run(find_saturation(base_url, args, recorder))
+            print()
+            if passing is None:
+                print(f'❌ Even {args.min_rate:g} req/s breaks the SLO')
+            elif failing is None:
+                print(f'✅ SLO held up to the {args.max_rate:g} req/s ceiling')
+            else:
+                print(f'🎯 Saturation point: ~{passing:.1f} req/s (fails at {failing:.1f} req/s)')
+            return
+
+        ramp_step = args.ramp_step or args.rate / 5
+        offsets = arrival_times(args.schedule, args.rate, args.duration, seed=args.seed,
+                                ramp_start=args.ramp_start, ramp_step=ramp_step,
+                                step_duration=args.step_duration)
+        print(f'📅 {args.schedule} schedule: {len(offsets)} requests over {args.duration:g}s\n')
+        report = asyncio.run(run_open_loop(
+            base_url, RENDER_SCENARIOS, offsets, max_in_flight=args.max_in_flight,
+            step_duration=args.step_duration if args.schedule == 'ramp' else None, recorder=recorder))
+        print_open_loop_report(report, args.slo_p99)
+        if args.schedule == 'ramp':
+            print_ramp_report(report, offsets, args.step_duration, args.slo_p99)
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Benchmark YouTube Search Cache Effectiveness
+
+Replays Zipf-distributed Vietnamese dish searches (and follow-up details
+lookups) against /youtube/search and reports cold vs warm latency, hit ratio
+over time and how /youtube/cache/stats evolves during the run.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, AsyncBackendClient, fetch_cache_stats, timed_post
+from backend_load import percentile
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import ZipfSampler, dish_catalog
+
+BASE_URL = LOCAL_BASE_URL
+
+
+async def run_cache_benchmark(base_url, total_queries=500, concurrency=5, windows=10,
+                              details_ratio=0.3, zipf_s=1.1, seed=0, clear=False, recorder=None):
+    """Replay the query distribution window by window, sampling cache stats between windows"""
+    sampler = ZipfSampler(dish_catalog(), s=zipf_s, seed=seed)
+    queries = list(sampler.stream(total_queries))
+    rng = random.Random(seed)
+    window_size = max(1, total_queries // windows)
+
+    samples = {'search': [], 'details': []}
+    errors = 0
+    timeline = []
+
+    async with AsyncBackendClient(base_url, max_connections=concurrency, recorder=recorder) as client:
+        if clear:
+            try:
+                response = await client.delete('/youtube/cache/clear')
+            except httpx.HTTPError as e:
+                raise RuntimeError(f'/youtube/cache/clear failed: {type(e).__name__}') from None
+            if response.status_code != 200:
+                raise RuntimeError(f'/youtube/cache/clear failed: HTTP {response.status_code}')
+        timeline.append({'requests': 0, 'hits': 0, 'lookups': 0, 'stats': await fetch_cache_stats(client)})
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def replay(query, wants_details):
+            nonlocal errors
+            async with semaphore:
+                latency, status, body = await timed_post(client, '/youtube/search', {
+                    'query': query,
+                    'max_results': 3,
+                    'duration': 'medium',
+                    'order': 'relevance'
+                })
+                if body is None:
+                    errors += 1
+                    return []
+                samples['search'].append((latency, bool(body.get('cached'))))
+                results = [bool(body.get('cached'))]
+
+                video_ids = [video['id'] for video in body.get('videos', []) if video.get('id')]
+                if wants_details and video_ids:
+                    latency, status, body = await timed_post(client, '/youtube/details', {'video_ids': video_ids})
+                    if body is None:
+                        errors += 1
+                    else:
+                        samples['details'].append((latency, bool(body.get('cached'))))
+                        results.append(bool(body.get('cached')))
+                return results
+
+        for offset in range(0, total_queries, window_size):
+            window = queries[offset:offset + window_size]
+            outcomes = await asyncio.gather(*(
+                replay(query, rng.random() < details_ratio) for query in window
+            ))
+            flags = [cached for outcome in outcomes for cached in outcome]
+            timeline.append({
+                'requests': offset + len(window),
+                'hits': sum(flags),
+                'lookups': len(flags),
+                'stats': await fetch_cache_stats(client),
+            })
+
+    return {
+        'queries': total_queries,
+        'distinct_queries': len(set(queries)),
+        'errors': errors,
+        'samples': samples,
+        'timeline': timeline,
+    }
+
+
+def describe_latencies(samples):
+    """p50/p90/p99 in milliseconds for (latency, cached) samples"""
+    latencies = sorted(latency for latency, _ in samples)
+    return {
+        'count': len(latencies),
+        'p50': percentile(latencies, 50) * 1000,
+        'p90': percentile(latencies, 90) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+    }
+
+
+def print_cache_report(result):
+    """Print cold vs warm latency, hit ratio timeline and cache stats growth"""
+    print('\n📈 Hit Ratio Over Time')
+    print('-' * 78)
+    print(f"   {'Requests':>8} {'Hit%':>6} {'Cum Hit%':>9} {'Total':>7} {'Valid':>7} {'Expired':>8}")
+
+    cumulative_hits = cumulative_lookups = 0
+    for point in result['timeline']:
+        cumulative_hits += point['hits']
+        cumulative_lookups += point['lookups']
+        stats = point['stats'] or {}
+        window_ratio = point['hits'] / point['lookups'] * 100 if point['lookups'] else 0
+        cumulative_ratio = cumulative_hits / cumulative_lookups * 100 if cumulative_lookups else 0
+        print(f"   {point['requests']:>8} {window_ratio:>5.1f}% {cumulative_ratio:>8.1f}% "
+              f"{stats.get('total_entries', '-'):>7} {stats.get('valid_entries', '-'):>7} "
+              f"{stats.get('expired_entries', '-'):>8}")
+
+    print('\n🧊 Cold vs 🔥 Warm Latency')
+    print('-' * 78)
+    for endpoint, samples in result['samples'].items():
+        cold = describe_latencies([sample for sample in samples if not sample[1]])
+        warm = describe_latencies([sample for sample in samples if sample[1]])
+        for label, stats in (('cold', cold), ('warm', warm)):
+            print(f"   {endpoint:<8} {label:<5} n={stats['count']:<5} p50={stats['p50']:>7.1f}ms "
+                  f"p90={stats['p90']:>7.1f}ms p99={stats['p99']:>7.1f}ms")
+        if cold['count'] and warm['count'] and warm['p50'] > 0:
+            print(f"   {endpoint:<8} warm p50 is {cold['p50'] / warm['p50']:.1f}x faster than cold")
+
+    lookups = sum(len(samples) for samples in result['samples'].values())
+    hits = sum(cached for samples in result['samples'].values() for _, cached in samples)
+    initial_stats = result['timeline'][0]['stats'] or {}
+    final_stats = result['timeline'][-1]['stats'] or {}
+    max_size = final_stats.get('max_cache_size')
+
+    print('\n📊 Summary')
+    print('-' * 78)
+    print(f"   Search queries: {result['queries']} ({result['distinct_queries']} distinct)")
+    print(f"   Overall hit ratio: {hits / lookups * 100 if lookups else 0:.1f}% "
+          f"({hits} of {lookups} lookups served from cache)")
+    print(f"   Errors: {result['errors']}")
+    print(f"   Cache duration: {final_stats.get('cache_duration_hours', 'unknown')} hours")
+    print(f"   Max cache size: {max_size if max_size is not None else 'unknown'}")
+
+    if max_size and final_stats.get('total_entries', 0) >= max_size:
+        print('⚠️  Cache reached max_cache_size: entries are being evicted, consider a larger cache')
+    # Entries that had already expired before the run say nothing about the TTL against the replay window
+    if final_stats.get('expired_entries', 0) > initial_stats.get('expired_entries', 0):
+        print('⚠️  Entries expired during the run: TTL is shorter than the replay window')
+
+
+def main():
+    """Run the cache effectiveness benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark /youtube/search cache effectiveness')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--queries', type=int, default=500, help='Number of search requests to replay')
+    parser.add_argument('--concurrency', type=int, default=5, help='Concurrent requests')
+    parser.add_argument('--windows', type=int, default=10, help='Number of reporting windows')
+    parser.add_argument('--details-ratio', type=float, default=0.3,
+                        help='Fraction of searches followed by a /youtube/details lookup')
+    parser.add_argument('--zipf-s', type=float, default=1.1, help='Zipf exponent of dish popularity')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the query distribution')
+    parser.add_argument('--clear', action='store_true', help='Clear the backend cache before replaying')
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'bench_youtube_cache', base_url, zipf_s=args.zipf_s, seed=args.seed)
+
+    print('🧪 YouTube Cache Effectiveness Benchmark')
+    print('=' * 78)
+    print(f'📡 Target: {base_url}')
+    print(f'🍜 {args.queries} Zipf(s={args.zipf_s}) dish searches, {args.concurrency} concurrent')
+    if args.clear:
+        print('🧹 Clearing the YouTube cache first, so the run starts cold')
+    elif not standin:
+        print('⚠️  Not clearing the cache (pass --clear on a test backend): the run starts from whatever '
+              'the backend already has cached')
+
+    try:
+        result = asyncio.run(run_cache_benchmark(
+            base_url,
+            total_queries=args.queries,
+            concurrency=args.concurrency,
+            windows=args.windows,
+            details_ratio=args.details_ratio,
+            zipf_s=args.zipf_s,
+            seed=args.seed,
+            clear=args.clear,
+            recorder=recorder,
+        ))
+    except RuntimeError as e:
+        print(f'❌ {e}: not replaying, the "cold" numbers would come from a warm cache')
+        sys.exit(1)
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+    print_cache_report(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmark Batched /youtube/details Requests
+
+Sweeps the number of video_ids per request (1 to 50, the YouTube API's
+per-call limit) with fresh IDs that miss the cache and with the same batch
+repeated. Reports latency per request and per ID, fits a fixed + per-ID
+cost model and charts where batching stops paying off.
+"""
+
+import argparse
+import random
+import string
+import time
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, BackendClient, json_body
+from backend_load import fit_line, percentile
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import dish_catalog
+
+BASE_URL = LOCAL_BASE_URL
+DEFAULT_SIZES = [1, 2, 5, 10, 15, 20, 25, 30, 40, 50]
+ID_ALPHABET = string.ascii_letters + string.digits + '-_'
+
+
+def synthetic_ids(count, seed):
+    """Random 11-character IDs shaped like YouTube video IDs"""
+    rng = random.Random(seed)
+    return [''.join(rng.choice(ID_ALPHABET) for _ in range(11)) for _ in range(count)]
+
+
+def harvest_ids(client, count):
+    """Collect real video IDs from /youtube/search results for the dish catalog"""
+    ids = []
+    for dish in dish_catalog():
+        if len(ids) >= count:
+            break
+        try:
+            body = json_body(client.post('/youtube/search', json={'query': dish, 'max_results': 10}))
+        except httpx.HTTPError:
+            continue
+        ids.extend(video['id'] for video in (body or {}).get('videos', [])
+                   if video.get('id') and video['id'] not in ids)
+    return ids[:count]
+
+
+def timed_details(client, video_ids):
+    """POST one details batch and return (latency, videos returned, cached) or None"""
+    start = time.perf_counter()
+    try:
+        response = client.post('/youtube/details', json={'video_ids': video_ids})
+    except httpx.HTTPError as e:
+        print(f'   ❌ {len(video_ids)} IDs: {type(e).__name__}')
+        return None
+    latency = time.perf_counter() - start
+    body = json_body(response)
+    if body is None:
+        print(f'   ❌ {len(video_ids)} IDs: HTTP {response.status_code}'
+              + (' with a body that is not a JSON object' if response.status_code == 200 else ''))
+        return None
+    return latency, len(body.get('videos', [])), bool(body.get('cached'))
+
+
+def sweep_batch_sizes(client, sizes, repeats, id_pool):
+    """Run fresh and repeated batches for every size; returns one row per size"""
+    fresh_ids = iter(id_pool)
+    rows = []
+
+    for size in sizes:
+        row = {'size': size, 'fresh': [], 'repeated': [], 'returned': 0, 'cache_hits': 0, 'fresh_hits': 0,
+               'errors': 0}
+        batches = []
+        for _ in range(repeats):
+            batch = [next(fresh_ids) for _ in range(size)]
+            batches.append(batch)
+            result = timed_details(client, batch)
+            if result:
+                row['fresh'].append(result[0])
+                row['returned'] = max(row['returned'], result[1])
+                row['fresh_hits'] += result[2]
+            else:
+                row['errors'] += 1
+
+        # Re-send the batches just fetched, which the backend should now serve from cache
+        for batch in batches:
+            result = timed_details(client, batch)
+            if result:
+                row['repeated'].append(result[0])
+                row['cache_hits'] += result[2]
+            else:
+                row['errors'] += 1
+
+        rows.append(row)
+        fresh = percentile(sorted(row['fresh']), 50) * 1000
+        repeated = percentile(sorted(row['repeated']), 50) * 1000
+        print(f'   {size:>3} IDs: fresh {fresh:7.1f}ms ({fresh / size:6.1f}ms/ID) | '
+              f'repeated {repeated:7.1f}ms ({repeated / size:6.1f}ms/ID)')
+    return rows
+
+
+def print_details_report(rows, width=40):
+    """Chart per-ID latency and summarize the batching cost model"""
+    print('\n📉 Median ms per ID (█ fresh, ░ repeated)')
+    print('-' * 78)
+    per_id = [(row['size'],
+               percentile(sorted(row['fresh']), 50) * 1000 / row['size'],
+               percentile(sorted(row['repeated']), 50) * 1000 / row['size']) for row in rows]
+    scale = max(max(fresh, repeated) for _, fresh, repeated in per_id) or 1
+    for size, fresh, repeated in per_id:
+        print(f'   {size:>3} │{"█" * max(1, round(fresh / scale * width)):<{width}} {fresh:7.1f}')
+        print(f'       │{"░" * max(1, round(repeated / scale * width)):<{width}} {repeated:7.1f}')
+
+    for label in ('fresh', 'repeated'):
+        points = [(row['size'], latency * 1000) for row in rows for latency in row[label]]
+        intercept, slope = fit_line(points)
+        print(f'\n🧮 {label.title()} cost model: {intercept:.1f}ms per request + {slope:.2f}ms per ID')
+        if label == 'fresh' and intercept > 0:
+            share = slope * 50 / (intercept + slope * 50) * 100
+            print(f'   At 50 IDs, {share:.0f}% of the request time scales with batch size')
+            if share > 50:
+                print('⚠️  Latency grows roughly linearly with IDs: the backend may be calling '
+                      'YouTube per ID instead of one videos.list call per 50 IDs')
+
+    # Batching pays off while doubling the batch still cuts the per-ID cost noticeably
+    knee = per_id[-1][0]
+    for (size, fresh, _), (_, next_fresh, _) in zip(per_id, per_id[1:]):
+        if fresh and (fresh - next_fresh) / fresh < 0.10:
+            knee = size
+            break
+    print(f'\n🎯 Per-ID latency stops improving by more than 10% beyond ~{knee} IDs per request')
+
+    errored = [f"{row['size']} IDs ×{row['errors']}" for row in rows if row['errors']]
+    if errored:
+        print(f"❌ Failed requests, left out of the latencies: {', '.join(errored)}")
+    short = [row['size'] for row in rows if row['returned'] < row['size']]
+    if short:
+        print(f'ℹ️  Backend returned fewer videos than requested for sizes {short} '
+              '(unknown IDs are dropped by YouTube)')
+    precached = [row['size'] for row in rows if row['fresh_hits']]
+    if precached:
+        print(f'⚠️  "Fresh" batches were served from cache for sizes {precached}, so their latency '
+              'measures cache hits; rerun with another --seed or after the cache expires')
+    uncached = [row['size'] for row in rows if row['repeated'] and row['cache_hits'] < len(row['repeated'])]
+    if uncached:
+        print(f'⚠️  Repeated batches were not fully cached for sizes {uncached}')
+
+
+def main():
+    """Run the batch size sweep"""
+    parser = argparse.ArgumentParser(description='Benchmark /youtube/details batch sizes')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Batch sizes to test (max 50)')
+    parser.add_argument('--repeats', type=int, default=3, help='Requests per batch size and mode')
+    parser.add_argument('--ids-from-search', action='store_true',
+                        help='Use real video IDs harvested from /youtube/search instead of synthetic ones')
+    parser.add_argument('--seed', type=int,
+                        help='Seed for synthetic video IDs (default: random, so a rerun does not hit the cache)')
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = sorted(size for size in set(args.sizes) if 1 <= size <= 50)
+    if not sizes:
+        parser.error('--sizes needs at least one size from 1 to 50')
+    needed = sum(sizes) * args.repeats
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'bench_youtube_details', base_url, sizes=sizes, repeats=args.repeats,
+                                 seed=seed)
+
+    print('🧪 YouTube Details Batch Size Benchmark')
+    print('=' * 78)
+    print(f'📡 Target: {base_url}')
+    print(f'🎲 ID seed: {seed}')
+
+    try:
+        with BackendClient(base_url) as client:
+            if args.ids_from_search:
+                id_pool = harvest_ids(client, needed)
+                if len(id_pool) < needed:
+                    print(f'⚠️  Only harvested {len(id_pool)} of {needed} IDs, topping up with synthetic IDs')
+                    id_pool += synthetic_ids(needed - len(id_pool), seed)
+            else:
+                id_pool = synthetic_ids(needed, seed)
+
+            # Recording starts after harvesting so only the sweep itself is in the results
+            client.recorder = recorder
+            print(f'📦 Sweeping sizes {sizes} with {args.repeats} fresh + {args.repeats} repeated requests each\n')
+            rows = sweep_batch_sizes(client, sizes, args.repeats, id_pool)
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+    print_details_report(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark YouTube Search and Trending Payload Size
+
+Streams /youtube/search and /youtube/trending responses across max_results
+values, timing first byte separately from the full transfer, and measures
+payload bytes, JSON decode time per video and the bytes each video field
+costs. Estimates what dropping unused fields or compressing would save on a
+slow mobile link.
+"""
+
+import argparse
+import gzip
+import json
+import time
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, BackendClient
+from backend_load import percentile
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+
+BASE_URL = LOCAL_BASE_URL
+
+# Fields the Flutter video screens and these scripts actually read
+USED_FIELDS = ['id', 'title', 'channel', 'duration', 'views', 'thumbnail']
+
+
+def compact_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def stream_probe(client, method, path, **kwargs):
+    """
+    Stream one response and time it.
+
+    Returns ttfb (headers received), first_chunk, transfer (last byte) and
+    decode times in seconds, wire and body sizes in bytes, the
+    Content-Encoding and the decoded JSON, with `error` set when a 200 body
+    is not a JSON object (truncated, or an HTML page from a proxy).
+    """
+    start = time.perf_counter()
+    with client.stream(method, path, **kwargs) as response:
+        ttfb = time.perf_counter() - start
+        first_chunk = None
+        chunks = []
+        for chunk in response.iter_bytes():
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            chunks.append(chunk)
+        transfer = time.perf_counter() - start
+        wire_bytes = response.num_bytes_downloaded
+        status = response.status_code
+        encoding = response.headers.get('content-encoding', 'identity')
+
+    body = b''.join(chunks)
+    decode_start = time.perf_counter()
+    data, error = None, None
+    if status == 200:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            error = 'invalid JSON'
+        if error is None and not isinstance(data, dict):
+            data, error = None, 'not a JSON object'
+    decode = time.perf_counter() - decode_start
+
+    return {
+        'status': status,
+        'ttfb': ttfb,
+        'first_chunk': first_chunk if first_chunk is not None else transfer,
+        'transfer': transfer,
+        'decode': decode,
+        'wire_bytes': wire_bytes,
+        'body_bytes': len(body),
+        'encoding': encoding,
+        'data': data,
+        'error': error,
+    }
+
+
+def field_costs(videos):
+    """Average encoded bytes per video for each field"""
+    totals = {}
+    for video in videos:
+        for field, value in video.items():
+            # Key, quotes, colon and comma included so the fields add up to the video size
+            totals[field] = totals.get(field, 0) + len(compact_json({field: value})) - 1
+    return {field: total / len(videos) for field, total in totals.items()} if videos else {}
+
+
+def savings(data, used_fields):
+    """Encoded sizes of the full payload vs trimmed and gzip-compressed variants"""
+    trimmed = dict(data)
+    trimmed['videos'] = [{field: video[field] for field in used_fields if field in video}
+                         for video in data.get('videos', [])]
+    full = compact_json(data)
+    slim = compact_json(trimmed)
+    return {
+        'full': len(full),
+        'full_gzip': len(gzip.compress(full, 6)),
+        'trimmed': len(slim),
+        'trimmed_gzip': len(gzip.compress(slim, 6)),
+    }
+
+
+def probe_endpoint(client, label, method, path, sizes, samples, used_fields, recorder=None, **request):
+    """Probe one endpoint for each max_results value; returns one row per size"""
+    rows = []
+    for size in sizes:
+        probes = []
+        for _ in range(samples):
+            kwargs = dict(request)
+            if method == 'POST':
+                kwargs['json'] = {**request.get('json', {}), 'max_results': size}
+            else:
+                kwargs['params'] = {'max_results': size}
+            try:
+                probe = stream_probe(client, method, path, **kwargs)
+            except httpx.HTTPError as e:
+                print(f'   ❌ {label} max_results={size}: {type(e).__name__}')
+                if recorder:
+                    recorder.record_error(method, path, e, None, max_results=size)
+                continue
+            if recorder:
+                recorder.record(method, path, probe['status'], probe['transfer'],
+                                cached=(probe['data'] or {}).get('cached'), size=probe['wire_bytes'],
+                                error=probe['error'], ttfb=probe['ttfb'], decode=probe['decode'],
+                                max_results=size)
+            if probe['status'] != 200:
+                print(f'   ❌ {label} max_results={size}: HTTP {probe["status"]}')
+                continue
+            if probe['error']:
+                print(f"   ❌ {label} max_results={size}: {probe['error']} in a {probe['body_bytes']:,} B body")
+                continue
+            probes.append(probe)
+
+        if not probes:
+            continue
+        videos = probes[-1]['data'].get('videos', [])
+        count = max(1, len(videos))
+        row = {
+            'label': label,
+            'size': size,
+            'videos': len(videos),
+            'ttfb': percentile(sorted(p['ttfb'] for p in probes), 50),
+            'transfer': percentile(sorted(p['transfer'] - p['ttfb'] for p in probes), 50),
+            'decode_per_video': percentile(sorted(p['decode'] / count for p in probes), 50),
+            'wire_bytes': probes[-1]['wire_bytes'],
+            'body_bytes': probes[-1]['body_bytes'],
+            'encoding': probes[-1]['encoding'],
+            'fields': field_costs(videos),
+            'savings': savings(probes[-1]['data'], used_fields),
+        }
+        rows.append(row)
+        print(f'   {label:<9} max_results={size:<3} {row["videos"]:>3} videos  '
+              f'TTFB {row["ttfb"] * 1000:7.1f}ms  transfer {row["transfer"] * 1000:6.1f}ms  '
+              f'{row["wire_bytes"]:>7,} B on wire  decode {row["decode_per_video"] * 1e6:6.1f}µs/video')
+    return rows
+
+
+def print_payload_report(rows, used_fields, slow_kbps):
+    """Print field costs and what trimming or compressing would save"""
+    if not rows:
+        print('\n❌ No successful responses to analyze')
+        return
+
+    largest = max(rows, key=lambda row: row['body_bytes'])
+    print(f'\n🧱 Bytes per video by field ({largest["label"]}, {largest["videos"]} videos)')
+    print('-' * 78)
+    fields = largest['fields']
+    per_video = sum(fields.values()) or 1
+    for field, size in sorted(fields.items(), key=lambda item: -item[1]):
+        marker = '  ' if field in used_fields else '✂️ '
+        print(f'   {marker}{field:<14} {size:7.1f} B  {size / per_video * 100:5.1f}%')
+    unused = sum(size for field, size in fields.items() if field not in used_fields)
+    print(f'   Unused fields (✂️ ) are {unused / per_video * 100:.0f}% of every video')
+
+    print(f'\n📦 Payload size and estimated transfer at {slow_kbps} kbps')
+    print('-' * 78)
+    print(f"   {'Endpoint':<9} {'max':>4} {'Wire':>8} {'Full':>8} {'Gzip':>8} {'Trim':>8} "
+          f"{'Trim+gz':>8} {'Full ms':>8} {'Best ms':>8}")
+    for row in rows:
+        sizes = row['savings']
+        best = min(sizes.values())
+        print(f"   {row['label']:<9} {row['size']:>4} {row['wire_bytes']:>8,} {sizes['full']:>8,} "
+              f"{sizes['full_gzip']:>8,} {sizes['trimmed']:>8,} {sizes['trimmed_gzip']:>8,} "
+              f"{row['wire_bytes'] * 8 / slow_kbps:>8.0f} {best * 8 / slow_kbps:>8.0f}")
+
+    encodings = {row['encoding'] for row in rows}
+    if encodings == {'identity'}:
+        print('\n⚠️  Responses are sent uncompressed: enabling gzip would cut payloads '
+              f'by ~{(1 - largest["savings"]["full_gzip"] / largest["savings"]["full"]) * 100:.0f}%')
+    else:
+        print(f'\nℹ️  Server Content-Encoding: {", ".join(sorted(encodings))}')
+    print(f'✂️  Dropping unused fields saves ~'
+          f'{(1 - largest["savings"]["trimmed"] / largest["savings"]["full"]) * 100:.0f}% before compression')
+
+
+def main():
+    """Run the payload benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark search and trending payload sizes')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 3, 5, 10, 20],
+                        help='max_results values to test')
+    parser.add_argument('--samples', type=int, default=3, help='Requests per endpoint and size')
+    parser.add_argument('--query', default='Phở Bò', help='Search query')
+    parser.add_argument('--used-fields', nargs='+', default=USED_FIELDS,
+                        help='Video fields clients actually read')
+    parser.add_argument('--slow-kbps', type=float, default=400,
+                        help='Link speed for transfer estimates (400 kbps ~ congested 3G)')
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'bench_youtube_payload', base_url, sizes=args.sizes)
+
+    print('🧪 YouTube Payload Benchmark')
+    print('=' * 78)
+    print(f'📡 Target: {base_url}\n')
+
+    try:
+        with BackendClient(base_url) as client:
+            rows = probe_endpoint(client, 'search', 'POST', '/youtube/search', args.sizes, args.samples,
+                                  args.used_fields, recorder,
+                                  json={'query': args.query, 'duration': 'medium', 'order': 'relevance'})
+            rows += probe_endpoint(client, 'trending', 'GET', '/youtube/trending', args.sizes, args.samples,
+                                   args.used_fields, recorder)
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+    print_payload_report(rows, args.used_fields, args.slow_kbps)
+
+
+if __name__ == '__main__':
+    main()
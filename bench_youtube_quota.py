@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Simulate YouTube Data API Quota Burn
+
+Replays one day of app traffic per user count, compressed in time, from a
+cold cache: each user searches Zipf-distributed dishes (plus some free-text
+queries nobody else types) and opens details for some results. Upstream
+quota is counted from the `cached` flags (search.list costs 100 units per
+miss, videos.list 1 unit per call) and cross-checked against the
+/youtube/cache/stats entry delta. Reports the daily burn per user count
+and the traffic level at which the 10,000 unit daily quota runs out.
+
+Compressing a day is exact as long as the cache TTL is at least a day
+(entries only leave by eviction within the run). A cold cache means
+clearing the backend's YouTube cache before each user count, which only
+happens with --clear-cache (or --standin): never pass it against a
+deployment whose cache real users depend on. Every miss costs real quota
+on a live backend: run this against the stand-in or a local backend with
+a test key.
+"""
+
+import argparse
+import asyncio
+import random
+
+from backend_client import LOCAL_BASE_URL, AsyncBackendClient, fetch_cache_stats, timed_post
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import DAILY_QUOTA, DETAILS_UNITS, SEARCH_UNITS, QuotaModel, ZipfSampler, dish_catalog
+
+BASE_URL = LOCAL_BASE_URL
+
+
+async def simulate_day(client, users, queries_per_user, model, details_ratio=0.3, unique_ratio=0.1,
+                       zipf_s=1.1, seed=0, concurrency=20, clear_cache=False):
+    """Send one day of searches for `users` users and count upstream quota; clear_cache starts cold"""
+    sampler = ZipfSampler(dish_catalog(), s=zipf_s, seed=seed)
+    rng = random.Random(seed)
+    counts = {'searches': 0, 'details': 0, 'search_misses': 0, 'details_misses': 0,
+              'missed_ids': 0, 'search_units': 0, 'details_units': 0, 'errors': 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    def query_for(user, index):
+        if rng.random() < unique_ratio:
+            return f'{sampler.sample()} của user {user} #{index}'
+        return sampler.sample()
+
+    async def session(query, wants_details):
+        async with semaphore:
+            _, _, body = await timed_post(client, '/youtube/search', {
+                'query': query,
+                'max_results': 3,
+                'duration': 'medium',
+                'order': 'relevance'
+            })
+            counts['searches'] += 1
+            if body is None:
+                counts['errors'] += 1
+                return
+            if not body.get('cached'):
+                counts['search_misses'] += 1
+                counts['search_units'] += model.search_units
+
+            video_ids = [video['id'] for video in body.get('videos', []) if video.get('id')]
+            if not (wants_details and video_ids):
+                return
+            _, _, body = await timed_post(client, '/youtube/details', {'video_ids': video_ids})
+            counts['details'] += 1
+            if body is None:
+                counts['errors'] += 1
+            elif not body.get('cached'):
+                # `cached` is false when any ID missed; charging the whole batch is an upper bound
+                counts['details_misses'] += 1
+                counts['missed_ids'] += len(video_ids)
+                counts['details_units'] += model.details_cost(len(video_ids))
+
+    if clear_cache:
+        await client.delete('/youtube/cache/clear')
+    before = await fetch_cache_stats(client) or {}
+    await asyncio.gather(*(
+        session(query_for(user, index), rng.random() < details_ratio)
+        for user in range(users) for index in range(queries_per_user)
+    ))
+    after = await fetch_cache_stats(client) or {}
+
+    counts['users'] = users
+    counts['units'] = counts['search_units'] + counts['details_units']
+    counts['requests'] = counts['searches'] + counts['details']
+    counts['entries_added'] = (after.get('total_entries', 0) - before.get('total_entries', 0)
+                               if after and before else None)
+    counts['max_cache_size'] = after.get('max_cache_size')
+    return counts
+
+
+async def run_quota_sweep(base_url, user_counts, queries_per_user, model, recorder=None, **options):
+    """simulate_day for every user count, coldest cache first"""
+    rows = []
+    concurrency = options.get('concurrency', 20)
+    async with AsyncBackendClient(base_url, max_connections=concurrency + 1, recorder=recorder) as client:
+        for users in user_counts:
+            row = await simulate_day(client, users, queries_per_user, model, **options)
+            rows.append(row)
+            hit_ratio = 1 - (row['search_misses'] + row['details_misses']) / max(1, row['requests'] - row['errors'])
+            print(f"   {users:>6} users: {row['requests']:>7,} requests, hit ratio {hit_ratio * 100:5.1f}%, "
+                  f"{row['units']:>9,} units")
+    return rows
+
+
+def quota_break_even(rows, quota):
+    """Users at which the daily burn reaches the quota, interpolated between points"""
+    for low, high in zip([None] + rows, rows):
+        if high['units'] < quota:
+            continue
+        if low is None:
+            return high['users'] * quota / high['units'] if high['units'] else None
+        span = high['units'] - low['units']
+        fraction = (quota - low['units']) / span if span else 0
+        return low['users'] + fraction * (high['users'] - low['users'])
+    return None
+
+
+def print_quota_report(rows, quota):
+    """Daily quota burn per user count and where the cache stops protecting it"""
+    print(f'\n📊 Projected Daily Quota Burn (quota {quota:,} units)')
+    print('-' * 92)
+    print(f"   {'Users':>6} {'Req/day':>8} {'Avg rps':>8} {'Search miss':>12} {'Detail miss':>12} "
+          f"{'Units/day':>10} {'Quota':>7} {'Runs out':>9} {'Entries':>8}")
+    for row in rows:
+        share = row['units'] / quota
+        runs_out = f'{24 / share:6.1f}h' if share > 1 else '-'
+        print(f"{'❌' if share > 1 else '✅'} {row['users']:>6} {row['requests']:>8,} "
+              f"{row['requests'] / 86400:>8.3f} {row['search_misses']:>12,} {row['details_misses']:>12,} "
+              f"{row['units']:>10,} {share * 100:>6.0f}% {runs_out:>9} {str(row['entries_added']):>8}")
+
+    # Most of the burn is search misses; show what each miss costs relative to the quota
+    print(f'\nℹ️  One search miss is {SEARCH_UNITS / quota * 100:.0f}% of the daily quota: '
+          f'{quota // SEARCH_UNITS} cold searches exhaust it')
+
+    full = [row for row in rows if row['max_cache_size'] and row['entries_added'] is not None
+            and row['entries_added'] >= row['max_cache_size']]
+    if full:
+        print(f"⚠️  Cache filled (max_cache_size {full[0]['max_cache_size']:,}) from {full[0]['users']:,} "
+              'users: evictions turn repeat queries back into misses')
+
+    users = quota_break_even(rows, quota)
+    if users is None:
+        print(f'✅ The quota holds for every simulated user count (up to {rows[-1]["users"]:,} users)')
+        return
+    per_user = rows[-1]['requests'] / max(1, rows[-1]['users'])
+    print(f'🎯 Quota runs out at ~{users:,.0f} users/day '
+          f'(~{users * per_user:,.0f} requests/day, {users * per_user / 86400:.3f} req/s average); '
+          'beyond that, misses fail like an outage until the quota resets')
+
+
+def main():
+    """Run the quota simulation"""
+    parser = argparse.ArgumentParser(description='Simulate YouTube API quota burn per user count')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--users', type=int, nargs='+', default=[10, 50, 200, 1000],
+                        help='Daily active user counts to simulate')
+    parser.add_argument('--queries-per-user', type=int, default=5, help='Searches per user per day')
+    parser.add_argument('--details-ratio', type=float, default=0.3,
+                        help='Fraction of searches followed by a details lookup')
+    parser.add_argument('--unique-ratio', type=float, default=0.1,
+                        help='Fraction of searches that are free text no other user types')
+    parser.add_argument('--zipf-s', type=float, default=1.1, help='Zipf exponent of the dish distribution')
+    parser.add_argument('--search-units', type=int, default=SEARCH_UNITS, help='Units per search miss')
+    parser.add_argument('--details-units', type=int, default=DETAILS_UNITS,
+                        help='Units per upstream videos.list call')
+    parser.add_argument('--details-batch', type=int, default=50,
+                        help='IDs per videos.list call (1 if the backend calls YouTube per ID)')
+    parser.add_argument('--quota', type=int, default=DAILY_QUOTA, help='Daily quota in units')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent simulated sessions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Clear the backend's YouTube cache before each user count (implied by --standin)")
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'bench_youtube_quota', base_url, users=args.users,
+                                 queries_per_user=args.queries_per_user)
+    model = QuotaModel(args.search_units, args.details_units, args.details_batch)
+
+    print('🧪 YouTube Quota Simulation')
+    print('=' * 92)
+    print(f'📡 Target: {base_url}')
+    print(f'👤 {args.queries_per_user} searches per user per day, {args.unique_ratio:.0%} free text, '
+          f'{args.details_ratio:.0%} followed by details')
+    clear_cache = args.clear_cache or standin is not None
+    if clear_cache:
+        print(f"🧹 Clearing {base_url}'s YouTube cache before each user count\n")
+    else:
+        print('⚠️  Not clearing the cache (pass --clear-cache on a test backend): runs start from its '
+              "current entries and each user count inherits the previous one's, so misses are undercounted\n")
+
+    try:
+        rows = asyncio.run(run_quota_sweep(
+            base_url,
+            sorted(args.users),
+            args.queries_per_user,
+            model,
+            recorder=recorder,
+            details_ratio=args.details_ratio,
+            unique_ratio=args.unique_ratio,
+            zipf_s=args.zipf_s,
+            seed=args.seed,
+            concurrency=args.concurrency,
+            clear_cache=clear_cache,
+        ))
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+    print_quota_report(rows, args.quota)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Soak Test for the YouTube Video Cache
+
+Sends a long-running mix of unique and repeated /youtube/search queries and
+samples /youtube/cache/stats (plus the server's RSS when it runs locally) on
+an interval, then reports entry and memory growth, eviction against
+max_cache_size and expiry churn.
+
+Every unique query is a cache miss, which costs YouTube quota on a real
+backend: run this against the stand-in or a local backend with a test key.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, AsyncBackendClient, fetch_cache_stats, json_body
+from backend_load import RatePacer, fit_line, parse_duration
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_workloads import ZipfSampler, dish_catalog
+
+BASE_URL = LOCAL_BASE_URL
+
+
+def read_rss(pid):
+    """Resident set size of a local process in bytes, or None"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+async def run_soak(base_url, duration=None, total_requests=None, concurrency=5, rate=None,
+                   unique_ratio=0.5, zipf_s=1.1, seed=0, interval=60, pid=None, samples_out=None, samples=None):
+    """
+    Drive the query mix and sample cache stats every `interval` seconds.
+
+    Samples are appended to `samples` (a new list unless given) and returned;
+    pass a list to keep what was collected when the run is interrupted.
+    """
+    sampler = ZipfSampler(dish_catalog(), s=zipf_s, seed=seed)
+    rng = random.Random(seed)
+    pacer = RatePacer(rate) if rate else None
+    counters = {'sent': 0, 'unique': 0, 'hits': 0, 'misses': 0, 'errors': 0}
+    samples = [] if samples is None else samples
+    out = open(samples_out, 'a', encoding='utf-8') if samples_out else None
+    start = time.monotonic()
+    deadline = start + duration if duration else None
+
+    def next_query():
+        if rng.random() < unique_ratio:
+            counters['unique'] += 1
+            return f'{sampler.sample()} #{counters["unique"]}'
+        return sampler.sample()
+
+    async with AsyncBackendClient(base_url, retries=0, max_connections=concurrency + 1) as client:
+
+        async def take_sample():
+            stats = await fetch_cache_stats(client) or {}
+            sample = {
+                'elapsed': time.monotonic() - start,
+                **counters,
+                'total_entries': stats.get('total_entries'),
+                'valid_entries': stats.get('valid_entries'),
+                'expired_entries': stats.get('expired_entries'),
+                'max_cache_size': stats.get('max_cache_size'),
+                'rss': read_rss(pid) if pid else None,
+            }
+            samples.append(sample)
+            if out:
+                out.write(json.dumps(sample) + '\n')
+                out.flush()
+            rss = f'{sample["rss"] / 2**20:8.1f}MB' if sample['rss'] else '       -'
+            print(f'   {sample["elapsed"]:>8.0f}s {sample["sent"]:>10,} '
+                  f'{str(sample["total_entries"]):>8} {str(sample["valid_entries"]):>8} '
+                  f'{str(sample["expired_entries"]):>8} {rss}')
+
+        async def worker():
+            while True:
+                if total_requests is not None and counters['sent'] >= total_requests:
+                    return
+                if pacer:
+                    await pacer.wait()
+                if deadline and time.monotonic() >= deadline:
+                    return
+                counters['sent'] += 1
+                try:
+                    response = await client.post('/youtube/search', json={'query': next_query(), 'max_results': 3})
+                except httpx.HTTPError:
+                    counters['errors'] += 1
+                    continue
+                body = json_body(response)
+                if body is None:
+                    # Error statuses and 200s whose body is not JSON (an error page) alike
+                    counters['errors'] += 1
+                elif body.get('cached'):
+                    counters['hits'] += 1
+                else:
+                    counters['misses'] += 1
+
+        async def monitor():
+            while True:
+                await asyncio.sleep(interval)
+                await take_sample()
+
+        print(f"   {'Elapsed':>9} {'Requests':>10} {'Total':>8} {'Valid':>8} {'Expired':>8} {'RSS':>10}")
+        await take_sample()
+        monitor_task = asyncio.create_task(monitor())
+        try:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        finally:
+            monitor_task.cancel()
+            # Also taken when the run is interrupted, so the report covers the whole run
+            await take_sample()
+            if out:
+                out.close()
+
+    return samples
+
+
+def print_soak_report(samples, memory_limit_mb):
+    """Summarize growth, eviction and expiry behavior from the samples"""
+    points = [s for s in samples if s['total_entries'] is not None]
+    if len(points) < 2:
+        print('\n❌ Not enough cache stats samples to analyze')
+        return
+
+    first, last = points[0], points[-1]
+    hours = (last['elapsed'] - first['elapsed']) / 3600 or 1e-9
+    max_size = last['max_cache_size']
+    peak = max(s['total_entries'] for s in points)
+    _, entry_rate = fit_line([(s['elapsed'] / 3600, s['total_entries']) for s in points])
+
+    print('\n📊 Soak Summary')
+    print('-' * 78)
+    print(f"   Duration: {hours * 60:.1f} min, {last['sent']:,} requests "
+          f"({last['unique']:,} unique queries), {last['errors']:,} errors")
+    hit_total = last['hits'] + last['misses']
+    print(f"   Hit ratio: {last['hits'] / hit_total * 100 if hit_total else 0:.1f}%")
+    print(f"   Entry growth: {entry_rate:,.0f} entries/hour "
+          f"({first['total_entries']:,} → {last['total_entries']:,}, peak {peak:,})")
+
+    # Each miss stores one entry, so misses the entry count does not account for were evicted
+    inserted = last['misses'] - first['misses']
+    evicted = max(0, inserted - (last['total_entries'] - first['total_entries']))
+    print(f'   Evictions (estimated): {evicted:,} ({evicted / hours:,.0f}/hour)')
+
+    if max_size:
+        if peak > max_size:
+            print(f'❌ total_entries {peak:,} exceeded max_cache_size {max_size:,}: the bound is not enforced')
+        elif peak == max_size:
+            print(f'✅ Cache capped at max_cache_size ({max_size:,}) and evicting')
+        else:
+            print(f'ℹ️  Cache never filled ({peak:,} of {max_size:,} entries)')
+
+    expired = [s['expired_entries'] for s in points if s['expired_entries'] is not None]
+    if expired and max(expired):
+        print(f'   Expired entries: peak {max(expired):,}, final {expired[-1]:,}')
+        if expired[-1] == max(expired) and expired[-1] > expired[0]:
+            print('⚠️  Expired entries keep accumulating: they are only dropped by eviction, '
+                  'not purged when they expire')
+    else:
+        print('   Expired entries: none (TTL longer than the run)')
+
+    rss_points = [(s['total_entries'], s['rss']) for s in points if s['rss']]
+    if len(rss_points) >= 2:
+        _, rss_rate = fit_line([(s['elapsed'] / 3600, s['rss']) for s in points if s['rss']])
+        _, per_entry = fit_line(rss_points)
+        rss_now = rss_points[-1][1]
+        print(f'   RSS: {rss_points[0][1] / 2**20:.1f}MB → {rss_now / 2**20:.1f}MB '
+              f'({rss_rate / 2**20:+.1f}MB/hour, ~{per_entry / 1024:.1f}KB per entry)')
+        if max_size and per_entry > 0:
+            projected = rss_now + (max_size - last['total_entries']) * per_entry
+            print(f'   Projected RSS at max_cache_size: {projected / 2**20:.1f}MB '
+                  f'(limit {memory_limit_mb}MB)')
+            if projected > memory_limit_mb * 2**20:
+                print('❌ A full cache would exceed the memory limit: lower max_cache_size')
+
+
+def main():
+    """Run the soak test"""
+    parser = argparse.ArgumentParser(description='Soak test the YouTube video cache')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--duration', type=parse_duration, default=parse_duration('1h'),
+                        help="How long to run, e.g. 300, 30m, 6h (default 1h)")
+    parser.add_argument('--requests', type=int, help='Stop after this many requests')
+    parser.add_argument('--concurrency', type=int, default=5, help='Concurrent workers')
+    parser.add_argument('--rate', type=float, help='Target requests per second')
+    parser.add_argument('--unique-ratio', type=float, default=0.5,
+                        help='Fraction of queries that are unique (guaranteed cache misses)')
+    parser.add_argument('--zipf-s', type=float, default=1.1, help='Zipf exponent for repeated queries')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--interval', type=parse_duration, default=60,
+                        help='Seconds between cache stats samples')
+    parser.add_argument('--pid', type=int, help='Local backend process to sample RSS from')
+    parser.add_argument('--memory-limit-mb', type=float, default=512,
+                        help='Instance memory ceiling for the projection (Render starter: 512)')
+    parser.add_argument('--samples-out', metavar='PATH', help='Append samples to this JSON Lines file')
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    # The in-process stand-in shares our PID, so its RSS includes the load generator
+    pid = os.getpid() if standin else args.pid
+
+    print('🧪 YouTube Cache Soak Test')
+    print('=' * 78)
+    print(f'📡 Target: {base_url}')
+    print(f'⏱️  Duration: {args.duration:.0f}s, sampling every {args.interval:.0f}s\n')
+
+    samples = []
+    try:
+        asyncio.run(run_soak(
+            base_url,
+            duration=args.duration,
+            total_requests=args.requests,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            unique_ratio=args.unique_ratio,
+            zipf_s=args.zipf_s,
+            seed=args.seed,
+            interval=args.interval,
+            pid=pid,
+            samples_out=args.samples_out,
+            samples=samples,
+        ))
+    except KeyboardInterrupt:
+        print('\n⏹️  Soak interrupted, reporting the samples collected so far')
+    finally:
+        if standin:
+            standin.stop()
+
+    print_soak_report(samples, args.memory_limit_mb)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Unit tests for the statistics and scheduling helpers of the backend tools
+
+Unlike the other test_*.py scripts these need no backend (the open-loop
+check starts the in-process stand-in). Run with:
+
+    python -m pytest -q test_backend_stats.py
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+
+from backend_load import LatencyHistogram, arrival_times, percentile, run_open_loop
+from backend_results import compare_results, error_rate_p_value, mann_whitney_greater
+from backend_standin import StandinConfig, start_standin
+from backend_trace import load_trace
+from bench_youtube_quota import quota_break_even
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 100) == 4.0
+
+
+def test_histogram_percentiles_within_bucket_error():
+    values = [i / 1000 for i in range(1, 10001)]
+    random.Random(1).shuffle(values)
+    histogram = LatencyHistogram(precision=0.01)
+    for value in values:
+        histogram.record(value)
+    exact = sorted(values)
+    for pct in (50, 90, 99, 99.9):
+        true = exact[int(len(exact) * pct / 100) - 1]
+        assert true <= histogram.percentile(pct) <= true * 1.01 + 1e-9
+    assert histogram.percentile(100) == histogram.max == 10.0
+    assert histogram.count == len(values)
+
+
+def test_histogram_merge_matches_single_histogram():
+    whole, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(1, 2001):
+        whole.record(i / 1000)
+        (left if i % 2 else right).record(i / 1000)
+    left.merge(right)
+    assert left.count == whole.count and left.max == whole.max
+    assert [left.percentile(pct) for pct in (50, 90, 99)] == [whole.percentile(pct) for pct in (50, 90, 99)]
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().percentile(99) == 0.0
+
+
+def test_constant_schedule_is_evenly_spaced():
+    offsets = arrival_times('constant', rate=20, duration=5)
+    assert len(offsets) == 100
+    assert offsets[1] - offsets[0] == pytest.approx(0.05)
+
+
+def test_poisson_schedule_mean_rate():
+    offsets = arrival_times('poisson', rate=50, duration=200, seed=3)
+    assert len(offsets) / 200 == pytest.approx(50, rel=0.03)
+    assert offsets == sorted(offsets) and offsets[-1] < 200
+    assert offsets == arrival_times('poisson', rate=50, duration=200, seed=3)
+
+
+def test_ramp_schedule_steps_up_to_rate():
+    offsets = arrival_times('ramp', rate=30, duration=40, ramp_start=10, ramp_step=10, step_duration=10)
+    per_step = [sum(1 for offset in offsets if step * 10 <= offset < (step + 1) * 10) for step in range(4)]
+    assert per_step == [100, 200, 300, 300]
+
+
+def test_unknown_schedule():
+    with pytest.raises(ValueError):
+        arrival_times('bursty', rate=1, duration=1)
+
+
+def test_mann_whitney_identical_and_shifted():
+    rng = random.Random(5)
+    baseline = [rng.gauss(0.100, 0.010) for _ in range(200)]
+    assert mann_whitney_greater(baseline, list(baseline)) > 0.4
+    assert mann_whitney_greater(baseline, [value + 0.020 for value in baseline]) < 0.001
+    # Faster is not a regression in a one-sided test
+    assert mann_whitney_greater(baseline, [value - 0.020 for value in baseline]) > 0.999
+    assert mann_whitney_greater([], baseline) == 1.0
+
+
+def test_error_rate_p_value():
+    same = {'count': 500, 'errors': 10, 'error_rate': 0.02}
+    assert error_rate_p_value(same, same) == pytest.approx(0.5)
+    worse = {'count': 500, 'errors': 60, 'error_rate': 0.12}
+    assert error_rate_p_value(same, worse) < 0.001
+    clean = {'count': 100, 'errors': 0, 'error_rate': 0.0}
+    assert error_rate_p_value(clean, clean) == 1.0
+
+
+def write_run(path, run_id, latencies, errors=0, start=1000.0):
+    """Append one run with a request per latency, 10 per second"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'type': 'run', 'run_id': run_id, 'tool': 'test', 'version': run_id}) + '\n')
+        for index, latency in enumerate(latencies):
+            f.write(json.dumps({'type': 'request', 'run_id': run_id, 'ts': start + index / 10,
+                                'endpoint': 'GET /youtube/trending', 'status': 500 if index < errors else 200,
+                                'latency': latency, 'cached': None, 'bytes': 100,
+                                'error': None}) + '\n')
+
+
+def test_identical_runs_give_no_regression(tmp_path):
+    rng = random.Random(7)
+    latencies = [rng.uniform(0.08, 0.12) for _ in range(300)]
+    baseline, candidate = tmp_path / 'base.jsonl', tmp_path / 'cand.jsonl'
+    write_run(baseline, 'base', latencies)
+    write_run(candidate, 'cand', latencies)
+    comparison = compare_results(str(baseline), str(candidate))
+    assert [row['regressions'] for row in comparison['rows']] == [[]]
+    assert comparison['rows'][0]['p50_change'] == 0.0
+
+
+def test_slower_run_is_a_latency_regression(tmp_path):
+    rng = random.Random(7)
+    path = tmp_path / 'runs.jsonl'
+    write_run(path, 'first', [rng.uniform(0.08, 0.12) for _ in range(300)])
+    write_run(path, 'second', [rng.uniform(0.12, 0.16) for _ in range(300)], errors=60)
+    # The same file twice compares its last two runs
+    comparison = compare_results(str(path), str(path))
+    assert (comparison['baseline_run'], comparison['candidate_run']) == ('first', 'second')
+    assert comparison['rows'][0]['regressions'] == ['latency', 'errors']
+
+
+def test_quota_break_even_interpolates():
+    rows = [{'users': 10, 'units': 500}, {'users': 30, 'units': 1500}, {'users': 100, 'units': 4000}]
+    assert quota_break_even(rows, 1000) == pytest.approx(20)
+    # Below the first point the burn is taken as proportional to users
+    assert quota_break_even(rows, 250) == pytest.approx(5)
+    assert quota_break_even(rows, 10000) is None
+
+
+def test_appended_traces_follow_the_latest_send(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    lines = [{'type': 'trace', 'base_url': 'first'},
+             {'t': 5.0, 'method': 'GET', 'path': '/fast'},
+             # Written last because its response completed last, but sent first
+             {'t': 1.0, 'method': 'GET', 'path': '/slow'},
+             {'type': 'trace', 'base_url': 'second'},
+             {'t': 0.5, 'method': 'GET', 'path': '/next'}]
+    path.write_text(''.join(json.dumps(line) + '\n' for line in lines), encoding='utf-8')
+    header, entries = load_trace(str(path))
+    assert header['base_url'] == 'first'
+    assert [(entry['path'], entry['t']) for entry in entries] == [('/slow', 1.0), ('/fast', 5.0), ('/next', 5.5)]
+
+
+def test_open_loop_counts_queueing_behind_slow_requests():
+    # 20 requests scheduled 10ms apart, one at a time, each taking ~50ms: the
+    # last one is sent ~0.8s late, which only the corrected latency shows
+    standin = start_standin(StandinConfig(latency=0.05))
+    try:
+        report = asyncio.run(run_open_loop(standin.base_url, [{'name': 'Health', 'path': '/health'}],
+                                           arrival_times('constant', rate=100, duration=0.2), max_in_flight=1))
+    finally:
+        standin.stop()
+    result = report['endpoints']['Health']
+    assert result['requests'] == 20 and result['errors'] == 0
+    assert result['service'].percentile(99) < 0.2
+    assert result['corrected'].percentile(99) > 0.7
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test Meal Plan Backend Endpoints
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, close_clients, get_client, timeout_for
+from backend_load import print_load_report, run_load
+from backend_profile import add_profile_arguments, print_profile_report, profiler_from_args
+from backend_results import add_results_arguments, combine_recorders, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import add_trace_arguments, trace_from_args
+from backend_workloads import APP_QUERY, DAYS_OF_WEEK, USER_PROFILES, meal_plan_scenarios, profile_targets
+
+BASE_URL = LOCAL_BASE_URL
+
+
+def check_day_plan(day_plan, profile):
+    """Print a day's calories against the target; True when within 15%"""
+    calories = (day_plan.get('nutrition_summary') or {}).get('calories', 0)
+    target = profile['calories_target']
+    ok = abs(calories - target) <= target * 0.15
+    print(f"   {'✅' if ok else '⚠️ '} {day_plan.get('day_of_week', '?')}: "
+          f"{calories:.0f} kcal (target {target})")
+    return ok
+
+
+def check_weekly_plan(plan, profile):
+    """Validate a weekly plan has every day and meets the calorie target"""
+    weekly = plan.get('weekly_plan') or {}
+    print(f"📅 Days returned: {len(weekly)}")
+    if len(weekly) != len(DAYS_OF_WEEK):
+        print(f"❌ Expected {len(DAYS_OF_WEEK)} days")
+        return False
+    return all([check_day_plan(day_plan, profile) for day_plan in weekly.values()])
+
+
+def post_meal_plan(base_url, path, profile, params=None, **body):
+    """POST a meal-plan request for a profile; returns the JSON body or None"""
+    print(f"👤 Profile: {profile['name']} ({profile['calories_target']} kcal)")
+    try:
+        response = get_client(base_url).post(path, params=params, json={**profile_targets(profile), **body})
+        print(f"📡 Response status: {response.status_code}")
+        if response.status_code == 200:
+            return response.json()
+        print(f"❌ Error: {response.status_code}")
+        print(f"Response: {response.text[:200]}")
+    except httpx.TimeoutException:
+        print(f"❌ Timed out after {timeout_for(path).read:.0f}s")
+    except httpx.ConnectError:
+        print("❌ Connection error: Backend may not be running")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    return None
+
+
+def test_generate_meal_plan(base_url=BASE_URL, profile=USER_PROFILES[0]):
+    """Test /api/meal-plan/generate"""
+    print("🍱 Testing meal plan generation...")
+    result = post_meal_plan(base_url, '/api/meal-plan/generate', profile, params=APP_QUERY)
+    return result is not None and check_weekly_plan(result.get('meal_plan') or {}, profile)
+
+
+def test_generate_weekly_meal(base_url=BASE_URL, profile=USER_PROFILES[1]):
+    """Test /generate-weekly-meal"""
+    print("🗓️  Testing weekly meal generation...")
+    result = post_meal_plan(base_url, '/generate-weekly-meal', profile, user_id='test_user')
+    return result is not None and check_weekly_plan(result, profile)
+
+
+def test_replace_day(base_url=BASE_URL, profile=USER_PROFILES[2]):
+    """Test /api/replace-day"""
+    print("🔄 Testing day replacement...")
+    result = post_meal_plan(base_url, '/api/replace-day', profile, day_of_week=DAYS_OF_WEEK[0], use_ai=True)
+    return result is not None and check_day_plan(result.get('day_plan') or {}, profile)
+
+
+def test_replace_day_personalized(base_url=BASE_URL, profile=USER_PROFILES[3]):
+    """Test /replace-day-personalized"""
+    print("🔄 Testing personalized day replacement...")
+    result = post_meal_plan(base_url, '/replace-day-personalized', profile, params=APP_QUERY,
+                            day_of_week=DAYS_OF_WEEK[-1])
+    return result is not None and check_day_plan(result.get('day_plan') or {}, profile)
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Test meal plan backend endpoints')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--load', action='store_true',
+                        help='Run concurrent load mode instead of functional tests')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent workers in load mode')
+    parser.add_argument('--rate', type=float, help='Target requests per second across all workers')
+    parser.add_argument('--duration', type=float, help='Load duration in seconds (default 30)')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests')
+    parser.add_argument('--profile', action='append', choices=[p['name'] for p in USER_PROFILES],
+                        help='Only use these user profiles in load mode (repeatable)')
+    add_results_arguments(parser)
+    add_trace_arguments(parser)
+    add_standin_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args()
+
+
+def run_load_mode(args, recorder=None, standin=None):
+    """Drive the meal-plan endpoints concurrently and print latency percentiles"""
+    profiles = [p for p in USER_PROFILES if not args.profile or p['name'] in args.profile]
+    scenarios = meal_plan_scenarios(profiles)
+    print("🚀 Meal Plan Backend Load Test")
+    print(f"📡 Target: {args.base_url}")
+    print(f"👥 Workers: {args.concurrency}")
+    print(f"👤 Profiles: {', '.join(p['name'] for p in profiles)}")
+
+    profiler = profiler_from_args(args, standin)
+    if profiler:
+        profiler.start(args.base_url)
+    try:
+        report = asyncio.run(run_load(
+            args.base_url,
+            scenarios,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            duration=args.duration,
+            total_requests=args.requests,
+            recorder=recorder,
+        ))
+    finally:
+        profile = profiler.stop() if profiler else None
+    print_load_report(report)
+
+    # Anything near the budget is a timeout for the app's users
+    paths = {scenario['name']: scenario['path'] for scenario in scenarios}
+    for summary in report['endpoints']:
+        budget = timeout_for(paths[summary['name']]).read
+        if summary['requests'] and summary['p99'] >= budget * 0.8:
+            print(f"⚠️  {summary['name']}: p99 {summary['p99']:.1f}s is within 20% of the "
+                  f"{budget:.0f}s client timeout")
+    print_profile_report(profile, report, scenarios)
+
+
+def main():
+    """Run all tests"""
+    args = parse_args()
+    standin = standin_from_args(args)
+    if standin:
+        args.base_url = standin.base_url
+    recorder = combine_recorders(
+        results_from_args(args, 'test_meal_plan_backend', args.base_url,
+                          mode='load' if args.load else 'functional'),
+        trace_from_args(args, args.base_url),
+    )
+    get_client(args.base_url).recorder = recorder
+
+    try:
+        if args.load:
+            run_load_mode(args, recorder, standin)
+        else:
+            run_functional_tests(args)
+    finally:
+        close_clients()
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+
+def run_functional_tests(args):
+    """Run each endpoint test once and print a summary"""
+    print("🧪 Meal Plan Backend Tests")
+    print("=" * 50)
+
+    tests = [
+        ("Generate Meal Plan", test_generate_meal_plan),
+        ("Generate Weekly Meal", test_generate_weekly_meal),
+        ("Replace Day", test_replace_day),
+        ("Replace Day Personalized", test_replace_day_personalized),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running: {test_name}")
+        print("-" * 30)
+
+        start_time = time.time()
+        success = test_func(args.base_url)
+        duration = time.time() - start_time
+        results.append((test_name, success, duration))
+
+        if success:
+            print(f"✅ {test_name} passed ({duration:.2f}s)")
+        else:
+            print(f"❌ {test_name} failed ({duration:.2f}s)")
+
+    print("\n" + "=" * 50)
+    print("📊 Test Summary:")
+
+    passed = sum(1 for _, success, _ in results if success)
+    for test_name, success, duration in results:
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"   {status} {test_name} ({duration:.2f}s)")
+
+    print(f"\n🎯 Results: {passed}/{len(results)} tests passed")
+    if passed == len(results):
+        print("🎉 All tests passed! Meal plan endpoints are working correctly.")
+    else:
+        print("⚠️  Some tests failed. Check backend configuration.")
+
+
+if __name__ == "__main__":
+    main()
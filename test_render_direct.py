@@ -3,27 +3,26 @@
 Test Render Backend Direct
 """
 
-import requests
+import argparse
 import json
-import time
+from functools import partial
 
-def test_render_endpoints():
-    """Test Render backend endpoints"""
-    base_url = 'https://openfood-backend.onrender.com'
-    
-    print('🧪 Testing Render Backend Endpoints')
-    print('=' * 50)
-    
-    # Test 1: Health Check
-    print('\n🏥 Test 1: Health Check')
-    print('-' * 30)
-    
+from backend_checks import Check, print_check_summary, run_checks, suite_passed
+from backend_client import RENDER_BASE_URL, close_clients, get_client
+from backend_results import (add_phase_arguments, add_results_arguments, combine_recorders, phases_from_args,
+                             print_phase_report, results_from_args)
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import add_trace_arguments, trace_from_args
+
+def check_health(client):
+    """Health check; every other check depends on it"""
     try:
-        response = requests.get(f'{base_url}/', timeout=10)
+        response = client.get('/')
         print(f'Status: {response.status_code}')
         if response.status_code == 200:
             data = response.json()
             print(f'✅ Backend healthy: {data.get("message", "OK")}')
+            return True
         else:
             print(f'❌ Health check failed: {response.status_code}')
             print(f'Response: {response.text}')
@@ -31,19 +30,17 @@ def test_render_endpoints():
     except Exception as e:
         print(f'❌ Cannot connect to Render: {e}')
         return False
-    
-    # Test 2: Check available endpoints
-    print('\n📋 Test 2: Available Endpoints')
-    print('-' * 30)
-    
+
+def check_available_endpoints(client):
+    """List endpoints from /docs and /openapi.json"""
     try:
-        response = requests.get(f'{base_url}/docs', timeout=10)
+        response = client.get('/docs')
         print(f'Docs status: {response.status_code}')
         if response.status_code == 200:
             print('✅ API docs available at /docs')
         
         # Try OpenAPI JSON
-        response = requests.get(f'{base_url}/openapi.json', timeout=10)
+        response = client.get('/openapi.json')
         if response.status_code == 200:
             openapi_data = response.json()
             paths = openapi_data.get('paths', {})
@@ -57,16 +54,16 @@ def test_render_endpoints():
             youtube_endpoints = [path for path in paths.keys() if 'youtube' in path]
             if youtube_endpoints:
                 print(f'✅ Found YouTube endpoints: {youtube_endpoints}')
+                return True
             else:
                 print('❌ No YouTube endpoints found')
                 
     except Exception as e:
         print(f'❌ Error checking endpoints: {e}')
-    
-    # Test 3: Direct YouTube endpoint test
-    print('\n🎬 Test 3: YouTube Search Endpoint')
-    print('-' * 30)
-    
+    return False
+
+def check_youtube_search(client):
+    """Direct YouTube search endpoint test"""
     try:
         search_data = {
             'query': 'Phở Bò',
@@ -75,15 +72,10 @@ def test_render_endpoints():
             'order': 'relevance'
         }
         
-        print(f'📡 POST {base_url}/youtube/search')
+        print(f'📡 POST {client.base_url}/youtube/search')
         print(f'📦 Data: {json.dumps(search_data)}')
         
-        response = requests.post(
-            f'{base_url}/youtube/search',
-            json=search_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
+        response = client.post('/youtube/search', json=search_data)
         
         print(f'📡 Response: {response.status_code}')
         
@@ -126,13 +118,12 @@ def test_render_endpoints():
             
     except Exception as e:
         print(f'❌ Error testing YouTube endpoint: {e}')
-    
-    # Test 4: Cache stats
-    print('\n📊 Test 4: Cache Stats')
-    print('-' * 30)
-    
+    return False
+
+def check_cache_stats(client):
+    """Print /youtube/cache/stats"""
     try:
-        response = requests.get(f'{base_url}/youtube/cache/stats', timeout=10)
+        response = client.get('/youtube/cache/stats')
         print(f'Status: {response.status_code}')
         
         if response.status_code == 200:
@@ -140,6 +131,7 @@ def test_render_endpoints():
             print('✅ Cache stats:')
             for key, value in stats.items():
                 print(f'   {key}: {value}')
+            return True
         elif response.status_code == 404:
             print('❌ Cache stats endpoint not found')
         else:
@@ -147,11 +139,58 @@ def test_render_endpoints():
             
     except Exception as e:
         print(f'❌ Error getting cache stats: {e}')
-    
     return False
 
+def test_render_endpoints(base_url=RENDER_BASE_URL):
+    """Test Render backend endpoints"""
+    client = get_client(base_url)
+    
+    print('🧪 Testing Render Backend Endpoints')
+    print('=' * 50)
+    
+    # Health runs first, the rest fan out concurrently once it passes
+    checks = [
+        Check('🏥 Health Check', partial(check_health, client)),
+        Check('📋 Available Endpoints', partial(check_available_endpoints, client),
+              depends_on=['🏥 Health Check'], required=False),
+        Check('🎬 YouTube Search Endpoint', partial(check_youtube_search, client),
+              depends_on=['🏥 Health Check']),
+        Check('📊 Cache Stats', partial(check_cache_stats, client),
+              depends_on=['🏥 Health Check'], required=False),
+    ]
+    
+    results, elapsed = run_checks(checks)
+    print_check_summary(results, elapsed)
+    return suite_passed(results)
+
 if __name__ == '__main__':
-    success = test_render_endpoints()
+    parser = argparse.ArgumentParser(description='Test Render backend endpoints')
+    parser.add_argument('--base-url', default=RENDER_BASE_URL, help='Backend base URL')
+    add_results_arguments(parser)
+    add_trace_arguments(parser)
+    add_phase_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    phases = phases_from_args(args)
+    recorder = combine_recorders(
+        results_from_args(args, 'test_render_direct', base_url),
+        trace_from_args(args, base_url),
+        phases,
+    )
+    get_client(base_url).recorder = recorder
+    try:
+        success = test_render_endpoints(base_url)
+    finally:
+        close_clients()
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+    if phases:
+        print_phase_report(phases.phases)
     
     print('\n' + '=' * 50)
     if success:
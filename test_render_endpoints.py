@@ -3,27 +3,100 @@
 Test Render YouTube Endpoints After Deploy
 """
 
-import requests
-import json
+import argparse
 import time
+from functools import partial
 
-def test_render_youtube_endpoints():
-    """Test all YouTube endpoints on Render"""
-    base_url = 'https://openfood-backend.onrender.com'
-    
-    print('🧪 Testing Render YouTube Endpoints After Deploy')
-    print('=' * 60)
-    
-    # Wait for deployment
-    print('\n⏳ Waiting for Render deployment (30 seconds)...')
-    time.sleep(30)
-    
-    # Test 1: Health Check
-    print('\n🏥 Test 1: Backend Health')
-    print('-' * 30)
-    
+import httpx
+
+from backend_checks import Check, print_check_summary, run_checks, suite_passed
+from backend_client import RENDER_BASE_URL, close_clients, get_client
+from backend_results import (add_phase_arguments, add_results_arguments, combine_recorders, phases_from_args,
+                             print_phase_report, results_from_args)
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import add_trace_arguments, trace_from_args
+
+REQUIRED_FEATURE = 'YouTube Proxy'
+
+
+def wait_for_backend_ready(base_url, deadline=300, initial_delay=1, max_delay=15):
+    """
+    Poll / with exponential backoff until the backend lists the YouTube Proxy feature.
+
+    Returns cold-start metrics: `first_byte` is the seconds until the first
+    HTTP response of any kind arrived and `healthy_after` the seconds until
+    the backend reported healthy (None if the deadline passed first).
+    """
+    client = get_client(base_url)
+    start = time.monotonic()
+    result = {
+        'ready': False,
+        'attempts': 0,
+        'first_byte': None,
+        'healthy_after': None,
+        'version': None,
+        'last_error': None,
+    }
+    delay = initial_delay
+
+    while True:
+        remaining = deadline - (time.monotonic() - start)
+        if remaining <= 0:
+            return result
+
+        result['attempts'] += 1
+        try:
+            # Render holds requests while a cold instance boots, so let a probe wait out the remaining deadline
+            timeout = httpx.Timeout(remaining, connect=min(remaining, 10))
+            with client.stream('GET', '/', timeout=timeout) as response:
+                if result['first_byte'] is None:
+                    result['first_byte'] = time.monotonic() - start
+
+                if response.status_code == 200:
+                    response.read()
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        data = {}
+                    result['version'] = data.get('version')
+                    if REQUIRED_FEATURE in data.get('features', []):
+                        result['ready'] = True
+                        result['healthy_after'] = time.monotonic() - start
+                        return result
+                    result['last_error'] = f'{REQUIRED_FEATURE} not listed yet'
+                else:
+                    result['last_error'] = f'HTTP {response.status_code}'
+        except httpx.HTTPError as e:
+            result['last_error'] = type(e).__name__
+
+        remaining = deadline - (time.monotonic() - start)
+        print(f'   ⏳ Not ready ({result["last_error"]}), retrying in {min(delay, max(remaining, 0)):.0f}s...')
+        time.sleep(max(0, min(delay, remaining)))
+        delay = min(delay * 2, max_delay)
+
+def check_deploy_ready(base_url, ready_deadline):
+    """Wait for the deploy to come up and report cold-start timings"""
+    readiness = wait_for_backend_ready(base_url, deadline=ready_deadline)
+    if readiness['first_byte'] is not None:
+        print(f'⏱️  Time to first byte: {readiness["first_byte"]:.2f}s')
+    if not readiness['ready']:
+        print(f'❌ Backend not ready after {ready_deadline}s '
+              f'({readiness["attempts"]} attempts): {readiness["last_error"]}')
+        return False
+    print(f'⏱️  Time to healthy: {readiness["healthy_after"]:.2f}s '
+          f'({readiness["attempts"]} attempts, version {readiness["version"] or "unknown"})')
+
+    recorder = get_client(base_url).recorder
+    # Only result writers have a run record to start (traces and phase collectors do not)
+    if hasattr(recorder, 'start'):
+        recorder.start(version=readiness['version'], first_byte=readiness['first_byte'],
+                       healthy_after=readiness['healthy_after'])
+    return True
+
+def check_backend_health(client):
+    """Backend health and advertised features"""
     try:
-        response = requests.get(f'{base_url}/', timeout=15)
+        response = client.get('/', timeout=15)
         print(f'Status: {response.status_code}')
         
         if response.status_code == 200:
@@ -38,6 +111,7 @@ def test_render_youtube_endpoints():
                     print('❌ YouTube Proxy feature not listed')
             except:
                 print('✅ Backend online (non-JSON response)')
+            return True
         else:
             print(f'❌ Backend health failed: {response.status_code}')
             return False
@@ -45,11 +119,9 @@ def test_render_youtube_endpoints():
     except Exception as e:
         print(f'❌ Cannot connect to Render: {e}')
         return False
-    
-    # Test 2: YouTube Search
-    print('\n🔍 Test 2: YouTube Search Endpoint')
-    print('-' * 30)
-    
+
+def check_youtube_search(client):
+    """YouTube search endpoint"""
     try:
         search_data = {
             'query': 'Phở Bò',
@@ -58,14 +130,9 @@ def test_render_youtube_endpoints():
             'order': 'relevance'
         }
         
-        print(f'📡 POST {base_url}/youtube/search')
+        print(f'📡 POST {client.base_url}/youtube/search')
         
-        response = requests.post(
-            f'{base_url}/youtube/search',
-            json=search_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
+        response = client.post('/youtube/search', json=search_data)
         
         print(f'📡 Response: {response.status_code}')
         
@@ -80,39 +147,30 @@ def test_render_youtube_endpoints():
             if videos:
                 video = videos[0]
                 print(f'📹 Sample: {video.get("title", "N/A")[:50]}...')
+            return True
                 
         elif response.status_code == 404:
             print('❌ 404 - YouTube search endpoint not found')
-            return False
         elif response.status_code == 500:
             print('❌ 500 - Internal server error')
             print(f'Error: {response.text[:200]}')
-            return False
         else:
             print(f'❌ Unexpected status: {response.status_code}')
-            return False
             
     except Exception as e:
         print(f'❌ Error testing search: {e}')
-        return False
-    
-    # Test 3: YouTube Details (NEW ENDPOINT)
-    print('\n📹 Test 3: YouTube Details Endpoint (NEW)')
-    print('-' * 30)
-    
+    return False
+
+def check_youtube_details(client):
+    """YouTube details endpoint (NEW)"""
     try:
         details_data = {
             'video_ids': ['dQw4w9WgXcQ', 'jNQXAC9IVRw']  # Sample video IDs
         }
         
-        print(f'📡 POST {base_url}/youtube/details')
+        print(f'📡 POST {client.base_url}/youtube/details')
         
-        response = requests.post(
-            f'{base_url}/youtube/details',
-            json=details_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
+        response = client.post('/youtube/details', json=details_data)
         
         print(f'📡 Response: {response.status_code}')
         
@@ -123,24 +181,23 @@ def test_render_youtube_endpoints():
             
             print(f'✅ SUCCESS! Got details for {len(videos)} videos')
             print(f'📦 Cached: {cached}')
+            return True
             
         elif response.status_code == 404:
             print('❌ 404 - YouTube details endpoint not found')
             print('💡 This was the missing endpoint causing Flutter 404!')
-            return False
         else:
             print(f'❌ Status: {response.status_code}')
             print(f'Response: {response.text[:200]}')
             
     except Exception as e:
         print(f'❌ Error testing details: {e}')
-    
-    # Test 4: Cache Stats
-    print('\n📊 Test 4: Cache Stats')
-    print('-' * 30)
-    
+    return False
+
+def check_cache_stats(client):
+    """Cache stats endpoint"""
     try:
-        response = requests.get(f'{base_url}/youtube/cache/stats', timeout=10)
+        response = client.get('/youtube/cache/stats')
         print(f'Status: {response.status_code}')
         
         if response.status_code == 200:
@@ -149,37 +206,89 @@ def test_render_youtube_endpoints():
             print(f'   Total entries: {stats.get("total_entries", 0)}')
             print(f'   Valid entries: {stats.get("valid_entries", 0)}')
             print(f'   Cache duration: {stats.get("cache_duration_hours", 0)}h')
+            return True
         else:
             print(f'❌ Cache stats failed: {response.status_code}')
             
     except Exception as e:
         print(f'❌ Error getting cache stats: {e}')
-    
-    # Test 5: Trending Videos
-    print('\n🔥 Test 5: Trending Videos')
-    print('-' * 30)
-    
+    return False
+
+def check_trending(client):
+    """Trending videos endpoint"""
     try:
-        response = requests.get(f'{base_url}/youtube/trending?max_results=2', timeout=20)
+        response = client.get('/youtube/trending', params={'max_results': 2})
         print(f'Status: {response.status_code}')
         
         if response.status_code == 200:
             result = response.json()
             videos = result.get('videos', [])
             print(f'✅ Found {len(videos)} trending videos')
+            return True
         else:
             print(f'❌ Trending failed: {response.status_code}')
             
     except Exception as e:
         print(f'❌ Error getting trending: {e}')
+    return False
+
+def test_render_youtube_endpoints(base_url=RENDER_BASE_URL, ready_deadline=300):
+    """Test all YouTube endpoints on Render"""
+    client = get_client(base_url)
+    print('🧪 Testing Render YouTube Endpoints After Deploy')
+    print('=' * 60)
+    print(f'\n⏳ Waiting for Render deployment (up to {ready_deadline} seconds)...')
     
-    return True
+    # Readiness and health run first, the endpoint checks then fan out concurrently
+    ready = '⏳ Deploy Ready'
+    health = '🏥 Backend Health'
+    checks = [
+        Check(ready, partial(check_deploy_ready, base_url, ready_deadline)),
+        Check(health, partial(check_backend_health, client), depends_on=[ready]),
+        Check('🔍 YouTube Search Endpoint', partial(check_youtube_search, client), depends_on=[health]),
+        Check('📹 YouTube Details Endpoint', partial(check_youtube_details, client), depends_on=[health]),
+        Check('📊 Cache Stats', partial(check_cache_stats, client), depends_on=[health], required=False),
+        Check('🔥 Trending Videos', partial(check_trending, client), depends_on=[health], required=False),
+    ]
+    
+    results, elapsed = run_checks(checks)
+    print_check_summary(results, elapsed)
+    return suite_passed(results)
 
 if __name__ == '__main__':
     print('🚀 Testing Render YouTube Endpoints...')
     print('🔧 This will test the newly added /youtube/details endpoint')
     
-    success = test_render_youtube_endpoints()
+    parser = argparse.ArgumentParser(description='Test Render YouTube endpoints after deploy')
+    parser.add_argument('--base-url', default=RENDER_BASE_URL, help='Backend base URL')
+    parser.add_argument('--ready-timeout', type=float, default=300,
+                        help='Seconds to wait for the deploy to report healthy')
+    add_results_arguments(parser)
+    add_trace_arguments(parser)
+    add_phase_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    # The run record is written once the deploy is up, see check_deploy_ready()
+    phases = phases_from_args(args)
+    recorder = combine_recorders(
+        results_from_args(args, 'test_render_endpoints', base_url, start=False),
+        trace_from_args(args, base_url),
+        phases,
+    )
+    get_client(base_url).recorder = recorder
+    try:
+        success = test_render_youtube_endpoints(base_url, ready_deadline=args.ready_timeout)
+    finally:
+        close_clients()
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+    if phases:
+        print_phase_report(phases.phases)
     
     print('\n' + '=' * 60)
     if success:
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Test USDA Backend Endpoints
+
+Functional tests for the USDA proxy (translate, search, nutrition, food
+details, cache clear). The --load mode runs the food search screen's
+translate → search → nutrition chain for Vietnamese dish names under
+concurrency, once from a cache cleared with /usda/clear-cache and once
+warm, and compares per-stage latency and throughput.
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from backend_client import LOCAL_BASE_URL, AsyncBackendClient, close_clients, get_client, json_body, timeout_for
+from backend_load import EndpointStats, print_load_report
+from backend_results import (add_phase_arguments, add_results_arguments, combine_recorders, phases_from_args,
+                             print_phase_report, results_from_args)
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import add_trace_arguments, trace_from_args
+from backend_workloads import dish_catalog
+
+BASE_URL = LOCAL_BASE_URL
+TEST_FOOD = 'Cá hồi nướng với khoai lang và rau củ'
+
+# Stages of one food search, as the app's food search screen sends them
+CHAIN_STAGES = ['Translate', 'Search', 'Nutrition']
+
+
+def usda_get(base_url, path, params=None):
+    """GET a USDA endpoint and print the outcome; returns the JSON body or None"""
+    try:
+        print(f"📡 Making request to: {base_url}{path}")
+        response = get_client(base_url).get(path, params=params)
+        print(f"📡 Response status: {response.status_code}")
+        if response.status_code == 200:
+            return response.json()
+        print(f"❌ Error: {response.status_code}")
+        print(f"Response: {response.text[:200]}")
+    except httpx.TimeoutException:
+        print(f"❌ Timed out after {timeout_for(path).read:.0f}s")
+    except httpx.ConnectError:
+        print("❌ Connection error: Backend may not be running")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    return None
+
+
+def test_usda_translate(base_url=BASE_URL):
+    """Test /usda/translate"""
+    print("🌐 Testing USDA translation...")
+    result = usda_get(base_url, '/usda/translate', {'vietnamese_query': TEST_FOOD})
+    if not result or not result.get('english_query'):
+        return False
+    print(f"✅ '{TEST_FOOD}' → '{result['english_query']}'")
+    return True
+
+
+def test_usda_search(base_url=BASE_URL):
+    """Test /usda/search with a Vietnamese query"""
+    print("🔍 Testing USDA search...")
+    result = usda_get(base_url, '/usda/search', {'query': TEST_FOOD, 'vietnamese': 'true', 'max_results': 20})
+    if result is None:
+        return False
+    foods = result.get('results') or []
+    print(f"📊 Found {len(foods)} foods")
+    for i, food in enumerate(foods[:3], 1):
+        print(f"   {i}. {food.get('description', 'N/A')} (fdcId {food.get('fdcId', 'N/A')})")
+    return bool(foods)
+
+
+def test_usda_nutrition(base_url=BASE_URL):
+    """Test /usda/nutrition with a Vietnamese query and amount"""
+    print("🥗 Testing USDA nutrition lookup...")
+    result = usda_get(base_url, '/usda/nutrition', {'query': TEST_FOOD, 'vietnamese': 'true', 'amount': 150})
+    if result is None:
+        return False
+    print(f"📊 {result.get('food', 'N/A')}: {result.get('calories', 'N/A')} kcal, "
+          f"{result.get('protein', 'N/A')}g protein per {result.get('amount', 'N/A')}g")
+    return 'calories' in result
+
+
+def test_usda_food(base_url=BASE_URL):
+    """Test /usda/food/{fdc_id} with an ID from a search"""
+    print("📄 Testing USDA food details...")
+    search = usda_get(base_url, '/usda/search', {'query': 'rice', 'max_results': 1})
+    foods = (search or {}).get('results') or []
+    if not foods:
+        print("❌ No food to look up")
+        return False
+    result = usda_get(base_url, f"/usda/food/{foods[0]['fdcId']}")
+    if result is None:
+        return False
+    print(f"✅ {result.get('description', 'N/A')}")
+    return result.get('fdcId') == foods[0]['fdcId']
+
+
+def test_usda_clear_cache(base_url=BASE_URL):
+    """Test /usda/clear-cache"""
+    print("🗑️  Testing USDA cache clear...")
+    try:
+        response = get_client(base_url).post('/usda/clear-cache')
+        if response.status_code == 405:
+            response = get_client(base_url).delete('/usda/clear-cache')
+        print(f"📡 Response status: {response.status_code}")
+        return response.status_code == 200
+    except httpx.HTTPError as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+async def clear_usda_cache(client):
+    """Clear the USDA cache; the endpoint is POST, DELETE on older deployments"""
+    response = await client.post('/usda/clear-cache')
+    if response.status_code == 405:
+        response = await client.delete('/usda/clear-cache')
+    return response.status_code == 200
+
+
+async def run_chain_pass(client, foods, concurrency):
+    """Run translate → search → nutrition for every food; returns (stats by stage, elapsed)"""
+    stats = {name: EndpointStats(name) for name in CHAIN_STAGES + ['Chain']}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def stage(name, path, params):
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+        except httpx.HTTPError:
+            stats[name].record(None, error=True)
+            return None
+        body = json_body(response)
+        # A 200 whose body is not a JSON object is a failed stage too
+        stats[name].record(time.perf_counter() - start, response.status_code, error=body is None)
+        return body
+
+    async def chain(food):
+        async with semaphore:
+            start = time.perf_counter()
+            translated = await stage('Translate', '/usda/translate', {'vietnamese_query': food})
+            # Like the app, search with the Vietnamese text: the backend translates again, so the
+            # translation cache is on the path of every stage
+            params = {'query': food, 'vietnamese': 'true'}
+            searched = await stage('Search', '/usda/search', {**params, 'max_results': 20})
+            nutrition = await stage('Nutrition', '/usda/nutrition', params)
+            ok = translated is not None and searched is not None and nutrition is not None
+            stats['Chain'].record(time.perf_counter() - start, error=not ok)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(chain(food) for food in foods))
+    return stats, time.perf_counter() - start
+
+
+async def run_cold_warm(base_url, foods, concurrency=10, recorder=None):
+    """Clear the USDA cache, then run the chain pass cold and again warm"""
+    async with AsyncBackendClient(base_url, max_connections=concurrency, recorder=recorder) as client:
+        if not await clear_usda_cache(client):
+            print("⚠️  /usda/clear-cache failed: the cold pass may hit warm entries")
+        passes = {}
+        for label in ('cold', 'warm'):
+            stats, elapsed = await run_chain_pass(client, foods, concurrency)
+            passes[label] = {
+                'concurrency': concurrency,
+                'elapsed': elapsed,
+                'rate': None,
+                'endpoints': [stats[name].summary(elapsed) for name in CHAIN_STAGES + ['Chain']],
+            }
+    return passes
+
+
+def print_cold_warm_report(passes):
+    """Per-stage cold vs warm p50/p99 and how much the caches save"""
+    cold = {summary['name']: summary for summary in passes['cold']['endpoints']}
+    warm = {summary['name']: summary for summary in passes['warm']['endpoints']}
+    print("\n" + "=" * 78)
+    print("❄️  Cold vs 🔥 Warm")
+    print("-" * 78)
+    print(f"   {'Stage':<12} {'cold p50':>9} {'warm p50':>9} {'cold p99':>9} {'warm p99':>9} {'Speedup':>8}")
+    for name in CHAIN_STAGES + ['Chain']:
+        speedup = cold[name]['p50'] / warm[name]['p50'] if warm[name]['p50'] else 0
+        print(f"   {name:<12} {cold[name]['p50'] * 1000:>7.0f}ms {warm[name]['p50'] * 1000:>7.0f}ms "
+              f"{cold[name]['p99'] * 1000:>7.0f}ms {warm[name]['p99'] * 1000:>7.0f}ms {speedup:>7.1f}x")
+
+    chains = {label: passes[label]['endpoints'][-1] for label in passes}
+    print("-" * 78)
+    print(f"   Chains/s: cold {chains['cold']['throughput']:.1f}, warm {chains['warm']['throughput']:.1f}")
+
+    slowest = max(CHAIN_STAGES, key=lambda name: cold[name]['p50'])
+    print(f"🐢 Slowest cold stage: {slowest} ({cold[slowest]['p50'] * 1000:.0f}ms p50)")
+    for name in CHAIN_STAGES:
+        if warm[name]['p50'] and cold[name]['p50'] / warm[name]['p50'] < 1.5:
+            print(f"⚠️  {name} is barely faster warm: its cache may not be used for this query shape")
+    # Anything near the budget is a timeout on the food search screen
+    paths = {'Translate': '/usda/translate', 'Search': '/usda/search', 'Nutrition': '/usda/nutrition'}
+    for name, path in paths.items():
+        budget = timeout_for(path).read
+        if cold[name]['p99'] >= budget * 0.8:
+            print(f"⚠️  {name}: cold p99 {cold[name]['p99']:.1f}s is within 20% of the {budget:.0f}s app timeout")
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Test USDA backend endpoints')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--load', action='store_true',
+                        help='Run the cold/warm chain benchmark instead of functional tests')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent chains in load mode')
+    parser.add_argument('--foods', type=int, help='Only use the first N dishes of the catalog')
+    add_results_arguments(parser)
+    add_trace_arguments(parser)
+    add_phase_arguments(parser)
+    add_standin_arguments(parser)
+    return parser.parse_args()
+
+
+def run_load_mode(args, recorder=None):
+    """Run the chain cold then warm and print both reports plus the comparison"""
+    foods = dish_catalog(variants=False)[:args.foods]
+    print("🚀 USDA Backend Load Test")
+    print(f"📡 Target: {args.base_url}")
+    print(f"👥 Concurrent chains: {args.concurrency}")
+    print(f"🍜 Foods: {len(foods)} Vietnamese dishes, translate → search → nutrition")
+
+    passes = asyncio.run(run_cold_warm(args.base_url, foods, args.concurrency, recorder))
+    for label, report in passes.items():
+        print(f"\n{'❄️  Cold' if label == 'cold' else '🔥 Warm'} pass")
+        print_load_report(report)
+    print_cold_warm_report(passes)
+
+
+def main():
+    """Run all tests"""
+    args = parse_args()
+    standin = standin_from_args(args)
+    if standin:
+        args.base_url = standin.base_url
+    phases = phases_from_args(args)
+    recorder = combine_recorders(
+        results_from_args(args, 'test_usda_backend', args.base_url,
+                          mode='load' if args.load else 'functional'),
+        trace_from_args(args, args.base_url),
+        phases,
+    )
+    get_client(args.base_url).recorder = recorder
+
+    try:
+        if args.load:
+            run_load_mode(args, recorder)
+        else:
+            run_functional_tests(args)
+        if phases:
+            print_phase_report(phases.phases)
+    finally:
+        close_clients()
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+
+def run_functional_tests(args):
+    """Run each endpoint test once and print a summary"""
+    print("🧪 USDA Backend Tests")
+    print("=" * 50)
+
+    tests = [
+        ("USDA Translate", test_usda_translate),
+        ("USDA Search", test_usda_search),
+        ("USDA Nutrition", test_usda_nutrition),
+        ("USDA Food Details", test_usda_food),
+        ("USDA Clear Cache", test_usda_clear_cache),
+    ]
+
+    results = []
+
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running: {test_name}")
+        print("-" * 30)
+
+        start_time = time.time()
+        success = test_func(args.base_url)
+        duration = time.time() - start_time
+        results.append((test_name, success, duration))
+
+        if success:
+            print(f"✅ {test_name} passed ({duration:.2f}s)")
+        else:
+            print(f"❌ {test_name} failed ({duration:.2f}s)")
+
+    print("\n" + "=" * 50)
+    print("📊 Test Summary:")
+
+    passed = sum(1 for _, success, _ in results if success)
+    for test_name, success, duration in results:
+        status = "✅ PASS" if success else "❌ FAIL"
+        print(f"   {status} {test_name} ({duration:.2f}s)")
+
+    print(f"\n🎯 Results: {passed}/{len(results)} tests passed")
+    if passed == len(results):
+        print("🎉 All tests passed! USDA endpoints are working correctly.")
+    else:
+        print("⚠️  Some tests failed. Check backend configuration.")
+
+
+if __name__ == "__main__":
+    main()
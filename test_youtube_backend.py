@@ -3,15 +3,31 @@
 Test YouTube Backend Service
 """
 
-import requests
+import argparse
+import asyncio
 import json
 import time
 
-def test_youtube_search():
+import httpx
+
+from backend_client import LOCAL_BASE_URL, close_clients, get_client
+from backend_load import print_load_report, run_load
+from backend_profile import add_profile_arguments, print_profile_report, profiler_from_args
+from backend_results import (add_phase_arguments, add_results_arguments, combine_recorders, phases_from_args,
+                             print_phase_report, results_from_args)
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import add_trace_arguments, trace_from_args
+from backend_workloads import YOUTUBE_SCENARIOS
+
+BASE_URL = LOCAL_BASE_URL
+
+
+def test_youtube_search(base_url=BASE_URL):
     """Test YouTube search endpoint"""
     print("🔍 Testing YouTube search endpoint...")
     
-    url = 'http://localhost:8000/youtube/search'
+    path = '/youtube/search'
+    url = f'{base_url}{path}'
     data = {
         'query': 'Cá hồi nướng với khoai lang và rau củ',
         'max_results': 3,
@@ -23,7 +39,7 @@ def test_youtube_search():
         print(f"📡 Making request to: {url}")
         print(f"📦 Request data: {json.dumps(data, indent=2)}")
         
-        response = requests.post(url, json=data, timeout=30)
+        response = get_client(base_url).post(path, json=data)
         print(f"📡 Response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -51,7 +67,7 @@ def test_youtube_search():
             print(f"Response: {response.text}")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Connection error: Backend may not be running")
         print("💡 Start backend with: python main.py")
         return False
@@ -59,14 +75,12 @@ def test_youtube_search():
         print(f"❌ Error: {e}")
         return False
 
-def test_youtube_trending():
+def test_youtube_trending(base_url=BASE_URL):
     """Test YouTube trending endpoint"""
     print("🔥 Testing YouTube trending endpoint...")
     
-    url = 'http://localhost:8000/youtube/trending?max_results=5'
-    
     try:
-        response = requests.get(url, timeout=30)
+        response = get_client(base_url).get('/youtube/trending', params={'max_results': 5}, timeout=30)
         print(f"📡 Response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -96,14 +110,12 @@ def test_youtube_trending():
         print(f"❌ Error: {e}")
         return False
 
-def test_cache_stats():
+def test_cache_stats(base_url=BASE_URL):
     """Test cache stats endpoint"""
     print("📊 Testing cache stats endpoint...")
     
-    url = 'http://localhost:8000/youtube/cache/stats'
-    
     try:
-        response = requests.get(url, timeout=10)
+        response = get_client(base_url).get('/youtube/cache/stats')
         print(f"📡 Response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -125,14 +137,12 @@ def test_cache_stats():
         print(f"❌ Error: {e}")
         return False
 
-def test_backend_health():
+def test_backend_health(base_url=BASE_URL):
     """Test backend health"""
     print("🏥 Testing backend health...")
     
-    url = 'http://localhost:8000/'
-    
     try:
-        response = requests.get(url, timeout=10)
+        response = get_client(base_url).get('/')
         print(f"📡 Response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -147,8 +157,78 @@ def test_backend_health():
         print(f"❌ Backend not reachable: {e}")
         return False
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Test YouTube backend service')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    parser.add_argument('--load', action='store_true',
+                        help='Run concurrent load mode instead of functional tests')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent workers in load mode')
+    parser.add_argument('--rate', type=float, help='Target requests per second across all workers')
+    parser.add_argument('--duration', type=float, help='Load duration in seconds (default 30)')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests')
+    add_results_arguments(parser)
+    add_trace_arguments(parser)
+    add_phase_arguments(parser)
+    add_standin_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args()
+
+def run_load_mode(args, recorder=None, standin=None):
+    """Drive all endpoints concurrently and print latency percentiles"""
+    print("🚀 YouTube Backend Load Test")
+    print(f"📡 Target: {args.base_url}")
+    print(f"👥 Workers: {args.concurrency}")
+
+    profiler = profiler_from_args(args, standin)
+    if profiler:
+        profiler.start(args.base_url)
+    try:
+        report = asyncio.run(run_load(
+            args.base_url,
+            YOUTUBE_SCENARIOS,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            duration=args.duration,
+            total_requests=args.requests,
+            recorder=recorder,
+        ))
+    finally:
+        profile = profiler.stop() if profiler else None
+    print_load_report(report)
+    print_profile_report(profile, report, YOUTUBE_SCENARIOS)
+
 def main():
     """Run all tests"""
+    args = parse_args()
+    standin = standin_from_args(args)
+    if standin:
+        args.base_url = standin.base_url
+    phases = phases_from_args(args)
+    recorder = combine_recorders(
+        results_from_args(args, 'test_youtube_backend', args.base_url,
+                          mode='load' if args.load else 'functional'),
+        trace_from_args(args, args.base_url),
+        phases,
+    )
+    get_client(args.base_url).recorder = recorder
+
+    try:
+        if args.load:
+            run_load_mode(args, recorder, standin)
+        else:
+            run_functional_tests(args)
+        if phases:
+            print_phase_report(phases.phases)
+    finally:
+        close_clients()
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+
+def run_functional_tests(args):
+    """Run each endpoint test once and print a summary"""
     print("🧪 YouTube Backend Service Tests")
     print("=" * 50)
     
@@ -166,7 +246,7 @@ def main():
         print("-" * 30)
         
         start_time = time.time()
-        success = test_func()
+        success = test_func(args.base_url)
         end_time = time.time()
         
         duration = end_time - start_time
@@ -1,11 +1,19 @@
-import requests
+import argparse
 import json
 
-def test_youtube_search():
+from backend_client import LOCAL_BASE_URL, close_clients, get_client
+from backend_results import add_results_arguments, combine_recorders, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import add_trace_arguments, trace_from_args
+
+BASE_URL = LOCAL_BASE_URL
+
+def test_youtube_search(base_url=BASE_URL):
     """Test YouTube search endpoint"""
     print("🔍 Testing YouTube search endpoint...")
     
-    url = 'http://localhost:8000/youtube/search'
+    path = '/youtube/search'
+    url = f'{base_url}{path}'
     data = {
         'query': 'Phở Bò',
         'max_results': 3,
@@ -15,7 +23,7 @@ def test_youtube_search():
     
     try:
         print(f"📡 Making request to: {url}")
-        response = requests.post(url, json=data, timeout=30)
+        response = get_client(base_url).post(path, json=data)
         print(f"📡 Response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -45,4 +53,25 @@ def test_youtube_search():
         return False
 
 if __name__ == "__main__":
-    test_youtube_search()
+    parser = argparse.ArgumentParser(description='Test YouTube search endpoint')
+    parser.add_argument('--base-url', default=BASE_URL, help='Backend base URL')
+    add_results_arguments(parser)
+    add_trace_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = combine_recorders(
+        results_from_args(args, 'test_youtube_simple', base_url),
+        trace_from_args(args, base_url),
+    )
+    get_client(base_url).recorder = recorder
+    try:
+        test_youtube_search(base_url)
+    finally:
+        close_clients()
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
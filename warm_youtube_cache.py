@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Warm the YouTube Video Cache After a Deploy
+
+The backend's video cache lives in memory, so every deploy or restart
+empties it and the first users pay full YouTube latency and quota for the
+most common dishes. This sends /youtube/search (and optionally
+/youtube/details) for a dish list with the exact payload the app sends,
+so the cache keys match real traffic, under a quota budget and rate limit.
+
+Dishes come from the app's meal-plan and Vietnamese food data, from a
+recorded trace (most frequent searches first, with their recorded
+payloads), or from a file with one dish per line. Afterwards the tool
+checks that /youtube/cache/stats valid_entries grew by the number of
+entries it added and re-sends a sample of the warmed searches to report
+hit latency. A re-check that misses costs a search, so the sample's worst
+case is reserved from the quota budget before warming starts.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from backend_client import RENDER_BASE_URL, AsyncBackendClient, fetch_cache_stats
+from backend_dataset import parse_dart_dishes
+from backend_load import RatePacer, percentile
+from backend_results import add_results_arguments, results_from_args
+from backend_standin import add_standin_arguments, standin_from_args
+from backend_trace import load_trace
+from backend_workloads import APP_SEARCH, POPULAR_DISHES, QuotaModel
+
+
+def app_dishes():
+    """Meal-plan dishes followed by the app's Vietnamese food data dishes, deduplicated"""
+    return list(dict.fromkeys(list(POPULAR_DISHES) + [dish['name'] for dish in parse_dart_dishes()]))
+
+
+def app_payloads(dishes):
+    return [{'query': dish.strip(), **APP_SEARCH} for dish in dishes]
+
+
+def trace_payloads(path):
+    """Recorded /youtube/search bodies, most frequent first"""
+    _, entries = load_trace(path)
+    counts, payloads = Counter(), {}
+    for entry in entries:
+        body = entry.get('body')
+        if entry['path'].split('?')[0] == '/youtube/search' and isinstance(body, dict) and body.get('query'):
+            key = tuple(sorted((k, str(v)) for k, v in body.items()))
+            counts[key] += 1
+            payloads.setdefault(key, body)
+    return [payloads[key] for key, _ in counts.most_common()]
+
+
+class QuotaBudget:
+    """Units reserved before each upstream call, refunded when the backend served it from cache"""
+
+    def __init__(self, units):
+        self.units = units
+        self.spent = 0
+
+    def reserve(self, cost):
+        if self.spent + cost > self.units:
+            return False
+        self.spent += cost
+        return True
+
+    def refund(self, cost):
+        self.spent -= cost
+
+
+async def warm_cache(base_url, payloads, budget, model=None, concurrency=5, rate=2.0, details=False, recorder=None):
+    """Send each search (and details) until the budget runs out; returns per-payload outcomes"""
+    model = model or QuotaModel()
+    pacer = RatePacer(rate) if rate else None
+    pending = list(payloads)
+    outcomes = []
+
+    async with AsyncBackendClient(base_url, max_connections=concurrency, recorder=recorder) as client:
+
+        async def send(path, body):
+            if pacer:
+                await pacer.wait()
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+            except httpx.HTTPError as e:
+                return time.perf_counter() - start, None, type(e).__name__
+            latency = time.perf_counter() - start
+            if response.status_code != 200:
+                return latency, None, f'HTTP {response.status_code}'
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            if not isinstance(body, dict):
+                # A proxy or error page answering 200
+                return latency, None, 'invalid JSON'
+            return latency, body, None
+
+        async def worker():
+            while pending:
+                payload = pending.pop(0)
+                if not budget.reserve(model.search_units):
+                    outcomes.append({'payload': payload, 'status': 'skipped'})
+                    continue
+                latency, body, error = await send('/youtube/search', payload)
+                # A 5xx or timeout can come after the backend called YouTube, so only a cache hit is refunded
+                if body is not None and body.get('cached'):
+                    budget.refund(model.search_units)
+                outcome = {'payload': payload, 'latency': latency, 'error': error,
+                           'status': 'error' if error else 'already cached' if body.get('cached') else 'warmed'}
+                outcomes.append(outcome)
+
+                video_ids = [video['id'] for video in (body or {}).get('videos', []) if video.get('id')]
+                if details and video_ids:
+                    cost = model.details_cost(len(video_ids))
+                    if budget.reserve(cost):
+                        _, details_body, _ = await send('/youtube/details', {'video_ids': video_ids})
+                        if details_body is not None and details_body.get('cached'):
+                            budget.refund(cost)
+                        # The backend caches details per video ID; a partial miss adds up to all of them
+                        outcome['details_ids'] = (len(video_ids) if details_body is not None
+                                                  and not details_body.get('cached') else 0)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return outcomes
+
+
+async def verify_warmth(base_url, outcomes, count, concurrency=5):
+    """Re-send up to `count` warmed searches; returns (hit latencies, misses)"""
+    warmed = [outcome['payload'] for outcome in outcomes if outcome['status'] in ('warmed', 'already cached')]
+    warmed = warmed[:count]
+    latencies, misses = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with AsyncBackendClient(base_url, max_connections=concurrency) as client:
+
+        async def check(payload):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post('/youtube/search', json=payload)
+                except httpx.HTTPError:
+                    misses.append(payload['query'])
+                    return
+                try:
+                    body = response.json() if response.status_code == 200 else None
+                except ValueError:
+                    body = None
+                if isinstance(body, dict) and body.get('cached'):
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    misses.append(payload['query'])
+
+        await asyncio.gather(*(check(payload) for payload in warmed))
+    return sorted(latencies), misses
+
+
+async def run_warmup(base_url, payloads, budget, args, recorder=None, model=None):
+    model = model or QuotaModel()
+    # Every re-check could miss and cost a search, so hold that back from the warm-up
+    checks = min(args.verify, len(payloads), budget.units // model.search_units)
+    budget.reserve(checks * model.search_units)
+    async with AsyncBackendClient(base_url) as client:
+        before = await fetch_cache_stats(client) or {}
+    outcomes = await warm_cache(base_url, payloads, budget, model=model, concurrency=args.concurrency,
+                                rate=args.rate, details=args.details, recorder=recorder)
+    async with AsyncBackendClient(base_url) as client:
+        after = await fetch_cache_stats(client) or {}
+    hits, misses = await verify_warmth(base_url, outcomes, checks, args.concurrency)
+    # Keep the reservation only for re-checks that missed
+    budget.refund((checks - len(misses)) * model.search_units)
+    return outcomes, before, after, hits, misses
+
+
+def print_warmup_report(outcomes, before, after, hits, misses, budget):
+    """What was warmed, what it cost, and whether the cache now serves it"""
+    status = Counter(outcome['status'] for outcome in outcomes)
+    warm_latencies = sorted(outcome['latency'] for outcome in outcomes if outcome['status'] == 'warmed')
+    print('\n📊 Warm-up Report')
+    print('-' * 78)
+    print(f"   Warmed {status['warmed']}, already cached {status['already cached']}, "
+          f"errors {status['error']}, skipped for budget {status['skipped']}")
+    print(f'   Quota spent: {budget.spent:,} of {budget.units:,} units')
+    if warm_latencies:
+        print(f'   Miss latency while warming: p50 {percentile(warm_latencies, 50) * 1000:.0f}ms, '
+              f'p95 {percentile(warm_latencies, 95) * 1000:.0f}ms')
+
+    if before and after:
+        added = after.get('valid_entries', 0) - before.get('valid_entries', 0)
+        expected = status['warmed'] + sum(outcome.get('details_ids', 0) for outcome in outcomes)
+        print(f"   valid_entries: {before.get('valid_entries')} → {after.get('valid_entries')} "
+              f"(+{added}, expected up to +{expected})")
+        if added < status['warmed']:
+            print('⚠️  Fewer new entries than warmed searches: entries were evicted '
+                  f"(max_cache_size {after.get('max_cache_size')}) or the instance restarted mid-warm")
+    else:
+        print('⚠️  /youtube/cache/stats unavailable: entry counts not verified')
+
+    if hits:
+        print(f'✅ {len(hits)} warmed searches served from cache: p50 {percentile(hits, 50) * 1000:.0f}ms, '
+              f'p95 {percentile(hits, 95) * 1000:.0f}ms')
+        if warm_latencies:
+            print(f'   First users save ~{(percentile(warm_latencies, 50) - percentile(hits, 50)) * 1000:.0f}ms '
+                  'per common dish')
+    if misses:
+        print(f"❌ {len(misses)} warmed searches missed on re-check: {', '.join(misses[:5])}"
+              + (' ...' if len(misses) > 5 else ''))
+    if status['skipped']:
+        print('ℹ️  Raise --quota-budget to warm the skipped dishes')
+
+
+def main():
+    """Run the cache warm-up"""
+    parser = argparse.ArgumentParser(description='Pre-populate the YouTube video cache for common dishes')
+    parser.add_argument('--base-url', default=RENDER_BASE_URL, help='Backend base URL')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--from-trace', metavar='PATH', help='Warm the searches in a recorded trace, most frequent first')
+    source.add_argument('--from-file', metavar='PATH', help='Warm the dishes in a file, one per line')
+    parser.add_argument('--top', type=int, help='Only warm the first N dishes')
+    parser.add_argument('--quota-budget', type=int, default=3000,
+                        help='YouTube quota units the warm-up may spend (search miss = 100)')
+    parser.add_argument('--rate', type=float, default=2.0, help='Requests per second; 0 for no limit')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent warm-up requests')
+    parser.add_argument('--details', action='store_true', help='Also warm /youtube/details for the results')
+    parser.add_argument('--verify', type=int, default=5,
+                        help='Warmed searches to re-send afterwards; their worst-case cost comes out of the budget')
+    add_results_arguments(parser)
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    if args.from_trace:
+        payloads = trace_payloads(args.from_trace)
+    elif args.from_file:
+        with open(args.from_file, encoding='utf-8') as f:
+            payloads = app_payloads(line for line in f if line.strip())
+    else:
+        payloads = app_payloads(app_dishes())
+    payloads = payloads[:args.top]
+
+    standin = standin_from_args(args)
+    base_url = standin.base_url if standin else args.base_url
+    recorder = results_from_args(args, 'warm_youtube_cache', base_url, dishes=len(payloads))
+    budget = QuotaBudget(args.quota_budget)
+
+    print('🔥 YouTube Cache Warm-up')
+    print('=' * 78)
+    print(f'📡 Target: {base_url}')
+    print(f'🍜 {len(payloads)} searches, budget {args.quota_budget:,} units, '
+          f"{f'{args.rate:g} req/s' if args.rate else 'no rate limit'}")
+    if args.verify:
+        print(f'🔎 Re-checking up to {args.verify} warmed searches afterwards; '
+              'their worst-case cost is held back from the budget')
+
+    try:
+        result = asyncio.run(run_warmup(base_url, payloads, budget, args, recorder))
+    finally:
+        if recorder:
+            recorder.close()
+        if standin:
+            standin.stop()
+    print_warmup_report(*result, budget)
+
+
+if __name__ == '__main__':
+    main()